@@ -5,6 +5,7 @@
 import pandas as pd
 import numpy as np
 from config.strategies import StrategyConfig
+from data.price_panel import PricePanel
 
 class AlphaEngine:
     """
@@ -82,4 +83,129 @@ class AlphaEngine:
         
         if pd.isna(atr): 
             return 0.0
-        return atr
\ No newline at end of file
+        return atr
+
+    # ==========================================================================
+    # VERSIONS BATCH (tout l'univers d'un coup, NumPy vectorisé)
+    # prices : DataFrame [dates x tickers] ou PricePanel
+    # last_only=False -> DataFrame de la série complète du signal
+    # last_only=True  -> Series de la coupe transversale du dernier jour
+    # ==========================================================================
+    @staticmethod
+    def _as_matrix(prices, field="close"):
+        """Extrait (valeurs float64, dates, tickers) d'un DataFrame ou d'un PricePanel."""
+        if isinstance(prices, PricePanel):
+            return np.asarray(prices.field(field), dtype=np.float64), prices.dates, prices.tickers
+        return prices.to_numpy(dtype=np.float64), prices.index, list(prices.columns)
+
+    @staticmethod
+    def _wrap(values, dates, tickers, last_only):
+        if last_only:
+            return pd.Series(values[-1] if values.ndim == 2 else values, index=tickers)
+        return pd.DataFrame(values, index=dates, columns=tickers)
+
+    @staticmethod
+    def _rolling_sum(x, window):
+        """
+        Sommes glissantes sur 'window' lignes par différence de cumsum, O(n x k)
+        en mémoire (une vue glissante n x k x window coûterait des Go sur un gros
+        univers). Ligne j = somme de x[j:j+window] ; NaN si la fenêtre en contient un.
+        """
+        nan = np.isnan(x)
+        gapped = nan.any()
+        total = np.zeros((len(x) + 1, x.shape[1]))
+        np.cumsum(np.where(nan, 0.0, x) if gapped else x, axis=0, out=total[1:])
+        sums = total[window:] - total[:-window]
+        if gapped:
+            gaps = np.zeros(total.shape, dtype=np.int32)
+            np.cumsum(nan, axis=0, out=gaps[1:])
+            sums[gaps[window:] - gaps[:-window] > 0] = np.nan
+        return sums
+
+    @staticmethod
+    def calculate_13612W_batch(prices, last_only=False):
+        """
+        Momentum 13612W de chaque ticker à chaque date (mêmes règles que calculate_13612W :
+        0.0 tant que l'historique est plus court que la fenêtre la plus longue).
+        """
+        params = StrategyConfig.CANARY_PARAMS
+        weights = params["WEIGHTS"]
+        windows = [params[f"MOMENTUM_WINDOW_{k}"] for k in range(1, 5)]
+
+        p, dates, tickers = AlphaEngine._as_matrix(prices)
+        if last_only:
+            p = p[-windows[3]:] if len(p) >= windows[3] else p[:0]
+            if len(p) == 0:
+                return pd.Series(0.0, index=tickers)
+        n = len(p)
+
+        score = np.zeros_like(p)
+        for w, window in zip(weights, windows):
+            # .iloc[-N] = décalage de N-1 lignes
+            lag = window - 1
+            if n > lag:
+                score[lag:] += w * ((p[lag:] / p[:-lag] if lag else 1.0) - 1)
+        score[:windows[3] - 1] = 0.0
+
+        return AlphaEngine._wrap(score, dates, tickers, last_only)
+
+    @staticmethod
+    def calculate_volatility_batch(prices, last_only=False):
+        """Volatilité annualisée glissante (fenêtre VALKYRIE) ; NaN ou zéro -> 0.0."""
+        window = StrategyConfig.VALKYRIE_PARAMS["VOLATILITY_WINDOW"]
+
+        p, dates, tickers = AlphaEngine._as_matrix(prices)
+        if last_only:
+            p = p[-(window + 1):]
+        n, k = p.shape
+
+        vol = np.full((n, k), np.nan)
+        if n > window:
+            daily_ret = p[1:] / p[:-1] - 1
+            if last_only:
+                windows = np.lib.stride_tricks.sliding_window_view(daily_ret, window, axis=0)
+                std = windows.std(axis=-1, ddof=1)
+            else:
+                # Variance (ddof=1) par sommes glissantes de x et x²
+                total = AlphaEngine._rolling_sum(daily_ret, window)
+                squares = AlphaEngine._rolling_sum(daily_ret * daily_ret, window)
+                std = np.sqrt(np.maximum(squares - total * total / window, 0.0) / (window - 1))
+            # Std Dev * Racine(252) pour annualiser
+            vol[window:] = std * np.sqrt(252)
+
+        vol = np.where(np.isnan(vol) | (vol == 0), 0.0, vol)
+        return AlphaEngine._wrap(vol, dates, tickers, last_only)
+
+    @staticmethod
+    def calculate_atr_batch(high, low=None, close=None, window=14, last_only=False):
+        """
+        ATR glissant de chaque ticker. Accepte un PricePanel (high) ou trois
+        DataFrames high / low / close alignés.
+        """
+        if isinstance(high, PricePanel):
+            panel = high
+            h, dates, tickers = AlphaEngine._as_matrix(panel, "high")
+            l, _, _ = AlphaEngine._as_matrix(panel, "low")
+            c, _, _ = AlphaEngine._as_matrix(panel, "close")
+        else:
+            h, dates, tickers = AlphaEngine._as_matrix(high)
+            l, _, _ = AlphaEngine._as_matrix(low)
+            c, _, _ = AlphaEngine._as_matrix(close)
+
+        if last_only:
+            h, l, c = h[-(window + 1):], l[-(window + 1):], c[-(window + 1):]
+        n, k = h.shape
+
+        prev_close = np.vstack([np.full((1, k), np.nan), c[:-1]])
+        # fmax ignore les NaN (comme pd.concat(...).max(axis=1))
+        tr = np.fmax(np.fmax(h - l, np.abs(h - prev_close)), np.abs(l - prev_close))
+
+        atr = np.full((n, k), np.nan)
+        if n >= window:
+            if last_only:
+                atr[window - 1:] = np.lib.stride_tricks.sliding_window_view(tr, window, axis=0).mean(axis=-1)
+            else:
+                atr[window - 1:] = AlphaEngine._rolling_sum(tr, window) / window
+
+        atr = np.where(np.isnan(atr), 0.0, atr)
+        return AlphaEngine._wrap(atr, dates, tickers, last_only)
\ No newline at end of file
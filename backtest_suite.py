@@ -3,16 +3,19 @@
 # ==============================================================================
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import matplotlib.pyplot as plt
 from config.settings import Config
+from data.feed import DataFeed
 from core.regime import RegimeManager
 from core.portfolio import PortfolioManager
+from core.signal_matrix import SignalMatrix
+from data.price_panel import PricePanel
 
 # --- PARAMÈTRES DU TEST ---
 START_DATE = "2022-01-01"  # Teste le Crash 2022 + Bull Run 2023-2024
 INITIAL_CAPITAL = 10000.0
 TRANS_COST = 0.0010        # 0.10% de frais par trade (Slippage inclus)
+WARMUP_DAYS = 252          # On commence après 252 jours pour avoir assez d'historique (Canary 12 mois)
 
 class BacktestEngine:
     def __init__(self):
@@ -28,62 +31,92 @@ class BacktestEngine:
         self.positions = {} # {ticker: quantité}
         self.history = []   # Journal de bord
 
-    def fetch_history(self):
-        print(f"📥 Téléchargement de l'historique ({len(self.universe)} actifs)...")
-        # On télécharge tout d'un coup
-        data = yf.download(
-            self.universe, 
-            start=START_DATE, 
-            group_by='column', 
-            auto_adjust=True, 
-            progress=True
-        )
-        # Nettoyage
-        data = data.ffill().bfill()
-        
-        # On structure comme le DataFeed : {'close': df, 'high': df, ...}
-        return {
-            "close": data['Close'],
-            "high": data['High'],
-            "low": data['Low'],
-            "open": data['Open']
-        }
-
-    def run(self):
+    def fetch_history(self, refresh=True):
+        print(f"📥 Chargement de l'historique ({len(self.universe)} actifs)...")
+        # Cache local : seules les bougies manquantes sont téléchargées
+        feed = DataFeed()
+        feed.tickers = self.universe
+        data = feed.fetch_market_data(start=START_DATE, refresh=refresh)
+        if data is None:
+            raise ValueError("Historique indisponible.")
+
+        # Même structure que le DataFeed : {'close': df, 'high': df, ...}
+        return data
+
+    def run(self, vectorized=True):
         # 1. Récupération des données
         full_data = self.fetch_history()
+        self.simulate(full_data, vectorized=vectorized)
+        self._generate_report()
+
+    def simulate(self, full_data, vectorized=True, params=None, memo=None, verbose=True,
+                 start_index=WARMUP_DAYS, end_index=None, signals=None, keep_state=False):
+        """
+        Rejoue la stratégie jour par jour sur full_data.
+        vectorized=True : signaux pré-calculés une seule fois (SignalMatrix), O(jours).
+        vectorized=False : boucle historique (re-slicing iloc[:i+1]), O(jours²) - référence.
+        full_data : dict {'close': df, ...} ou PricePanel (tranches = vues, fenêtres bornées).
+        params / memo : surcharge des paramètres et cache d'indicateurs (mode vectorisé,
+        voir SignalMatrix) pour les optimisations.
+        start_index / end_index : fenêtre de lignes simulée (walk-forward) ; les signaux
+        restent calculés sur le panel complet (fenêtres causales, pas de fuite du futur).
+        signals : SignalMatrix déjà construite pour ce panel et ces paramètres.
+        keep_state : repart du cash et des positions de la simulation précédente
+        (segments Out-of-Sample enchaînés du walk-forward).
+        """
         closes = full_data['close']
         dates = closes.index
-        
-        print(f"⚙️ Lancement de la simulation sur {len(dates)} jours...")
 
-        # On commence après 252 jours pour avoir assez d'historique pour les calculs (Canary 12 mois)
-        start_index = 252
-        
-        for i in range(start_index, len(dates)):
+        # Remise à zéro du portefeuille virtuel
+        if not keep_state:
+            self.cash = INITIAL_CAPITAL
+            self.positions = {}
+        self.history = []
+
+        end_index = len(dates) if end_index is None else min(end_index, len(dates))
+        if verbose:
+            print(f"⚙️ Lancement de la simulation sur {end_index - start_index} jours...")
+
+        if vectorized:
+            if signals is None:
+                signals = SignalMatrix(full_data, params=params, memo=memo)
+            columns = list(closes.columns)
+            values = closes.to_numpy()
+
+        for i in range(start_index, end_index):
             current_date = dates[i]
-            
-            # --- A. VOYAGE DANS LE TEMPS ---
-            # On coupe les données pour ne voir que le passé (jusqu'à la date i)
-            data_slice = {
-                "close": full_data['close'].iloc[:i+1],
-                "high": full_data['high'].iloc[:i+1],
-                "low": full_data['low'].iloc[:i+1]
-            }
-            
-            # Prix de clôture du jour (pour exécuter les ordres)
-            current_prices = full_data['close'].iloc[i]
 
-            # --- B. LE CERVEAU RÉFLÉCHIT ---
-            # 1. Analyse Régime (Canary)
-            regime, defense_asset, _ = self.regime_mgr.analyze_market_health(data_slice)
-            
-            # 2. Sélection Portefeuille (Valkyrie)
-            target_orders = []
-            if regime == "ATTACK":
-                target_orders = self.portfolio_mgr.select_attack_portfolio(data_slice)
+            if vectorized:
+                # --- A+B. SIGNAUX PRÉ-CALCULÉS ---
+                current_prices = dict(zip(columns, values[i]))
+                regime, target_orders = signals.orders_at(i)
+            elif isinstance(full_data, PricePanel):
+                # --- A. VOYAGE DANS LE TEMPS (vue NumPy, zéro copie) ---
+                data_slice = full_data.slice(0, i+1)
+                current_prices = full_data.row(i)
             else:
-                target_orders = self.portfolio_mgr.select_defense_portfolio(defense_asset)
+                # --- A. VOYAGE DANS LE TEMPS ---
+                # On coupe les données pour ne voir que le passé (jusqu'à la date i)
+                data_slice = {
+                    "close": full_data['close'].iloc[:i+1],
+                    "high": full_data['high'].iloc[:i+1],
+                    "low": full_data['low'].iloc[:i+1]
+                }
+
+                # Prix de clôture du jour (pour exécuter les ordres)
+                current_prices = full_data['close'].iloc[i]
+
+            if not vectorized:
+                # --- B. LE CERVEAU RÉFLÉCHIT ---
+                # 1. Analyse Régime (Canary)
+                regime, defense_asset, _ = self.regime_mgr.analyze_market_health(data_slice)
+
+                # 2. Sélection Portefeuille (Valkyrie)
+                target_orders = []
+                if regime == "ATTACK":
+                    target_orders = self.portfolio_mgr.select_attack_portfolio(data_slice)
+                else:
+                    target_orders = self.portfolio_mgr.select_defense_portfolio(defense_asset)
 
             # --- C. EXÉCUTION VIRTUELLE ---
             self._rebalance_portfolio(target_orders, current_prices)
@@ -103,10 +136,10 @@ class BacktestEngine:
                 "SPY": current_prices.get("SPY", 0)
             })
             
-            if i % 50 == 0:
+            if verbose and i % 50 == 0:
                 print(f"📅 {current_date.date()} | ${portfolio_value:,.0f} | {regime}")
 
-        self._generate_report()
+        return pd.DataFrame(self.history)
 
     def _rebalance_portfolio(self, orders, current_prices):
         """Applique les ordres cibles au portefeuille virtuel avec frais."""
@@ -0,0 +1,262 @@
+# ==============================================================================
+# FICHIER : benchmarks.py
+# ROLE : Suite de benchmarks hors-ligne (Marché synthétique + Scénarios chronométrés)
+# ==============================================================================
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config.settings import Config
+from core.regime import RegimeManager
+from core.portfolio import PortfolioManager
+from core.alpha import AlphaEngine
+from core.indicators import IndicatorState
+from data.price_panel import PricePanel
+from utils.metrics import PerformanceMetrics
+from backtest_suite import BacktestEngine, WARMUP_DAYS
+
+RESULTS_DIR = "database/benchmarks"
+BASELINE_FILE = os.path.join(RESULTS_DIR, "baseline.json")
+
+# --- GRILLES DE TAILLES (tickers x années) ---
+PROFILES = {
+    "quick": {"tickers": [10, 100, 500], "years": [1, 5]},
+    "full": {"tickers": [10, 100, 1000, 5000], "years": [1, 5, 10, 30]},
+}
+DAYS_PER_YEAR = 252
+
+class SyntheticMarket:
+    """
+    Générateur OHLCV déterministe (graine) : GBM à sauts (Merton).
+    log-rendement = (mu - sigma²/2) dt + sigma sqrt(dt) Z + somme des sauts N(mu_j, sigma_j),
+    nombre de sauts ~ Poisson(lambda dt). mu / sigma sont tirés par ticker.
+    L'univers réel (SPY, refuges, attaque) vient en premier pour que Régime et
+    Valkyrie trouvent leurs tickers ; il est complété par SYN0001, SYN0002...
+    """
+
+    def __init__(self, n_tickers, years, seed=42, jump_intensity=3.0, jump_mean=-0.02, jump_vol=0.06):
+        self.n_tickers = n_tickers
+        self.years = years
+        self.seed = seed
+        self.jump_intensity = jump_intensity  # Sauts par an
+        self.jump_mean = jump_mean
+        self.jump_vol = jump_vol
+
+    @staticmethod
+    def universe():
+        """Tickers réels de Config (SPY en tête)."""
+        return ["SPY"] + sorted(t for t in Config.FULL_UNIVERSE if t != "SPY")
+
+    def tickers(self):
+        real = self.universe()
+        synthetic = [f"SYN{k:04d}" for k in range(1, max(self.n_tickers - len(real), 0) + 1)]
+        return (real + synthetic)[:self.n_tickers]
+
+    def generate(self):
+        """{'close', 'high', 'low', 'open'} : DataFrames [jours ouvrés x tickers]."""
+        rng = np.random.default_rng(self.seed)
+        tickers = self.tickers()
+        n, k = self.years * DAYS_PER_YEAR, len(tickers)
+        dates = pd.bdate_range(end="2024-12-31", periods=n)
+        dt = 1 / DAYS_PER_YEAR
+
+        mu = rng.uniform(-0.05, 0.25, k)
+        sigma = rng.uniform(0.10, 0.60, k)
+        jumps = rng.poisson(self.jump_intensity * dt, (n, k))
+        log_ret = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * rng.standard_normal((n, k))
+        log_ret += jumps * self.jump_mean + np.sqrt(jumps) * self.jump_vol * rng.standard_normal((n, k))
+        log_ret[0] = 0.0
+
+        close = rng.uniform(20, 500, k) * np.exp(np.cumsum(log_ret, axis=0))
+        gap = np.exp(0.2 * sigma * np.sqrt(dt) * rng.standard_normal((n, k)))
+        open_ = np.vstack([close[:1], close[:-1]]) * gap
+        spread = np.abs(rng.standard_normal((n, k))) * 0.5 * sigma * np.sqrt(dt)
+        high = np.maximum(open_, close) * (1 + spread)
+        low = np.minimum(open_, close) * (1 - spread)
+
+        frame = lambda values: pd.DataFrame(values, index=dates, columns=tickers)
+        return {"close": frame(close), "high": frame(high), "low": frame(low), "open": frame(open_)}
+
+# ------------------------------------------------------------------------------
+# SCÉNARIOS : (nom, préparation(données) -> argument, fonction chronométrée(argument))
+# La préparation n'est pas chronométrée (ex : construction du PricePanel).
+# ------------------------------------------------------------------------------
+def _equity(data):
+    spy = data["close"]["SPY"]
+    return pd.DataFrame({"Equity": spy / spy.iloc[0] * Config.INITIAL_CAPITAL})
+
+SCENARIOS = [
+    ("regime.frame", lambda d: d, lambda d: RegimeManager().analyze_market_health(d)),
+    ("regime.panel", PricePanel.from_frames, lambda p: RegimeManager().analyze_market_health(p)),
+    ("regime.state", IndicatorState.from_history, lambda s: RegimeManager().analyze_market_health(s)),
+    ("portfolio.attack.frame", lambda d: d, lambda d: PortfolioManager().select_attack_portfolio(d)),
+    ("portfolio.attack.state", IndicatorState.from_history, lambda s: PortfolioManager().select_attack_portfolio(s)),
+    ("indicators.from_history", PricePanel.from_frames, IndicatorState.from_history),
+    ("alpha.13612W", lambda d: d["close"]["SPY"], AlphaEngine.calculate_13612W),
+    ("alpha.volatility", lambda d: d["close"]["SPY"], AlphaEngine.calculate_volatility),
+    ("alpha.atr", lambda d: (d["high"]["SPY"], d["low"]["SPY"], d["close"]["SPY"]),
+     lambda hlc: AlphaEngine.calculate_atr(*hlc)),
+    ("alpha.13612W_batch", PricePanel.from_frames, AlphaEngine.calculate_13612W_batch),
+    ("alpha.volatility_batch", PricePanel.from_frames, AlphaEngine.calculate_volatility_batch),
+    ("alpha.atr_batch", PricePanel.from_frames, AlphaEngine.calculate_atr_batch),
+    ("metrics.calculate", _equity, PerformanceMetrics.calculate),
+    ("backtest.vectorized", lambda d: d, lambda d: BacktestEngine().simulate(d, verbose=False)),
+]
+
+# Scénarios qui ne lisent que l'univers Config (SPY, refuges, attaque) : ajouter des
+# tickers synthétiques ne les charge pas davantage. Mesurés une fois par durée,
+# sur cet univers seul (tickers = len(SyntheticMarket.universe())).
+UNIVERSE_BOUND = {
+    "regime.frame", "regime.panel", "regime.state",
+    "portfolio.attack.frame", "portfolio.attack.state",
+    "alpha.13612W", "alpha.volatility", "alpha.atr",
+    "metrics.calculate", "backtest.vectorized",
+}
+
+def _time(fn, arg, repeat):
+    """Un appel de chauffe puis 'repeat' mesures (secondes)."""
+    fn(arg)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def _metadata(seed):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "date": datetime.now().isoformat(timespec="seconds"), "commit": commit, "seed": seed,
+        "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+        "machine": platform.machine(), "processor": platform.processor() or platform.system(),
+    }
+
+def _measure(scenarios, n_tickers, n_years, repeat, seed, results):
+    data = SyntheticMarket(n_tickers, n_years, seed).generate()
+    print(f"\n🧪 [Bench] {n_tickers} tickers x {n_years} ans ({len(data['close'])} jours)")
+    for name, prepare, fn in scenarios:
+        if name.startswith("backtest") and len(data["close"]) <= WARMUP_DAYS:
+            continue  # Pas de jour simulé après la période de chauffe
+        samples = _time(fn, prepare(data), repeat)
+        results.append({
+            "scenario": name, "tickers": n_tickers, "years": n_years, "repeat": repeat,
+            "min": min(samples), "median": statistics.median(samples), "mean": statistics.fmean(samples),
+        })
+        print(f"   {name:<26} min {min(samples) * 1000:>10.2f} ms | médiane {statistics.median(samples) * 1000:>10.2f} ms")
+
+def run(tickers, years, repeat=5, seed=42, only=None, max_cells=None):
+    """
+    Chronomètre chaque scénario pour chaque taille ; retourne le document JSON.
+    max_cells : plafond optionnel tickers x jours ; les tailles écartées sont
+    listées dans document["skipped"] (jamais ignorées en silence).
+    """
+    scenarios = [s for s in SCENARIOS if not only or any(s[0].startswith(o) for o in only)]
+    bound = [s for s in scenarios if s[0] in UNIVERSE_BOUND]
+    scaled = [s for s in scenarios if s[0] not in UNIVERSE_BOUND]
+    results, skipped = [], []
+    for n_years in years:
+        if bound:
+            _measure(bound, len(SyntheticMarket.universe()), n_years, repeat, seed, results)
+        for n_tickers in tickers if scaled else []:
+            cells = n_tickers * n_years * DAYS_PER_YEAR
+            if max_cells is not None and cells > max_cells:
+                print(f"⏭️ [Bench] {n_tickers} tickers x {n_years} ans ignoré ({cells:,} cellules > {max_cells:,})")
+                skipped.append({"tickers": n_tickers, "years": n_years, "cells": cells, "max_cells": max_cells})
+                continue
+            _measure(scaled, n_tickers, n_years, repeat, seed, results)
+    return {"meta": _metadata(seed), "results": results, "skipped": skipped}
+
+def save(document, path=None):
+    path = path or os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    return path
+
+def compare(current, baseline, threshold=0.10, stat="min", min_delta=0.0005):
+    """
+    Rapproche deux documents par (scénario, tickers, années).
+    Retourne les lignes [clé, base, actuel, ratio, statut] ; statut = REGRESSION
+    si actuel > base x (1 + threshold), AMÉLIORATION si actuel < base / (1 + threshold).
+    Un écart absolu inférieur à min_delta (secondes) reste OK : bruit de mesure
+    des scénarios sub-milliseconde.
+    """
+    key = lambda r: (r["scenario"], r["tickers"], r["years"])
+    reference = {key(r): r[stat] for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        if key(r) not in reference:
+            continue
+        base, now = reference[key(r)], r[stat]
+        ratio = now / base if base > 0 else float("inf")
+        status = "OK"
+        if abs(now - base) >= min_delta:
+            status = "REGRESSION" if ratio > 1 + threshold else "AMÉLIORATION" if ratio < 1 / (1 + threshold) else "OK"
+        rows.append([key(r), base, now, ratio, status])
+    return rows
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks hors-ligne du coeur de la stratégie.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="Chronométrer les scénarios sur données synthétiques")
+    run_cmd.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    run_cmd.add_argument("--tickers", type=int, nargs="+", help="Remplace les tailles du profil")
+    run_cmd.add_argument("--years", type=int, nargs="+", help="Remplace les durées du profil")
+    run_cmd.add_argument("--repeat", type=int, default=5)
+    run_cmd.add_argument("--seed", type=int, default=42)
+    run_cmd.add_argument("--only", nargs="+", help="Préfixes de scénarios (ex : regime alpha)")
+    run_cmd.add_argument("--max-cells", type=int, help="Plafond tickers x jours (tailles écartées listées dans le JSON)")
+    run_cmd.add_argument("--output", help="Fichier JSON (défaut : database/benchmarks/bench_<date>.json)")
+    run_cmd.add_argument("--save-baseline", action="store_true", help=f"Écrit aussi {BASELINE_FILE}")
+
+    cmp_cmd = commands.add_parser("compare", help="Comparer un résultat à la référence")
+    cmp_cmd.add_argument("current")
+    cmp_cmd.add_argument("baseline", nargs="?", default=BASELINE_FILE)
+    cmp_cmd.add_argument("--threshold", type=float, default=0.10, help="Tolérance relative (0.10 = +10%%)")
+    cmp_cmd.add_argument("--stat", choices=["min", "median", "mean"], default="min")
+    cmp_cmd.add_argument("--min-delta", type=float, default=0.0005, help="Écart absolu ignoré (secondes)")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "run":
+            profile = PROFILES[args.profile]
+            document = run(args.tickers or profile["tickers"], args.years or profile["years"],
+                           repeat=args.repeat, seed=args.seed, only=args.only, max_cells=args.max_cells)
+            print(f"\n💾 Résultats : {save(document, args.output)}")
+            if document["skipped"]:
+                print(f"⚠️ {len(document['skipped'])} taille(s) écartée(s) par --max-cells (voir 'skipped').")
+            if args.save_baseline:
+                print(f"📌 Référence : {save(document, BASELINE_FILE)}")
+        else:
+            rows = compare(_load(args.current), _load(args.baseline), args.threshold, args.stat, args.min_delta)
+            print("\n" + "="*86)
+            print(f"⚖️ COMPARAISON ({args.stat}, tolérance {args.threshold:.0%})")
+            print("="*86)
+            for (scenario, n_tickers, n_years), base, now, ratio, status in rows:
+                icon = "🔴" if status == "REGRESSION" else "🟢" if status == "AMÉLIORATION" else "⚪"
+                print(f"{icon} {scenario:<26}{n_tickers:>6} x {n_years:>2} ans  "
+                      f"{base * 1000:>10.2f} -> {now * 1000:>10.2f} ms  x{ratio:.2f}  {status}")
+            regressions = sum(1 for row in rows if row[4] == "REGRESSION")
+            print(f"\n{len(rows)} mesures comparées, {regressions} régression(s).")
+            sys.exit(1 if regressions else 0)
+    except Exception as e:
+        print(f"❌ Erreur Benchmark : {e}")
+        sys.exit(2)
@@ -4,11 +4,18 @@
 from data.feed import DataFeed
 from data.news_fetcher import NewsFetcher
 from data.macro_data import MacroProvider
+from data.market_context import MarketDataContext
 from core.regime import RegimeManager
 from core.portfolio import PortfolioManager
 from core.state_manager import StateManager
+from core.indicators import IndicatorState
+from core.lookback import LookbackPlanner
 from intelligence.mistral_client import MistralOracle
+from utils.tracing import Tracer
 from config.settings import Config
+from config.strategies import StrategyConfig
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, TimeoutError as FuturesTimeout
 
 class AegisBrain:
     def __init__(self):
@@ -19,26 +26,55 @@ class AegisBrain:
         self.portfolio = PortfolioManager()
         self.state_manager = StateManager()
         self.oracle = MistralOracle()
+        # Contexte de données du run en cours (recréé à chaque generate_orders)
+        self.market = None
+        # État incrémental des indicateurs (persisté entre deux runs)
+        self.indicators = IndicatorState.load()
 
-    def generate_orders(self):
+    def generate_orders(self, market=None):
+        """
+        market : MarketDataContext déjà chargé (processus résident, données rafraîchies
+        avant le déclenchement) ; sinon créé et rempli ici.
+        """
         print("🧠 [Brain] Démarrage de l'analyse stratégique...")
 
         # 0. CHECK STATE (Sécurité Anti-Doublon)
         if self.state_manager.already_traded_today():
             return "DONE", [], None
 
+        # Profondeur d'historique déduite des fenêtres de la stratégie
+        start = LookbackPlanner.start_date()
+        print(f"📐 [Brain] Historique requis : {LookbackPlanner.required_bars()} séances (depuis {start.date()})")
+
+        # Un seul passage au fournisseur par ticker pour tout le run
+        # (univers + indicateurs macro ; le SPY du benchmark est servi ensuite)
+        if market is None:
+            market = self.prefetch_market(start)
+        self.market = market
+
         # 1. ACQUISITION MACRO
         print("🌍 [Brain] Scan Macro-Économique...")
-        macro_data = self.macro.fetch_macro_indicators()
+        with Tracer.span("macro.fetch"):
+            macro_data = self.macro.fetch_macro_indicators(self.market)
         if macro_data:
             print(f"   > VIX: {macro_data['VIX']} | Taux 10ans: {macro_data['10Y_YIELD']}%")
         
         # 2. ACQUISITION DATA PRIX
-        data = self.feed.fetch_market_data(period="2y")
+        with Tracer.span("prices.panel"):
+            data = self.market.fetch(self.feed.tickers, start=start, as_panel=True)
         if data is None: return "ERROR", [], None
 
+        # Mise à jour incrémentale des indicateurs (seules les nouvelles bougies)
+        with Tracer.span("indicators.sync"):
+            if self.indicators is None:
+                self.indicators = IndicatorState.from_history(data)
+            else:
+                self.indicators.sync(data)
+            self.indicators.save()
+
         # 3. ANALYSE RÉGIME (TREND KING)
-        status, defense_asset, details = self.regime.analyze_market_health(data)
+        with Tracer.span("regime.analyze"):
+            status, defense_asset, details = self.regime.analyze_market_health(self.indicators)
         
         # Log spécifique Trend King
         trend_msg = details.get('SPY_TREND', 'UNKNOWN')
@@ -51,22 +87,24 @@ class AegisBrain:
 
         # 4. SÉLECTION TECHNIQUE
         raw_orders = []
-        if status == "ATTACK":
-            raw_orders = self.portfolio.select_attack_portfolio(data)
-        else:
-            raw_orders = self.portfolio.select_defense_portfolio(defense_asset)
+        with Tracer.span("portfolio.select", regime=status):
+            if status == "ATTACK":
+                raw_orders = self.portfolio.select_attack_portfolio(self.indicators)
+            else:
+                raw_orders = self.portfolio.select_defense_portfolio(defense_asset)
 
         # 5. FILTRE SENTINEL (NEWS VETO)
         final_orders = []
         if status == "ATTACK":
             print("\n🛡️ [Sentinel] Analyse de risque IA en cours...")
+            with Tracer.span("sentinel.veto", tickers=len(raw_orders)):
+                verdicts = self._sentinel_veto([order['ticker'] for order in raw_orders])
+            self.oracle.verdicts.flush()
+            cache = self.oracle.verdicts.stats()
+            print(f"   > Cache IA : {cache['hits']} hits / {cache['misses']} misses ({cache['size']} verdicts)")
             for order in raw_orders:
                 ticker = order['ticker']
-                headlines = self.news.get_headlines(ticker)
-                
-                risk_status = "SAFE"
-                if headlines:
-                    risk_status = self.oracle.analyze_risk(ticker, headlines)
+                headlines, risk_status = verdicts[ticker]
                 
                 if risk_status == "DANGER":
                     print(f"   ⛔ VETO IA : {ticker} supprimé (Risque News)")
@@ -77,4 +115,62 @@ class AegisBrain:
         else:
             final_orders = raw_orders
 
-        return status, final_orders, macro_data
\ No newline at end of file
+        return status, final_orders, macro_data
+
+    def prefetch_market(self, start=None):
+        """Contexte de données du run : univers + macro chargés en une passe (cache incrémental)."""
+        start = start if start is not None else LookbackPlanner.start_date()
+        market = MarketDataContext(self.feed)
+        with Tracer.span("prices.download", tickers=len(self.feed.tickers) + len(self.macro.tickers)):
+            market.prefetch(self.feed.tickers + self.macro.tickers, start=start)
+        return market
+
+    def _sentinel_veto(self, tickers):
+        """
+        1. Titres de tous les tickers récupérés en parallèle (pool borné).
+        2. UN seul appel IA pour l'ensemble des candidats (analyze_risk_batch).
+        Durée totale ~ ticker le plus lent, plafonnée par STAGE_DEADLINE ;
+        un ticker hors délai (ou en erreur) reçoit TIMEOUT_VERDICT.
+        Retourne {ticker: (headlines, risk_status)}.
+        """
+        params = StrategyConfig.SENTINEL_PARAMS
+        default = params["TIMEOUT_VERDICT"]
+        verdicts = {t: ([], default) for t in tickers}
+        if not tickers:
+            return verdicts
+
+        deadline = time.monotonic() + params["STAGE_DEADLINE"]
+        pool = ThreadPoolExecutor(max_workers=min(params["MAX_WORKERS"], len(tickers)))
+        try:
+            # --- ÉTAPE A : NEWS ---
+            futures = {pool.submit(self.news.get_headlines, t): t for t in tickers}
+            done, pending = wait(futures, timeout=params["STAGE_DEADLINE"])
+
+            headlines = {}
+            for future in done:
+                ticker = futures[future]
+                try:
+                    headlines[ticker] = future.result()
+                except Exception as e:
+                    print(f"   ⚠️ [Sentinel] Erreur news {ticker} : {e} -> {default}")
+            for future in pending:
+                print(f"   ⏱️ [Sentinel] Délai dépassé (news) pour {futures[future]} -> {default}")
+
+            # --- ÉTAPE B : VERDICT IA (requête unique) ---
+            if headlines:
+                future = pool.submit(self.oracle.analyze_risk_batch, headlines)
+                try:
+                    risk = future.result(timeout=max(deadline - time.monotonic(), 0))
+                    for ticker, h in headlines.items():
+                        verdicts[ticker] = (h, risk.get(ticker, default))
+                except FuturesTimeout:
+                    print(f"   ⏱️ [Sentinel] Délai dépassé (IA) -> {default}")
+                    for ticker, h in headlines.items():
+                        verdicts[ticker] = (h, default)
+                except Exception as e:
+                    print(f"   ⚠️ [Sentinel] Erreur IA : {e} -> {default}")
+        finally:
+            # On n'attend pas les appels réseau encore en vol
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        return verdicts
\ No newline at end of file
@@ -0,0 +1,419 @@
+# ==============================================================================
+# FICHIER : broker_sim.py
+# ROLE : Simulateur local compatible Alpaca (Tests de charge / latence de l'exécution)
+# ==============================================================================
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from config.settings import Config
+
+class SimulatorAPIError(Exception):
+    """Équivalent de alpaca_trade_api.rest.APIError (status_code HTTP)."""
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+
+class SimEntity:
+    """Objet à attributs comme les Entity Alpaca (valeurs brutes dans _raw)."""
+
+    def __init__(self, raw):
+        self._raw = dict(raw)
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["_raw"][name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __repr__(self):
+        return f"SimEntity({self._raw})"
+
+class BrokerSimulator:
+    """
+    Sous-ensemble de l'API REST Alpaca utilisé par ExecutionManager, en mémoire :
+    compte, horloge, positions, ordres (market, notional ou qty), cancel_all et
+    activités FILL (paginées). Utilisable directement (ExecutionManager(api=sim))
+    ou derrière un serveur HTTP localhost (serve()) pour le vrai client REST.
+
+    Comportements configurables :
+    - latency : délai par appel (secondes, ou tuple (min, max) tiré au hasard)
+    - fill_delay : délai entre l'envoi et chaque tranche d'exécution
+    - partial_fill_rate : probabilité qu'un ordre soit exécuté en 2-3 tranches
+    - reject_rate : probabilité de rejet à l'envoi (en plus des rejets métier)
+    - rate_limit : appels max par minute (au-delà : erreur 429, comme Alpaca)
+    - market_open : marché fermé -> les ordres restent 'accepted' sans exécution
+    Les exécutions sont avancées à chaque appel (pas de thread de fond) ;
+    seed fixe -> scénario reproductible.
+    """
+
+    OPEN_STATUS = {"new", "accepted", "partially_filled"}
+
+    def __init__(self, prices, cash=Config.INITIAL_CAPITAL, positions=None, latency=0.0,
+                 fill_delay=0.0, partial_fill_rate=0.0, reject_rate=0.0, rate_limit=None,
+                 market_open=True, seed=42):
+        self.prices = dict(prices)
+        self.cash = float(cash)
+        self.positions = {}  # {symbol: {'qty', 'avg_entry_price'}}
+        for symbol, qty in (positions or {}).items():
+            self.positions[symbol] = {"qty": float(qty), "avg_entry_price": self.prices[symbol]}
+
+        self.latency = latency
+        self.fill_delay = fill_delay
+        self.partial_fill_rate = partial_fill_rate
+        self.reject_rate = reject_rate
+        self.rate_limit = rate_limit
+        self.market_open = market_open
+
+        self.orders = {}       # id -> dict brut (format Alpaca)
+        self.activities = []   # FILL, ordre chronologique
+        self.calls = 0
+        self._schedule = {}    # id -> (tranches restantes [qty], prochaine échéance)
+        self._window = []      # horodatages des appels (rate limit glissant 60s)
+        self._activity_ids = itertools.count(1)
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+
+    # --------------------------------------------------------------------------
+    # MÉCANIQUE INTERNE
+    # --------------------------------------------------------------------------
+    def _enter(self):
+        """Latence + rate limit + avancement des exécutions (chaque appel API)."""
+        latency = self._rng.uniform(*self.latency) if isinstance(self.latency, tuple) else self.latency
+        if latency:
+            time.sleep(latency)
+        with self._lock:
+            now = time.monotonic()
+            self.calls += 1
+            if self.rate_limit:
+                self._window = [t for t in self._window if now - t < 60]
+                if len(self._window) >= self.rate_limit:
+                    raise SimulatorAPIError(429, "rate limit exceeded")
+                self._window.append(now)
+            self._advance(now)
+
+    def _advance(self, now):
+        if not self.market_open:
+            return
+        for order_id, (slices, due) in list(self._schedule.items()):
+            order = self.orders[order_id]
+            while slices and due <= now:
+                self._fill(order, slices.pop(0))
+                due += self.fill_delay
+            if slices:
+                self._schedule[order_id] = (slices, due)
+            else:
+                del self._schedule[order_id]
+
+    def _fill(self, order, qty):
+        symbol, price = order["symbol"], self.prices[order["symbol"]]
+        position = self.positions.setdefault(symbol, {"qty": 0.0, "avg_entry_price": price})
+        value = qty * price
+
+        if order["side"] == "buy":
+            total = position["qty"] + qty
+            position["avg_entry_price"] = (position["avg_entry_price"] * position["qty"] + value) / total
+            position["qty"] = total
+            self.cash -= value
+        else:
+            position["qty"] -= qty
+            self.cash += value
+            if position["qty"] < 1e-9:
+                del self.positions[symbol]
+
+        filled = float(order["filled_qty"]) + qty
+        leaves = max(float(order["qty"]) - filled, 0.0)
+        order["filled_qty"] = str(filled)
+        order["filled_avg_price"] = str(price)
+        order["status"] = "filled" if leaves < 1e-9 else "partially_filled"
+        stamp = self._timestamp()
+        order["updated_at"] = stamp
+        if order["status"] == "filled":
+            order["filled_at"] = stamp
+
+        self.activities.append({
+            "id": f"{stamp.replace(':', '').replace('-', '')}::{next(self._activity_ids):08d}",
+            "activity_type": "FILL",
+            "transaction_time": stamp,
+            "type": "fill" if order["status"] == "filled" else "partial_fill",
+            "price": str(price),
+            "qty": str(qty),
+            "side": order["side"],
+            "symbol": symbol,
+            "leaves_qty": str(leaves),
+            "cum_qty": str(filled),
+            "order_id": order["id"],
+            "order_status": order["status"]
+        })
+
+    def _balances(self):
+        """(cash, equity, buying_power) ; compte cash : les achats en attente sont déduits."""
+        market_value = sum(p["qty"] * self.prices[s] for s, p in self.positions.items())
+        pending = sum((float(o["qty"]) - float(o["filled_qty"])) * self.prices[o["symbol"]]
+                      for o in self.orders.values() if o["side"] == "buy" and o["status"] in self.OPEN_STATUS)
+        return self.cash, self.cash + market_value, max(self.cash - pending, 0.0)
+
+    @staticmethod
+    def _timestamp():
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    # --------------------------------------------------------------------------
+    # API (mêmes noms et paramètres que alpaca_trade_api.rest.REST)
+    # --------------------------------------------------------------------------
+    def get_account(self):
+        self._enter()
+        with self._lock:
+            cash, equity, buying_power = self._balances()
+            return SimEntity({
+                "id": "sim-account",
+                "status": "ACTIVE",
+                "currency": "USD",
+                "cash": str(cash),
+                "equity": str(equity),
+                "portfolio_value": str(equity),
+                "buying_power": str(buying_power)
+            })
+
+    def get_clock(self):
+        self._enter()
+        now = datetime.now(timezone.utc)
+        return SimEntity({
+            "timestamp": now.isoformat(),
+            "is_open": self.market_open,
+            "next_open": (now + timedelta(days=1)).isoformat(),
+            "next_close": (now + timedelta(hours=1)).isoformat()
+        })
+
+    def list_positions(self):
+        self._enter()
+        with self._lock:
+            return [SimEntity({
+                "symbol": s,
+                "qty": str(p["qty"]),
+                "avg_entry_price": str(p["avg_entry_price"]),
+                "current_price": str(self.prices[s]),
+                "market_value": str(p["qty"] * self.prices[s]),
+                "side": "long"
+            }) for s, p in self.positions.items()]
+
+    def submit_order(self, symbol, qty=None, side="buy", type="market", time_in_force="day",
+                     notional=None, client_order_id=None, **kwargs):
+        self._enter()
+        with self._lock:
+            if symbol not in self.prices:
+                raise SimulatorAPIError(422, f"asset {symbol} not found")
+            if type != "market":
+                raise SimulatorAPIError(422, "simulator only supports market orders")
+            if (qty is None) == (notional is None):
+                raise SimulatorAPIError(422, "qty or notional is required")
+            if self._rng.random() < self.reject_rate:
+                raise SimulatorAPIError(403, "order rejected (simulated)")
+
+            price = self.prices[symbol]
+            quantity = float(qty) if qty is not None else float(notional) / price
+            if side == "buy" and quantity * price > self._balances()[2] + 1e-6:
+                raise SimulatorAPIError(403, "insufficient buying power")
+            if side == "sell" and quantity > self.positions.get(symbol, {"qty": 0.0})["qty"] + 1e-9:
+                raise SimulatorAPIError(403, "insufficient qty available for order")
+
+            order_id = str(uuid.UUID(int=self._rng.getrandbits(128)))
+            stamp = self._timestamp()
+            self.orders[order_id] = {
+                "id": order_id,
+                "client_order_id": client_order_id or order_id,
+                "symbol": symbol,
+                "side": side,
+                "type": type,
+                "time_in_force": time_in_force,
+                "qty": str(quantity),
+                "notional": str(notional) if notional is not None else None,
+                "filled_qty": "0",
+                "filled_avg_price": None,
+                "status": "accepted" if not self.market_open else "new",
+                "created_at": stamp,
+                "submitted_at": stamp,
+                "updated_at": stamp,
+                "filled_at": None
+            }
+
+            # Découpage en tranches (exécution partielle)
+            n_slices = self._rng.choice([2, 3]) if self._rng.random() < self.partial_fill_rate else 1
+            cuts = sorted(self._rng.uniform(0.2, 0.8) for _ in range(n_slices - 1))
+            bounds = [0.0] + cuts + [1.0]
+            slices = [quantity * (b - a) for a, b in zip(bounds, bounds[1:])]
+            self._schedule[order_id] = (slices, time.monotonic() + self.fill_delay)
+            self._advance(time.monotonic())
+            return SimEntity(self.orders[order_id])
+
+    def get_order(self, order_id):
+        self._enter()
+        with self._lock:
+            if order_id not in self.orders:
+                raise SimulatorAPIError(404, "order not found")
+            return SimEntity(self.orders[order_id])
+
+    def list_orders(self, status="open", limit=50, **kwargs):
+        self._enter()
+        with self._lock:
+            orders = list(self.orders.values())
+            if status == "open":
+                orders = [o for o in orders if o["status"] in self.OPEN_STATUS]
+            elif status == "closed":
+                orders = [o for o in orders if o["status"] not in self.OPEN_STATUS]
+            return [SimEntity(o) for o in reversed(orders)][:limit]
+
+    def cancel_all_orders(self):
+        self._enter()
+        with self._lock:
+            cancelled = []
+            for order in self.orders.values():
+                if order["status"] in self.OPEN_STATUS:
+                    order["status"] = "canceled"
+                    order["updated_at"] = self._timestamp()
+                    self._schedule.pop(order["id"], None)
+                    cancelled.append(SimEntity({"id": order["id"], "status": 200}))
+            return cancelled
+
+    def get_activities(self, activity_types=None, until=None, after=None, direction="desc",
+                       date=None, page_size=100, page_token=None):
+        """Activités FILL paginées (page_token = id de la dernière activité reçue)."""
+        self._enter()
+        with self._lock:
+            if activity_types not in (None, "FILL") and "FILL" not in activity_types:
+                return []
+            items = list(self.activities)
+            if after:
+                items = [a for a in items if a["transaction_time"] > str(after)]
+            if until:
+                items = [a for a in items if a["transaction_time"] < str(until)]
+            if direction == "desc":
+                items.reverse()
+            if page_token:
+                ids = [a["id"] for a in items]
+                items = items[ids.index(page_token) + 1:] if page_token in ids else []
+            return [SimEntity(a) for a in items[:min(int(page_size), 100)]]
+
+    # --------------------------------------------------------------------------
+    # SERVEUR HTTP (localhost) : même API pour le client REST officiel
+    # --------------------------------------------------------------------------
+    def serve(self, host="127.0.0.1", port=0):
+        """Démarre le serveur en tâche de fond ; retourne (serveur, base_url)."""
+        server = ThreadingHTTPServer((host, port), _make_handler(self))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, f"http://{host}:{server.server_port}"
+
+def _make_handler(sim):
+    routes = [
+        ("GET", r"/v2/account", lambda q, b: sim.get_account()),
+        ("GET", r"/v2/clock", lambda q, b: sim.get_clock()),
+        ("GET", r"/v2/positions", lambda q, b: sim.list_positions()),
+        ("GET", r"/v2/orders", lambda q, b: sim.list_orders(q.get("status", "open"), int(q.get("limit", 50)))),
+        ("POST", r"/v2/orders", lambda q, b: sim.submit_order(**b)),
+        ("DELETE", r"/v2/orders", lambda q, b: sim.cancel_all_orders()),
+        ("GET", r"/v2/orders/(?P<order_id>[^/]+)", lambda q, b, order_id: sim.get_order(order_id)),
+        ("GET", r"/v2/account/activities(?:/(?P<activity_types>[A-Z]+))?",
+         lambda q, b, activity_types=None: sim.get_activities(activity_types or q.get("activity_types"), **{
+             k: q[k] for k in ("until", "after", "direction", "date", "page_size", "page_token") if k in q})),
+    ]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _dispatch(self, method):
+            url = urlsplit(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+            for verb, pattern, handler in routes:
+                match = re.fullmatch(pattern, url.path)
+                if verb == method and match:
+                    try:
+                        result = handler(query, body, **{k: v for k, v in match.groupdict().items() if v})
+                        payload = [r._raw for r in result] if isinstance(result, list) else result._raw
+                        self._reply(207 if method == "DELETE" else 200, payload)
+                    except SimulatorAPIError as e:
+                        self._reply(e.status_code, {"code": e.status_code, "message": str(e)})
+                    except TypeError as e:
+                        self._reply(422, {"code": 422, "message": str(e)})
+                    return
+            self._reply(404, {"code": 404, "message": "endpoint not found"})
+
+        def _reply(self, status, payload):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+        def log_message(self, *args):
+            pass  # Silencieux (benchmarks)
+
+    return Handler
+
+# ==============================================================================
+# BENCHMARK : rebalancing complet sur un univers synthétique
+# ==============================================================================
+def benchmark(symbols=500, latency=0.002, fill_delay=0.05, partial_fill_rate=0.2, reject_rate=0.0):
+    """Rebalance de la moitié de l'univers vers l'autre moitié ; retourne les mesures."""
+    from core.execution import ExecutionManager
+
+    rng = random.Random(7)
+    tickers = [f"SIM{k:05d}" for k in range(symbols)]
+    prices = {t: round(rng.uniform(10, 500), 2) for t in tickers}
+    capital = 1000.0 * symbols
+    held, wanted = tickers[:symbols // 2], tickers[symbols // 2:]
+    positions = {t: (capital / len(held)) / prices[t] for t in held}
+
+    sim = BrokerSimulator(prices, cash=0.0, positions=positions, latency=latency, fill_delay=fill_delay,
+                          partial_fill_rate=partial_fill_rate, reject_rate=reject_rate)
+    orders = [{"ticker": t, "weight": round(0.99 / len(wanted), 6)} for t in wanted]
+
+    start = time.perf_counter()
+    ExecutionManager(api=sim).execute_orders(orders)
+    elapsed = time.perf_counter() - start
+    return {
+        "symbols": symbols,
+        "orders": len(sim.orders),
+        "filled": sum(o["status"] == "filled" for o in sim.orders.values()),
+        "api_calls": sim.calls,
+        "seconds": elapsed,
+        "orders_per_second": len(sim.orders) / elapsed if elapsed else 0.0
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ExecutionManager sur le simulateur local.")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--fill-delay", type=float, default=0.05)
+    parser.add_argument("--partial", type=float, default=0.2)
+    parser.add_argument("--reject", type=float, default=0.0)
+    args = parser.parse_args()
+
+    try:
+        result = benchmark(args.symbols, args.latency, args.fill_delay, args.partial, args.reject)
+        print("\n" + "="*50)
+        print("⏱️ BENCHMARK EXÉCUTION (SIMULATEUR LOCAL)")
+        print("="*50)
+        for key, value in result.items():
+            print(f"{key:<18}: {value:,.2f}" if isinstance(value, float) else f"{key:<18}: {value}")
+    except Exception as e:
+        print(f"❌ Erreur Benchmark : {e}")
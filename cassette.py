@@ -0,0 +1,236 @@
+# ==============================================================================
+# FICHIER : utils/cassette.py
+# ROLE : Enregistrement / Rejeu des services externes (yfinance, Alpaca, Mistral, Discord)
+# ==============================================================================
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import pickle
+import tarfile
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+class CassetteMiss(LookupError):
+    """Appel absent de la cassette en mode rejeu."""
+
+class ReplayedError(RuntimeError):
+    """Erreur enregistrée pendant le run d'origine, relevée à l'identique au rejeu."""
+
+class Cassette:
+    """
+    Cassette = toutes les réponses externes d'un run, dans un fichier JSON gzip.
+    - record : chaque appel part réellement ; réponse (ou erreur) et latence mesurée
+      sont conservées, puis écrites à la fermeture.
+    - replay : aucune connexion ; la réponse enregistrée est rendue après la latence
+      choisie : "recorded" (celle du run enregistré), "x0.5" (facteur), "0.02"
+      (secondes fixes) ou "0" (aucune).
+    Rapprochement : clé exacte (ex : méthode + URL + empreinte du corps), dans l'ordre
+    d'enregistrement ; à défaut, même groupe (ex : méthode + URL, ticker) pour les
+    clés qui dépendent de l'heure (footer Discord, date de début du cache). Une clé
+    épuisée resert sa dernière réponse (polling des statuts d'ordres).
+    L'état local de départ (database/) est archivé à côté de la cassette
+    (snapshot_state) et restauré dans un dossier temporaire au rejeu (restore_state) :
+    chaque rejeu repart du même état, sans toucher à la vraie base.
+    Les DataFrames sont sérialisés par pickle : ne rejouer que ses propres cassettes.
+    """
+
+    MODES = ("record", "replay")
+    STATE_EXCLUDE = {"cassettes", "traces", "benchmarks"}  # Sorties, pas de l'état
+    _active = None
+
+    def __init__(self, path, mode, latency="recorded"):
+        if mode not in self.MODES:
+            raise ValueError(f"Mode de cassette inconnu : {mode}")
+        self.path = os.path.abspath(path)  # Survit au changement de répertoire du rejeu
+        self.mode = mode
+        self.latency = latency
+        self.entries = []
+        self._lock = threading.Lock()
+        self._exact, self._groups, self._last = {}, {}, {}
+        self.stats = {"calls": 0, "exact": 0, "group": 0, "reused": 0, "misses": 0}
+        if mode == "replay":
+            self._load()
+
+    # --------------------------------------------------------------------------
+    # CYCLE DE VIE
+    # --------------------------------------------------------------------------
+    def __enter__(self):
+        Cassette._active = self
+        print(f"📼 [Cassette] {self.mode.upper()} : {self.path}")
+        return self
+
+    def __exit__(self, *exc):
+        Cassette._active = None
+        if self.mode == "record":
+            self.save()
+        else:
+            s = self.stats
+            print(f"📼 [Cassette] Rejeu : {s['calls']} appels ({s['exact']} exacts, {s['group']} par groupe, "
+                  f"{s['reused']} réutilisés, {s['misses']} absents)")
+        return False
+
+    def save(self):
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        document = {"recorded": datetime.now().isoformat(timespec="seconds"), "entries": self.entries}
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump(document, f, separators=(",", ":"))
+        print(f"📼 [Cassette] {len(self.entries)} réponses enregistrées ({os.path.getsize(self.path) / 1024:.0f} Ko)")
+
+    @property
+    def state_path(self):
+        return self.path + ".state.tar.gz"
+
+    def snapshot_state(self, folder="database"):
+        """Archive l'état local avant l'enregistrement (caches, journaux, état de session)."""
+        with tarfile.open(self.state_path, "w:gz") as tar:
+            if os.path.isdir(folder):
+                for name in sorted(os.listdir(folder)):
+                    if name not in self.STATE_EXCLUDE:
+                        tar.add(os.path.join(folder, name))
+        print(f"📼 [Cassette] État initial archivé : {self.state_path}")
+
+    def restore_state(self):
+        """Extrait l'état enregistré dans un dossier temporaire (nouveau répertoire de travail)."""
+        workdir = tempfile.mkdtemp(prefix="aegis_replay_")
+        if os.path.exists(self.state_path):
+            with tarfile.open(self.state_path, "r:gz") as tar:
+                tar.extractall(workdir, filter="data")
+        print(f"📼 [Cassette] État initial restauré dans {workdir}")
+        return workdir
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            self.entries = json.load(f)["entries"]
+        for k, entry in enumerate(self.entries):
+            self._exact.setdefault((entry["service"], entry["key"]), []).append(k)
+            self._groups.setdefault((entry["service"], entry["group"]), []).append(k)
+
+    # --------------------------------------------------------------------------
+    # APPELS
+    # --------------------------------------------------------------------------
+    @classmethod
+    def call(cls, service, key, fn, codec="json", group=None):
+        """fn() en direct hors cassette, enregistré (record) ou rejoué (replay)."""
+        cassette = cls._active
+        if cassette is None:
+            return fn()
+        group = key if group is None else group
+        if cassette.mode == "record":
+            return cassette._record(service, key, group, fn, codec)
+        return cassette._replay(service, key, group)
+
+    def _record(self, service, key, group, fn, codec):
+        start = time.perf_counter()
+        entry = {"service": service, "key": key, "group": group, "codec": codec}
+        try:
+            result = fn()
+            entry["payload"] = self._encode(codec, result)
+            return result
+        except Exception as e:
+            entry["error"] = [type(e).__name__, str(e)]
+            raise
+        finally:
+            entry["latency"] = round(time.perf_counter() - start, 6)
+            with self._lock:
+                self.entries.append(entry)
+
+    def _replay(self, service, key, group):
+        with self._lock:
+            self.stats["calls"] += 1
+            index = self._take(self._exact, (service, key), "exact")
+            if index is None:
+                index = self._take(self._groups, (service, group), "group")
+            if index is None:
+                index = self._last.get((service, group))
+                if index is None:
+                    self.stats["misses"] += 1
+                    raise CassetteMiss(f"{service} {key}")
+                self.stats["reused"] += 1
+            self._last[(service, group)] = index
+            entry = self.entries[index]
+
+        delay = self._delay(entry["latency"])
+        if delay > 0:
+            time.sleep(delay)
+        if "error" in entry:
+            raise ReplayedError(f"{entry['error'][0]} (rejoué) : {entry['error'][1]}")
+        return self._decode(entry["codec"], entry["payload"])
+
+    def _take(self, index, slot, kind):
+        """Prochaine entrée non consommée de la file 'slot' (None si épuisée)."""
+        queue = index.get(slot, [])
+        while queue:
+            k = queue.pop(0)
+            if not self.entries[k].get("_used"):
+                self.entries[k]["_used"] = True
+                self.stats[kind] += 1
+                return k
+        return None
+
+    def _delay(self, recorded):
+        if self.latency == "recorded":
+            return recorded
+        if str(self.latency).startswith("x"):
+            return recorded * float(self.latency[1:])
+        return float(self.latency)
+
+    # --------------------------------------------------------------------------
+    # HTTP (Mistral, Discord, Alpaca via HttpClient)
+    # --------------------------------------------------------------------------
+    @classmethod
+    def http(cls, method, url, kwargs, send):
+        """Requête HTTP passée par la cassette ; clé = méthode + URL + empreinte du corps."""
+        if cls._active is None:
+            return send()
+        body = kwargs.get("json") if kwargs.get("json") is not None else kwargs.get("data")
+        digest = hashlib.sha1(json.dumps(body, sort_keys=True, default=str).encode()).hexdigest()[:12]
+        params = kwargs.get("params")
+        target = f"{method} {url}"
+        query = f"?{json.dumps(params, sort_keys=True, default=str)}" if params else ""
+        try:
+            return cls.call("http", f"{target}{query} #{digest}", send, codec="http", group=target)
+        except (CassetteMiss, ReplayedError) as e:
+            import requests
+            raise requests.ConnectionError(str(e))
+
+    # --------------------------------------------------------------------------
+    # SÉRIALISATION
+    # --------------------------------------------------------------------------
+    @staticmethod
+    def _encode(codec, value):
+        if codec == "json":
+            return value
+        if codec == "pickle":
+            return base64.b64encode(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).decode()
+        if codec == "http":
+            return {"status": value.status_code, "url": value.url, "headers": dict(value.headers),
+                    "body": base64.b64encode(value.content).decode()}
+        raise ValueError(f"Codec inconnu : {codec}")
+
+    @staticmethod
+    def _decode(codec, payload):
+        if codec == "json":
+            return payload
+        if codec == "pickle":
+            return pickle.load(io.BytesIO(base64.b64decode(payload)))
+        if codec == "http":
+            import requests
+            from requests.structures import CaseInsensitiveDict
+            response = requests.Response()
+            response.status_code = payload["status"]
+            response.url = payload["url"]
+            # Corps déjà décodé par requests à l'enregistrement
+            headers = {k: v for k, v in payload["headers"].items()
+                       if k.lower() not in ("content-encoding", "transfer-encoding")}
+            response.headers = CaseInsensitiveDict(headers)
+            response._content = base64.b64decode(payload["body"])
+            response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+            return response
+        raise ValueError(f"Codec inconnu : {codec}")
@@ -0,0 +1,237 @@
+# ==============================================================================
+# FICHIER : daemon.py
+# ROLE : Processus résident (Caches chauds, Déclenchement calendaire, Endpoint de santé)
+# ==============================================================================
+import argparse
+import json
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config.settings import Config
+from utils.market_calendar import MarketCalendar
+from utils.tracing import Tracer
+import main
+
+class SentinelDaemon:
+    """
+    Version résidente de main.py : imports, authentification Alpaca, sessions HTTP,
+    état des indicateurs et panel de prix restent en mémoire d'un cycle à l'autre.
+    - Déclenchement : Config.DAEMON_TRIGGER_LEAD minutes avant la clôture NYSE
+      (séances courtes et jours fériés via MarketCalendar)
+    - Entre deux cycles : rafraîchissement incrémental des données toutes les
+      Config.DAEMON_REFRESH_MINUTES pendant la séance, plus un dernier
+      Config.DAEMON_FINAL_REFRESH secondes avant le déclenchement ; à l'heure dite,
+      il ne reste que le calcul de la stratégie (aucun téléchargement)
+    - GET /health et /status sur Config.DAEMON_HOST:Config.DAEMON_PORT
+    """
+
+    def __init__(self, lead=None, refresh_minutes=None, final_refresh=None, port=None):
+        self.lead = timedelta(minutes=Config.DAEMON_TRIGGER_LEAD if lead is None else lead)
+        self.refresh_every = timedelta(minutes=refresh_minutes or Config.DAEMON_REFRESH_MINUTES)
+        self.final_refresh = timedelta(seconds=Config.DAEMON_FINAL_REFRESH if final_refresh is None else final_refresh)
+        self.port = Config.DAEMON_PORT if port is None else port
+
+        self.stop_event = threading.Event()
+        self.modules = None
+        self.services = {}
+        self.server = None
+        self.status = {
+            "state": "starting", "started": datetime.now(MarketCalendar.TIMEZONE).isoformat(timespec="seconds"),
+            "cycles": 0, "refreshes": 0, "last_refresh": None, "last_cycle": None,
+            "last_decision": None, "next_trigger": None, "last_error": None,
+        }
+        self._last_refresh = None
+        self._retry_at = None    # Rafraîchissement en échec : nouvel essai différé
+        self._cycle_day = None   # Séance déjà traitée (succès ou échec) : un seul essai par jour
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------------------------
+    # DÉMARRAGE (une seule fois)
+    # --------------------------------------------------------------------------
+    def warm_up(self):
+        """Imports lourds, connexions et premier chargement des données."""
+        self.modules = main.load_modules()
+        self.services = {
+            "brain": self.modules["AegisBrain"](),
+            "executor": self.modules["ExecutionManager"](),   # Authentification Alpaca unique
+            "storage": self.modules["StateManager"](),
+            "discord": self.modules["DiscordBot"](),
+        }
+        try:
+            self.refresh()
+        except Exception as e:
+            # La boucle principale retentera (le cycle rechargera lui-même si besoin)
+            print(f"⚠️ [Daemon] Premier chargement des données impossible : {e}")
+            self._retry_at = datetime.now(MarketCalendar.TIMEZONE) + timedelta(minutes=1)
+        self._update(state="idle")
+
+    def refresh(self):
+        """
+        Rafraîchit le panel résident (bougies manquantes uniquement, via le cache
+        disque) et avance l'état des indicateurs : au déclenchement, sync() n'a
+        plus rien à rejouer.
+        """
+        start = time.perf_counter()
+        brain = self.services["brain"]
+        market = brain.prefetch_market()
+        data = market.fetch(brain.feed.tickers, start=market.start, as_panel=True)
+        if data is not None and brain.indicators is not None:
+            brain.indicators.sync(data)
+        self.services["market"] = market
+        self._last_refresh = datetime.now(MarketCalendar.TIMEZONE)
+        self._retry_at = None
+        self._update(refreshes=self.status["refreshes"] + 1, last_refresh=self._last_refresh.isoformat(timespec="seconds"))
+        print(f"🔄 [Daemon] Données rafraîchies en {time.perf_counter() - start:.2f}s.")
+
+    # --------------------------------------------------------------------------
+    # CALENDRIER
+    # --------------------------------------------------------------------------
+    def next_trigger(self, now):
+        """Prochain déclenchement : séance du jour si sa clôture n'est pas passée et le cycle pas fait."""
+        day = now.date()
+        if not MarketCalendar.is_trading_day(day) or now >= MarketCalendar.session_close(day) \
+                or day == self._cycle_day or self.services["brain"].state_manager.already_traded_today():
+            day = MarketCalendar.next_trading_day(day)
+        return MarketCalendar.session_close(day) - self.lead
+
+    def _refresh_due(self, now, trigger):
+        if self._retry_at is not None and now < self._retry_at:
+            return False
+        if self._last_refresh is None:
+            return True
+        # Dernier rafraîchissement juste avant le déclenchement
+        if trigger - self.final_refresh <= now < trigger and self._last_refresh < trigger - self.final_refresh:
+            return True
+        # Rafraîchissement périodique pendant la séance (rien après la clôture)
+        session_open = datetime.combine(now.date(), MarketCalendar.OPEN, tzinfo=MarketCalendar.TIMEZONE)
+        in_session = MarketCalendar.is_trading_day(now.date()) and \
+            session_open <= now < MarketCalendar.session_close(now.date())
+        return in_session and now - self._last_refresh >= self.refresh_every
+
+    # --------------------------------------------------------------------------
+    # BOUCLE PRINCIPALE
+    # --------------------------------------------------------------------------
+    def run_forever(self):
+        self.serve()
+        self.warm_up()
+        print(f"🛰️ [Daemon] Résident. Déclenchement {self.lead.total_seconds() / 60:.0f} min avant la clôture.")
+
+        while not self.stop_event.is_set():
+            now = datetime.now(MarketCalendar.TIMEZONE)
+            trigger = self.next_trigger(now)
+            self._update(state="idle", next_trigger=trigger.isoformat(timespec="seconds"))
+            try:
+                if now >= trigger:
+                    self.cycle(trigger)
+                    continue
+                if self._refresh_due(now, trigger):
+                    self._update(state="refreshing")
+                    self.refresh()
+                    continue
+            except Exception as e:
+                print(f"❌ [Daemon] Erreur : {e}")
+                self._update(last_error=f"{datetime.now().isoformat(timespec='seconds')} {e}")
+                self._retry_at = datetime.now(MarketCalendar.TIMEZONE) + timedelta(minutes=1)
+
+            # Réveil au prochain événement (plafonné pour rester réactif aux signaux)
+            events = [trigger, trigger - self.final_refresh]
+            if self._last_refresh is not None:
+                events.append(self._last_refresh + self.refresh_every)
+            if self._retry_at is not None:
+                events.append(self._retry_at)
+            wake = min((e for e in events if e > now), default=trigger)
+            self.stop_event.wait(min(max((wake - now).total_seconds(), 1.0), 60.0))
+
+        self.shutdown()
+
+    def cycle(self, trigger):
+        """Cycle de décision sur les données et connexions déjà en mémoire."""
+        # Panel trop ancien (dernier rafraîchissement en échec) : le brain recharge lui-même
+        if self._last_refresh is None or self._last_refresh < trigger - 2 * self.final_refresh:
+            print("⚠️ [Daemon] Données résidentes périmées : rechargement pendant le cycle.")
+            self.services.pop("market", None)
+        self._update(state="deciding")
+        self._cycle_day = datetime.now(MarketCalendar.TIMEZONE).date()
+        start = time.perf_counter()
+        print(f"\n⏰ [Daemon] Déclenchement ({datetime.now(MarketCalendar.TIMEZONE):%Y-%m-%d %H:%M %Z})")
+        with Tracer():
+            result = main.run_cycle(self.modules, self.services)
+        elapsed = time.perf_counter() - start
+
+        decision = None
+        if result is not None:
+            regime, orders = result
+            decision = {"regime": regime, "orders": orders}
+        self._update(cycles=self.status["cycles"] + 1, last_decision=decision,
+                     last_cycle={"at": datetime.now(MarketCalendar.TIMEZONE).isoformat(timespec="seconds"),
+                                 "seconds": round(elapsed, 3)})
+
+    # --------------------------------------------------------------------------
+    # SANTÉ / STATUT
+    # --------------------------------------------------------------------------
+    def _update(self, **fields):
+        with self._lock:
+            self.status.update(fields)
+
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps(self.status, default=str))
+
+    def serve(self):
+        """Endpoint local en tâche de fond : /health (léger) et /status (détaillé)."""
+        self.server = ThreadingHTTPServer((Config.DAEMON_HOST, self.port), _make_handler(self))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"🩺 [Daemon] Santé : http://{Config.DAEMON_HOST}:{self.server.server_port}/health")
+
+    def stop(self, *_):
+        self.stop_event.set()
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        print("🛑 [Daemon] Arrêt propre.")
+
+def _make_handler(daemon):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status = daemon.snapshot()
+            if self.path.rstrip("/") == "/health":
+                healthy = status["state"] != "starting" and not daemon.stop_event.is_set()
+                body = {"ok": healthy, "state": status["state"], "next_trigger": status["next_trigger"],
+                        "last_cycle": status["last_cycle"]}
+                code = 200 if healthy else 503
+            elif self.path.rstrip("/") == "/status":
+                body, code = status, 200
+            else:
+                body, code = {"error": "not found"}, 404
+            payload = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass  # Pas de log par requête (sondes de santé fréquentes)
+
+    return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Processus résident du bot (déclenchement avant la clôture).")
+    parser.add_argument("--lead", type=int, help="Minutes avant la clôture (défaut : Config.DAEMON_TRIGGER_LEAD)")
+    parser.add_argument("--refresh", type=int, help="Minutes entre deux rafraîchissements pendant la séance")
+    parser.add_argument("--port", type=int, help="Port de l'endpoint de santé")
+    args = parser.parse_args()
+
+    daemon = SentinelDaemon(lead=args.lead, refresh_minutes=args.refresh, port=args.port)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    try:
+        daemon.run_forever()
+    except KeyboardInterrupt:
+        daemon.stop()
+        daemon.shutdown()
+    except Exception as e:
+        print(f"❌ ERREUR FATALE DAEMON : {e}")
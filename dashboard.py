@@ -2,10 +2,15 @@
 # FICHIER : interfaces/dashboard.py
 # ROLE : Command Center (Interface Web Streamlit)
 # ==============================================================================
+import threading
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import os
+from utils.storage import StateManager
+from utils.visuals import Visualizer
+
+DISPLAY_POINTS = 2000  # Points max par courbe (LTTB au-delà)
+PAGE_SIZE = 100        # Lignes par page du tableau
 
 # Config Page
 st.set_page_config(page_title="AEGIS SENTINEL", page_icon="🛡️", layout="wide")
@@ -14,18 +19,47 @@ st.markdown("""<style>.stApp { background-color: #0E1117; color: white; }</style
 st.title("🛡️ AEGIS SENTINEL : COMMAND CENTER")
 st.markdown("---")
 
-# Chargement Data
-FILE_PATH = "database/history.csv"
+# Chargement Data (même base que le bot : database/history.db)
+@st.cache_resource
+def _history_cache():
+    """Cache partagé entre les reruns : historique + révision de la base lue."""
+    return {"store": StateManager(), "revision": 0, "frame": pd.DataFrame(), "lock": threading.Lock()}
 
-if not os.path.exists(FILE_PATH):
-    st.error("⚠️ En attente de données... Lancez le bot (main.py) une première fois !")
-    st.stop()
+def load_history():
+    """
+    Ne relit la base que si son tampon (dernière révision) a changé,
+    et dans ce cas uniquement les lignes écrites depuis la dernière lecture.
+    """
+    cache = _history_cache()
+    with cache["lock"]:
+        stamp = cache["store"].stamp()
+        if stamp < cache["revision"]:
+            # Base recréée -> relecture complète
+            cache["revision"], cache["frame"] = 0, pd.DataFrame()
+        if stamp != cache["revision"]:
+            new = cache["store"].read_since(cache["revision"]).drop(columns="Revision")
+            frame = cache["frame"]
+            if not frame.empty:
+                # Jours réécrits (upsert) remplacés par leur nouvelle version
+                frame = frame[~frame['Date'].isin(new['Date'])]
+                new = pd.concat([frame, new])
+            cache["frame"] = new.sort_values('Date', ignore_index=True)
+            cache["revision"] = stamp
+        return cache["frame"]
+
+def downsample(dates, values):
+    """Indices à tracer : tous si la série est courte, sinon LTTB (forme préservée)."""
+    values = values.ffill().bfill().fillna(0)
+    return Visualizer.lttb(dates, values, DISPLAY_POINTS)
 
 try:
-    df = pd.read_csv(FILE_PATH)
-    df['Date'] = pd.to_datetime(df['Date'])
+    df = load_history()
 except Exception as e:
-    st.error(f"Erreur de lecture du fichier CSV : {e}")
+    st.error(f"Erreur de lecture de l'historique : {e}")
+    st.stop()
+
+if df.empty:
+    st.error("⚠️ En attente de données... Lancez le bot (main.py) une première fois !")
     st.stop()
 
 # KPIs (Indicateurs Clés)
@@ -43,11 +77,12 @@ col3.metric("📅 Dernière Mise à jour", df['Date'].iloc[-1].strftime("%Y-%m-%
 st.subheader("Performance vs Marché")
 fig = go.Figure()
 
-# Courbe du Bot (Verte)
+# Courbe du Bot (Verte) - marqueurs seulement sur les historiques courts
+idx = downsample(df['Date'], df['Equity'])
 fig.add_trace(go.Scatter(
-    x=df['Date'], 
-    y=df['Equity'], 
-    mode='lines+markers', 
+    x=df['Date'].iloc[idx], 
+    y=df['Equity'].iloc[idx], 
+    mode='lines+markers' if len(df) <= 250 else 'lines', 
     name='AEGIS Bot', 
     line=dict(color='#00ff00', width=3)
 ))
@@ -57,10 +92,11 @@ if 'SPY_Price' in df.columns:
     # On normalise le SPY pour qu'il démarre au même montant que le portefeuille
     spy_start = df['SPY_Price'].iloc[0]
     spy_norm = (df['SPY_Price'] / spy_start) * start_equity
+    idx = downsample(df['Date'], spy_norm)
     
     fig.add_trace(go.Scatter(
-        x=df['Date'], 
-        y=spy_norm, 
+        x=df['Date'].iloc[idx], 
+        y=spy_norm.iloc[idx], 
         mode='lines', 
         name='S&P 500 (Benchmark)', 
         line=dict(color='#888888', width=2, dash='dot') # <--- L'ERREUR ÉTAIT ICI
@@ -74,6 +110,9 @@ fig.update_layout(
 )
 st.plotly_chart(fig, use_container_width=True)
 
-# Historique Brut
+# Historique Brut (paginé : seule la page affichée est envoyée au navigateur)
 with st.expander("📜 Voir l'Historique des Données"):
-    st.dataframe(df.sort_values('Date', ascending=False), use_container_width=True)
\ No newline at end of file
+    pages = max((len(df) - 1) // PAGE_SIZE + 1, 1)
+    page = st.number_input(f"Page (1-{pages}, plus récent en premier)", min_value=1, max_value=pages, value=1)
+    end = len(df) - (page - 1) * PAGE_SIZE
+    st.dataframe(df.iloc[max(end - PAGE_SIZE, 0):end].iloc[::-1], use_container_width=True)
\ No newline at end of file
@@ -2,13 +2,14 @@
 # FICHIER : interfaces/discord_bot.py
 # ROLE : Reporter visuel (Envoie des rapports riches sur Discord)
 # ==============================================================================
-import requests
 import datetime
 from config.settings import Config
+from utils.http_client import HttpClient
 
 class DiscordBot:
     def __init__(self):
         self.webhook_url = Config.DISCORD_WEBHOOK
+        self.http = HttpClient.shared()
 
     def send_embed(self, title, description, color, fields=None):
         """Envoie un message formaté 'Rich Embed'."""
@@ -29,7 +30,7 @@ class DiscordBot:
 
         try:
             payload = {"embeds": [embed]}
-            requests.post(self.webhook_url, json=payload)
+            self.http.post(self.webhook_url, json=payload)
         except Exception as e:
             print(f"❌ [Discord] Erreur d'envoi : {e}")
 
@@ -99,11 +100,10 @@ class DiscordBot:
         if not self.webhook_url: return
 
         try:
-            # On remet le curseur au début du fichier
-            image_buffer.seek(0)
-            files = {'file': ('chart.png', image_buffer, 'image/png')}
+            # Octets plutôt que le buffer : un retry (429) renvoie l'image complète
+            files = {'file': ('chart.png', image_buffer.getvalue(), 'image/png')}
             
             payload = {"content": "📊 **RAPPORT DE PERFORMANCE VISUEL**"}
-            requests.post(self.webhook_url, data=payload, files=files)
+            self.http.post(self.webhook_url, data=payload, files=files)
         except Exception as e:
             print(f"❌ [Discord] Erreur envoi image : {e}")
\ No newline at end of file
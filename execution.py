@@ -3,18 +3,56 @@
 # ROLE : Exécuteur d'Ordres (Alpaca Bridge)
 # ==============================================================================
 import time
-import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from alpaca_trade_api.rest import REST
 from config.settings import Config
+from utils.http_client import HttpClient
+from core.fill_journal import FillJournal
+from utils.tracing import Tracer
+
+class BuyingPowerLedger:
+    """
+    Buying Power local, tenu à jour au fil des exécutions (aucun get_account()
+    avant chaque achat) : les ventes remplies créditent, les achats réservent
+    leur montant à l'envoi et rendent la part non exécutée à la clôture de l'ordre.
+    """
+
+    def __init__(self, buying_power):
+        self.available = buying_power
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Réserve au plus 'amount' ; retourne le montant réellement réservé."""
+        with self._lock:
+            amount = max(min(amount, self.available), 0.0)
+            self.available -= amount
+            return amount
+
+    def credit(self, amount):
+        with self._lock:
+            self.available += amount
 
 class ExecutionManager:
-    def __init__(self):
-        # Connexion API Alpaca
-        self.api = REST(
-            Config.ALPACA_KEY,
-            Config.ALPACA_SECRET,
-            Config.ALPACA_ENDPOINT
-        )
+    # Statuts Alpaca définitifs (plus aucune exécution possible)
+    TERMINAL_STATUS = {"filled", "canceled", "expired", "rejected", "done_for_day", "replaced"}
+
+    def __init__(self, api=None):
+        # api : client compatible REST Alpaca (injectable : stub local pour les tests)
+        if api is None:
+            # Connexion API Alpaca
+            api = REST(
+                Config.ALPACA_KEY,
+                Config.ALPACA_SECRET,
+                Config.ALPACA_ENDPOINT
+            )
+            # Session partagée (keep-alive, retries, latences) ; on coupe le retry
+            # interne d'Alpaca pour ne pas cumuler deux politiques
+            api._session = HttpClient.shared().session
+            api._retry = 0
+        # Chaque appel broker devient une span 'broker.<méthode>' (si le run est tracé)
+        self.api = Tracer.instrument(api, "broker")
+        self.journal = FillJournal()
         try:
             account = self.api.get_account()
             print(f"✅ [Execution] Alpaca connecté. Cash: ${float(account.cash):.2f}")
@@ -40,29 +78,43 @@ class ExecutionManager:
     def get_trade_count(self):
         """Compte le nombre total d'ordres exécutés (FILL) depuis le début."""
         try:
-            # On récupère les activités de type 'FILL' (Ordres remplis)
-            activities = self.api.get_activities(activity_types='FILL')
-            return len(activities)
+            # Seules les activités FILL postérieures au curseur du journal sont téléchargées
+            added = self.journal.sync(self.api)
+            print(f"📒 [Execution] Journal des fills : +{added} ({self.journal.trade_count()} au total)")
         except Exception as e:
-            print(f"⚠️ Impossible de compter les trades: {e}")
-            return 0
+            print(f"⚠️ Synchronisation du journal impossible (comptage local): {e}")
+        return self.journal.trade_count()
 
     def execute_orders(self, orders):
         """
         Transforme le plan de bataille (Target Weights) en ordres réels.
+        Pipeline piloté par les statuts d'ordres (aucune pause fixe) :
+        annulation -> ventes en parallèle -> attente des fills -> achats en parallèle.
+        La durée du rebalancing ne dépend que du temps d'exécution du broker.
         """
         print("\n⚙️ [Execution] Démarrage du Rebalancing...")
-        
+        start = time.perf_counter()
+        pool = ThreadPoolExecutor(max_workers=Config.EXECUTION_WORKERS)
+        try:
+            self._rebalance(orders, pool)
+        finally:
+            pool.shutdown(wait=True)
+        print(f"⏱️ [Execution] Rebalancing terminé en {time.perf_counter() - start:.2f}s.")
+
+    def _rebalance(self, orders, pool):
         # --- ETAPE CRITIQUE : NETTOYAGE ---
         # On annule tous les ordres en attente pour libérer le Buying Power
         try:
             self.api.cancel_all_orders()
-            print("🧹 [Execution] Ordres précédents annulés (Buying Power libéré).")
-            time.sleep(2) # On laisse 2 sec à Alpaca pour mettre à jour le solde
+            # On attend la confirmation réelle des annulations (plus de sleep fixe)
+            if self._wait_until(lambda: not self.api.list_orders(status='open')):
+                print("🧹 [Execution] Ordres précédents annulés (Buying Power libéré).")
+            else:
+                print("⚠️ [Execution] Annulations non confirmées dans le délai imparti.")
         except Exception as e:
             print(f"⚠️ Erreur Annulation Ordres: {e}")
 
-        # 1. Récupération État Actuel
+        # 1. Récupération État Actuel (une seule fois : le ledger prend le relais)
         try:
             positions = self.api.list_positions()
             account = self.api.get_account()
@@ -77,6 +129,8 @@ class ExecutionManager:
             print(f"❌ Erreur compte: {e}")
             return
 
+        ledger = BuyingPowerLedger(buying_power)
+
         # Conversion positions actuelles en dictionnaire {Symbol: Valeur_Dollars}
         current_holdings = {p.symbol: float(p.market_value) for p in positions}
         
@@ -89,11 +143,12 @@ class ExecutionManager:
         # ---------------------------------------------------------
         # ÉTAPE A : VENTES (D'abord on vend pour libérer du cash)
         # ---------------------------------------------------------
+        sells = []
         for symbol, current_val in current_holdings.items():
             # Cas 1: L'actif n'est plus dans le plan -> On vend tout
             if symbol not in targets and symbol != Config.CASH_SYMBOL:
                 print(f"🔻 VENTE TOTALE : {symbol} (Sortie de stratégie)")
-                self._submit_order(symbol, qty=0, notional=current_val, side='sell')
+                sells.append((symbol, current_val))
                 continue
             
             # Cas 2: L'actif est là mais on doit réduire la taille
@@ -102,13 +157,16 @@ class ExecutionManager:
                 if current_val > target_val * 1.05: # Marge de 5%
                     diff = current_val - target_val
                     print(f"🔻 RÉDUCTION : {symbol} (-${diff:.2f})")
-                    self._submit_order(symbol, qty=0, notional=diff, side='sell')
+                    sells.append((symbol, diff))
 
-        time.sleep(2) # Pause post-vente
+        # Ventes indépendantes -> envoi simultané, puis attente des fills
+        submitted = pool.map(lambda s: self._submit_order(s[0], qty=0, notional=s[1], side='sell'), sells)
+        self._await_orders([o for o in submitted if o is not None], ledger, pool)
 
         # ---------------------------------------------------------
         # ÉTAPE B : ACHATS
         # ---------------------------------------------------------
+        buys = []
         for symbol, target_val in targets.items():
             if symbol == Config.CASH_SYMBOL: continue 
 
@@ -118,32 +176,86 @@ class ExecutionManager:
             if current_val < target_val * 0.95:
                 diff = target_val - current_val
                 
-                # Vérification finale du Buying Power disponible
-                try:
-                    acct = self.api.get_account()
-                    bp = float(acct.buying_power)
-                    if diff > bp:
-                        print(f"⚠️ Ajustement Achat {symbol} : ${diff:.2f} -> ${bp:.2f} (Limite Buying Power)")
-                        diff = bp * 0.95 # On prend une marge de sécu
-                except:
-                    pass
+                # Vérification du Buying Power disponible (ledger local)
+                if diff > ledger.available:
+                    print(f"⚠️ Ajustement Achat {symbol} : ${diff:.2f} -> ${ledger.available:.2f} (Limite Buying Power)")
+                    diff = ledger.available * 0.95 # On prend une marge de sécu
 
                 if diff > 10: # On n'achète pas des miettes en dessous de 10$
                     print(f"🚀 ACHAT : {symbol} (+${diff:.2f})")
-                    self._submit_order(symbol, qty=0, notional=diff, side='buy')
+                    buys.append((symbol, ledger.reserve(diff)))
+
+        submitted = list(pool.map(lambda b: self._submit_order(b[0], qty=0, notional=b[1], side='buy'), buys))
+        # Ordre refusé à l'envoi -> réservation rendue
+        for (symbol, reserved), order in zip(buys, submitted):
+            if order is None:
+                ledger.credit(reserved)
+        self._await_orders([o for o in submitted if o is not None], ledger, pool)
 
     def _submit_order(self, symbol, qty, notional, side):
-        """Helper pour envoyer l'ordre."""
+        """Helper pour envoyer l'ordre. Retourne l'ordre Alpaca (None si non envoyé)."""
         try:
-            if notional < 1: return 
+            if notional < 1: return None
             
-            self.api.submit_order(
+            return self.api.submit_order(
                 symbol=symbol,
                 notional=round(notional, 2),
                 side=side,
                 type='market',
                 time_in_force='day'
             )
-            time.sleep(0.5) 
         except Exception as e:
-            print(f"❌ Erreur Ordre {symbol}: {e}")
\ No newline at end of file
+            print(f"❌ Erreur Ordre {symbol}: {e}")
+            return None
+
+    def _await_orders(self, submitted, ledger, pool):
+        """
+        Suit les ordres jusqu'à leur statut définitif (polling des statuts réels)
+        et répercute chaque exécution dans le ledger :
+        vente remplie -> crédit ; achat clôturé -> restitution de la part non exécutée.
+        """
+        tracked = {o.id: {"order": o, "filled": 0.0} for o in submitted}
+        pending = set(tracked)
+
+        def poll():
+            if not pending:
+                return True
+            for order in pool.map(self._refresh_order, list(pending)):
+                if order is None:
+                    continue
+                entry = tracked[order.id]
+                filled = float(order.filled_qty or 0) * float(order.filled_avg_price or 0)
+                if order.side == 'sell':
+                    ledger.credit(filled - entry["filled"])
+                entry["filled"] = filled
+
+                if order.status in self.TERMINAL_STATUS:
+                    pending.discard(order.id)
+                    if order.side == 'buy':
+                        ledger.credit(max(float(entry["order"].notional) - filled, 0.0))
+                    if order.status != 'filled':
+                        print(f"⚠️ [Execution] Ordre {order.symbol} {order.status} "
+                              f"(${filled:.2f} exécutés)")
+            return not pending
+
+        if not self._wait_until(poll):
+            symbols = ", ".join(tracked[i]["order"].symbol for i in pending)
+            print(f"⚠️ [Execution] Ordres toujours en cours après {Config.ORDER_FILL_TIMEOUT}s : {symbols}")
+
+    def _refresh_order(self, order_id):
+        try:
+            return self.api.get_order(order_id)
+        except Exception as e:
+            print(f"⚠️ Suivi ordre {order_id} impossible : {e}")
+            return None
+
+    @staticmethod
+    def _wait_until(condition, timeout=None):
+        """Évalue condition() jusqu'à True ou expiration (Config.ORDER_FILL_TIMEOUT)."""
+        deadline = time.monotonic() + (timeout or Config.ORDER_FILL_TIMEOUT)
+        while True:
+            if condition():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(Config.ORDER_POLL_INTERVAL)
\ No newline at end of file
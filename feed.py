@@ -1,52 +1,220 @@
 import yfinance as yf
 import pandas as pd
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from config.settings import Config
+from data.market_cache import MarketCache
+from data.price_panel import PricePanel
+from utils.cassette import Cassette
 
 class DataFeed:
-    def __init__(self):
+    def __init__(self, use_cache=True):
         self.tickers = Config.FULL_UNIVERSE
         self.max_retries = 3
+        self.missing = []  # Tickers en échec au dernier chargement (jamais masqués)
+        # Cache disque OHLCV (seul l'intervalle journalier est mis en cache)
+        self.cache = MarketCache() if use_cache else None
 
-    def fetch_market_data(self, period="2y", interval="1d"):
-        print(f"📥 [DataFeed] Téléchargement de {len(self.tickers)} actifs sur {period}...")
-        
+    def fetch_market_data(self, period="2y", interval="1d", start=None, refresh=True, as_panel=False, tickers=None):
+        """
+        Retourne {"close", "high", "low", ...} (DataFrames Date x Ticker),
+        ou un PricePanel NumPy si as_panel=True.
+        En journalier, les données viennent du cache local ; refresh=False
+        n'interroge le réseau que pour les tickers absents du cache.
+        tickers : sous-ensemble à charger (self.tickers par défaut).
+        """
+        tickers = list(tickers or self.tickers)
+        self.missing = []
+        if as_panel:
+            data = self.fetch_market_data(period, interval, start, refresh, tickers=tickers)
+            return PricePanel.from_frames(data) if data is not None else None
+
+        if self.cache is not None and interval == "1d":
+            return self._fetch_cached(period, start, refresh, tickers)
+
+        label = f"depuis {start}" if start else f"sur {period}"
+        print(f"📥 [DataFeed] Téléchargement de {len(tickers)} actifs {label}...")
+
+        frames = self._download(tickers, period=period, interval=interval, start=start)
+        if not frames:
+            return None
+
+        # ffill uniquement (jours fériés) : un ticker absent reste absent
+        data = {}
+        for field in ["close", "high", "low"]:
+            data[field] = pd.DataFrame({t: f[field] for t, f in frames.items()}).sort_index().ffill()
+
+        print(f"✅ [DataFeed] Données reçues.")
+        return data
+
+    def _download(self, tickers, period=None, interval="1d", start=None, allow_empty=False):
+        """
+        Téléchargement concurrent : l'univers est découpé en shards traités par un
+        pool borné (Config.DATA_WORKERS), chaque shard envoyant toutes ses requêtes
+        d'un coup : jusqu'à DATA_WORKERS x DATA_SHARD_SIZE tickers, la latence est
+        celle d'une seule requête. Seuls les tickers en échec sont retentés
+        (backoff exponentiel + jitter). Retourne {ticker: DataFrame OHLCV}, ou None
+        si rien n'a pu être obtenu. Les échecs définitifs sont listés dans self.missing.
+        allow_empty : réponse vide = pas de nouvelle bougie (ni retry, ni échec).
+        """
+        frames, pending = {}, list(dict.fromkeys(tickers))
         for i in range(self.max_retries):
-            try:
-                # On laisse yfinance gérer sa session interne (plus robuste)
-                raw_data = yf.download(
-                    tickers=self.tickers, 
-                    period=period, 
-                    interval=interval, 
-                    group_by='column', 
-                    auto_adjust=True, 
-                    progress=False,
-                    threads=False 
-                )
-                
-                if raw_data is None or raw_data.empty:
-                    raise ValueError("Le DataFrame est vide.")
-
-                raw_data = raw_data.ffill().bfill()
-
-                # Extraction robuste des colonnes
-                if isinstance(raw_data.columns, pd.MultiIndex):
-                    closes = raw_data.xs('Close', axis=1, level=0)
-                    highs = raw_data.xs('High', axis=1, level=0)
-                    lows = raw_data.xs('Low', axis=1, level=0)
+            if i:
+                delay = Config.DATA_RETRY_BACKOFF * 2 ** (i - 1)
+                print(f"⚠️ [DataFeed] {len(pending)} tickers en échec, nouvel essai dans {delay:.0f}s "
+                      f"(Tentative {i+1}/{self.max_retries})")
+                time.sleep(delay * random.uniform(1.0, 1.5))
+
+            size = Config.DATA_SHARD_SIZE
+            shards = [pending[k:k + size] for k in range(0, len(pending), size)]
+            failed = []
+            with ThreadPoolExecutor(max_workers=min(Config.DATA_WORKERS, len(shards))) as pool:
+                for shard_frames, shard_failed in pool.map(
+                        lambda shard: self._download_shard(shard, period, interval, start, allow_empty), shards):
+                    frames.update(shard_frames)
+                    failed += shard_failed
+
+            pending = failed
+            if not pending:
+                break
+
+        if pending:
+            self.missing = sorted(set(self.missing) | set(pending))
+            print(f"❌ [DataFeed] {len(pending)} tickers manquants : {', '.join(sorted(pending))}")
+        if not frames and not allow_empty:
+            return None
+        return frames
+
+    def _download_shard(self, tickers, period, interval, start, allow_empty):
+        """
+        Un shard = un lot de requêtes simultanées, une par ticker. Yahoo n'a pas
+        d'historique multi-symboles : yf.download boucle lui-même sur
+        Ticker.history et rassemble le lot dans un état global du module
+        (yfinance.shared), écrasé par deux appels concurrents. Retourne (frames, échecs).
+        """
+        frames, failed = {}, []
+        with ThreadPoolExecutor(max_workers=len(tickers)) as pool:
+            results = pool.map(lambda t: self._download_one(t, period, interval, start), tickers)
+            for ticker, (hist, error) in zip(tickers, results):
+                if error is not None:
+                    print(f"⚠️ [DataFeed] Erreur {ticker} : {error}")
+                    failed.append(ticker)
+                elif hist is None or hist.empty:
+                    if not allow_empty:
+                        failed.append(ticker)
                 else:
-                    closes = raw_data['Close'].to_frame(self.tickers[0])
-                    highs = raw_data['High'].to_frame(self.tickers[0])
-                    lows = raw_data['Low'].to_frame(self.tickers[0])
-
-                print(f"✅ [DataFeed] Données reçues.")
-                return {"close": closes, "high": highs, "low": lows}
-
-            except Exception as e:
-                print(f"⚠️ [DataFeed] Erreur (Tentative {i+1}/{self.max_retries}): {e}")
-                time.sleep(5)
-        
-        return None
+                    frames[ticker] = self._history_frame(hist)
+        return frames, failed
+
+    @staticmethod
+    def _download_one(ticker, period, interval, start):
+        """(historique, None) ou (None, exception) : un échec n'interrompt pas le shard."""
+        try:
+            return Cassette.call(
+                "yfinance.history", f"{ticker}|{period}|{start}|{interval}",
+                lambda: yf.Ticker(ticker).history(
+                    period=None if start else period,
+                    start=start,
+                    interval=interval,
+                    auto_adjust=True
+                ),
+                codec="pickle", group=ticker
+            ), None
+        except Exception as e:
+            return None, e
+
+    # --------------------------------------------------------------------------
+    # CACHE INCRÉMENTAL
+    # --------------------------------------------------------------------------
+    @staticmethod
+    def _period_start(period):
+        """Convertit une période yfinance ('5d', '6mo', '2y', 'ytd', 'max') en date de début."""
+        today = pd.Timestamp.today().normalize()
+        if period in (None, "max"):
+            return None
+        if period == "ytd":
+            return pd.Timestamp(year=today.year, month=1, day=1)
+        if period.endswith("mo"):
+            return today - pd.DateOffset(months=int(period[:-2]))
+        if period.endswith("y"):
+            return today - pd.DateOffset(years=int(period[:-1]))
+        if period.endswith("d"):
+            return today - pd.offsets.BDay(int(period[:-1]))
+        raise ValueError(f"Période inconnue : {period}")
+
+    @staticmethod
+    def _history_frame(hist):
+        """Colonnes OHLCV en minuscules, index sans fuseau (comme yf.download)."""
+        fields = {"Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"}
+        frame = hist[[c for c in fields if c in hist.columns]].rename(columns=fields)
+        index = pd.DatetimeIndex(frame.index)
+        frame.index = index.tz_localize(None) if index.tz is not None else index
+        return frame
+
+    def _refresh_cache(self, tickers, start, refresh=True):
+        """Télécharge uniquement les bougies manquantes puis les fusionne dans le cache."""
+        full_refresh = []
+        incremental = {}  # date de reprise -> [tickers]
+
+        for ticker in tickers:
+            resume = self.cache.resume_date(ticker)
+            covered = self.cache.coverage(ticker)
+            if resume is None or covered is None or (start is not None and start < covered):
+                full_refresh.append(ticker)
+            elif refresh:
+                incremental.setdefault(resume, []).append(ticker)
+
+        # 1. Mises à jour incrémentales (on re-télécharge depuis l'avant-dernière
+        #    bougie : la complète sert à détecter un ajustement dividende/split,
+        #    la dernière, peut-être partielle, est remplacée)
+        for resume, group in incremental.items():
+            frames = self._download(group, start=resume.strftime("%Y-%m-%d"), allow_empty=True)
+            for ticker, frame in frames.items():
+                if not self.cache.merge(ticker, frame):
+                    print(f"♻️ [DataFeed] Historique ajusté pour {ticker} : rechargement complet.")
+                    full_refresh.append(ticker)
+
+        # 2. Téléchargements complets (nouveau ticker, fenêtre élargie, ajustement)
+        if full_refresh:
+            label = f"depuis {start.date()}" if start is not None else "(historique complet)"
+            print(f"📥 [DataFeed] Téléchargement complet de {len(full_refresh)} actifs {label}...")
+            frames = self._download(
+                full_refresh,
+                period="max",
+                start=start.strftime("%Y-%m-%d") if start is not None else None
+            )
+            for ticker, frame in (frames or {}).items():
+                self.cache.replace(ticker, frame, covered_from=start)
+
+    def _fetch_cached(self, period, start=None, refresh=True, tickers=None):
+        tickers = tickers or self.tickers
+        start = pd.Timestamp(start) if start else self._period_start(period)
+        self._refresh_cache(tickers, start, refresh)
+
+        frames = {}
+        for ticker in sorted(tickers):
+            frame = self.cache.load(ticker, start=start)
+            if frame is not None and not frame.empty:
+                frames[ticker] = frame
+
+        if not frames:
+            print("❌ [DataFeed] Aucune donnée disponible (cache vide).")
+            return None
+
+        # Tickers sans aucune donnée (échec réseau et absents du cache) : signalés
+        absent = [t for t in sorted(tickers) if t not in frames]
+        if absent:
+            print(f"⚠️ [DataFeed] Exclus (aucune donnée) : {', '.join(absent)}")
+
+        # ffill uniquement : pas d'historique inventé avant la cotation d'un ticker
+        data = {}
+        for field in ["close", "high", "low", "open"]:
+            wide = pd.DataFrame({t: f[field] for t, f in frames.items()})
+            data[field] = wide.sort_index().ffill()
+
+        print(f"✅ [DataFeed] Données prêtes ({len(frames)} actifs, cache local).")
+        return data
 
     def get_latest_prices(self):
         data = self.fetch_market_data(period="5d")
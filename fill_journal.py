@@ -0,0 +1,137 @@
+# ==============================================================================
+# FICHIER : core/fill_journal.py
+# ROLE : Journal local des exécutions (FILL) synchronisé par curseur
+# ==============================================================================
+import json
+import os
+from datetime import datetime, timedelta
+
+class FillJournal:
+    """
+    Copie locale, en ajout seul (JSON lines), des activités FILL du compte Alpaca.
+    Chaque run ne télécharge que les activités postérieures au curseur
+    (dernière transaction connue), page par page ; les requêtes (nombre de trades,
+    turnover, P&L réalisé) sont ensuite servies sans appel réseau.
+    """
+
+    PAGE_SIZE = 100  # Maximum accepté par Alpaca
+
+    def __init__(self, filename="database/fills.jsonl"):
+        self.filename = filename
+        self._valid_end = None  # Fin de la dernière ligne complète si une fin tronquée suit
+        self.fills = self._load()
+        self._ids = {f["id"] for f in self.fills}
+
+    def _load(self):
+        if not os.path.exists(self.filename):
+            return []
+        fills, end = [], 0
+        with open(self.filename, "rb") as f:
+            for line in f:
+                # Dernière ligne tronquée (crash pendant l'écriture) : ignorée, et
+                # coupée avant le prochain ajout (ses FILL seront re-téléchargés)
+                if not line.endswith(b"\n"):
+                    self._valid_end = end
+                    break
+                try:
+                    fills.append(json.loads(line))
+                except json.JSONDecodeError:
+                    self._valid_end = end
+                    break
+                end += len(line)
+        return fills
+
+    @property
+    def cursor(self):
+        """Horodatage de la dernière transaction journalisée (None si vide)."""
+        return self.fills[-1]["transaction_time"] if self.fills else None
+
+    # --------------------------------------------------------------------------
+    # SYNCHRONISATION
+    # --------------------------------------------------------------------------
+    def sync(self, api):
+        """
+        Ajoute au journal les FILL postérieurs au curseur (pagination page_token).
+        Les activités de même horodatage que le curseur sont redemandées puis
+        dédoublonnées par id. Retourne le nombre de nouvelles exécutions.
+        """
+        new, page_token = [], None
+        while True:
+            page = api.get_activities(
+                activity_types="FILL", after=self._after(), direction="asc",
+                page_size=self.PAGE_SIZE, page_token=page_token
+            )
+            for activity in page:
+                raw = getattr(activity, "_raw", activity)
+                if raw["id"] not in self._ids:
+                    self._ids.add(raw["id"])
+                    new.append(raw)
+            if len(page) < self.PAGE_SIZE:
+                break
+            page_token = getattr(page[-1], "_raw", page[-1])["id"]
+
+        if new:
+            new.sort(key=lambda a: (a["transaction_time"], a["id"]))
+            self._append(new)
+            self.fills.extend(new)
+        return len(new)
+
+    def _after(self):
+        # 'after' est strict chez Alpaca : on recule d'une milliseconde pour
+        # ne pas perdre une exécution partageant l'horodatage du curseur
+        if self.cursor is None:
+            return None
+        stamp = datetime.fromisoformat(self.cursor.replace("Z", "+00:00"))
+        return (stamp - timedelta(milliseconds=1)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    def _append(self, fills):
+        folder = os.path.dirname(self.filename)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        if self._valid_end is not None:
+            with open(self.filename, "r+b") as f:
+                f.truncate(self._valid_end)
+            self._valid_end = None
+        with open(self.filename, "a") as f:
+            for fill in fills:
+                f.write(json.dumps(fill) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    # --------------------------------------------------------------------------
+    # REQUÊTES LOCALES
+    # --------------------------------------------------------------------------
+    def _since(self, since):
+        if since is None:
+            return self.fills
+        since = str(since)
+        return [f for f in self.fills if f["transaction_time"] >= since]
+
+    def trade_count(self, since=None):
+        """Nombre d'exécutions (FILL et fills partiels), comme len(get_activities('FILL'))."""
+        return len(self._since(since))
+
+    def turnover(self, since=None):
+        """Volume échangé en dollars (achats + ventes)."""
+        return sum(float(f["qty"]) * float(f["price"]) for f in self._since(since))
+
+    def realized_pnl(self, since=None):
+        """
+        P&L réalisé au coût moyen pondéré. Tout le journal est rejoué pour les
+        coûts d'entrée ; seules les ventes postérieures à 'since' sont comptées.
+        """
+        positions = {}  # {symbol: [qty, coût moyen]}
+        pnl = 0.0
+        since = str(since) if since is not None else None
+        for fill in self.fills:
+            qty, price = float(fill["qty"]), float(fill["price"])
+            held = positions.setdefault(fill["symbol"], [0.0, 0.0])
+            if fill["side"] == "buy":  # 'sell' / 'sell_short' sinon
+                total = held[0] + qty
+                held[1] = (held[0] * held[1] + qty * price) / total if total else 0.0
+                held[0] = total
+            else:
+                if since is None or fill["transaction_time"] >= since:
+                    pnl += min(qty, held[0]) * (price - held[1])
+                held[0] = max(held[0] - qty, 0.0)
+        return pnl
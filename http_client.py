@@ -0,0 +1,191 @@
+# ==============================================================================
+# FICHIER : utils/http_client.py
+# ROLE : Client HTTP partagé (Pool de connexions, Retries, Latences par endpoint)
+# ==============================================================================
+import math
+import random
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import Config
+from utils.cassette import Cassette
+
+class _PooledSession(requests.Session):
+    """
+    Session requests dont chaque appel passe par la politique du HttpClient
+    (retries, limite par hôte, chronométrage). Peut être injectée telle quelle
+    dans un client tiers (ex : REST Alpaca) qui utilise session.request().
+    """
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+
+    def request(self, method, url, **kwargs):
+        return self.client._send(super().request, method, url, **kwargs)
+
+class HttpClient:
+    """
+    Une seule session par processus : la poignée de main TCP+TLS n'est payée
+    qu'une fois par hôte (keep-alive). Politique commune à Mistral, Discord et Alpaca :
+    - Timeout par défaut (Config.HTTP_TIMEOUT) si l'appelant n'en donne pas
+    - Retries sur 429/5xx avec backoff exponentiel + jitter (Retry-After respecté)
+    - Sémaphore par hôte (Config.HTTP_MAX_PER_HOST appels simultanés)
+    - Histogramme des latences par endpoint (report() en fin de run)
+    Les POST ne sont rejoués que sur 429 (requête refusée, donc non traitée),
+    sauf retry_unsafe=True (appels sans effet de bord, ex : Mistral).
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+    IDEMPOTENT = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)  # Secondes
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, timeout=None, retries=None, backoff=None, backoff_max=None, per_host=None):
+        self.timeout = timeout or Config.HTTP_TIMEOUT
+        self.retries = Config.HTTP_RETRIES if retries is None else retries
+        self.backoff = backoff or Config.HTTP_BACKOFF
+        self.backoff_max = backoff_max or Config.HTTP_BACKOFF_MAX
+        self.per_host = per_host or Config.HTTP_MAX_PER_HOST
+
+        self.session = _PooledSession(self)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=self.per_host)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._hosts = {}      # hôte -> BoundedSemaphore
+        self._latency = {}    # endpoint -> {'count', 'total', 'retries', 'buckets'}
+
+    @classmethod
+    def shared(cls):
+        """Instance unique du processus (toutes les intégrations la partagent)."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    # --------------------------------------------------------------------------
+    # REQUÊTES
+    # --------------------------------------------------------------------------
+    def get(self, url, **kwargs):
+        return self.session.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.session.request("POST", url, **kwargs)
+
+    def _send(self, send, method, url, **kwargs):
+        """Point d'entrée de _PooledSession : passe par la cassette si un run est enregistré/rejoué."""
+        method = method.upper()
+        return Cassette.http(method, url, kwargs, lambda: self._send_with_retries(send, method, url, **kwargs))
+
+    def _send_with_retries(self, send, method, url, retry_unsafe=False, endpoint=None, **kwargs):
+        """Boucle de retry autour d'un envoi unitaire."""
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc
+        endpoint = endpoint or self.endpoint_name(method, url)
+        safe = retry_unsafe or method in self.IDEMPOTENT
+
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            self._rewind(kwargs)
+            start = time.perf_counter()
+            try:
+                with self._semaphore(host):
+                    response = send(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._observe(endpoint, time.perf_counter() - start, attempt)
+                # Connexion jamais établie -> rejouable même pour un POST
+                if last or not (safe or isinstance(e, requests.ConnectTimeout)):
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+
+            self._observe(endpoint, time.perf_counter() - start, attempt)
+            retryable = response.status_code == 429 or (safe and response.status_code in self.RETRY_STATUS)
+            if last or not retryable:
+                return response
+            time.sleep(self._delay(attempt, response))
+            response.close()  # Rend la connexion au pool
+
+    @staticmethod
+    def _rewind(kwargs):
+        """Remet au début les fichiers envoyés (un essai précédent les a lus jusqu'au bout)."""
+        files = kwargs.get("files") or {}
+        # {champ: fichier | (nom, fichier, ...)} ou [(champ, fichier | (nom, fichier, ...))]
+        entries = files.values() if isinstance(files, dict) else [value for _, value in files]
+        for entry in entries:
+            body = entry[1] if isinstance(entry, (list, tuple)) else entry
+            if hasattr(body, "seek"):
+                body.seek(0)
+
+    def _semaphore(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.per_host)
+            return self._hosts[host]
+
+    def _delay(self, attempt, response=None):
+        """Retry-After du serveur si présent, sinon backoff exponentiel 'full jitter'."""
+        if response is not None:
+            try:
+                return min(float(response.headers.get("Retry-After")), self.backoff_max)
+            except (TypeError, ValueError):
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def endpoint_name(method, url):
+        """'POST api.mistral.ai/v1/chat/completions' ; ids et jetons masqués ({id})."""
+        parts = urlsplit(url)
+        segments = [
+            s if re.fullmatch(r"v\d+", s) or not (re.search(r"\d", s) or len(s) > 24) else "{id}"
+            for s in parts.path.split("/")
+        ]
+        return f"{method} {parts.netloc}{'/'.join(segments)}"
+
+    # --------------------------------------------------------------------------
+    # LATENCES
+    # --------------------------------------------------------------------------
+    def _observe(self, endpoint, seconds, attempt):
+        with self._lock:
+            stats = self._latency.setdefault(
+                endpoint, {"count": 0, "total": 0.0, "retries": 0, "buckets": [0] * len(self.BUCKETS)}
+            )
+            stats["count"] += 1
+            stats["total"] += seconds
+            stats["retries"] += attempt > 0
+            stats["buckets"][next(k for k, b in enumerate(self.BUCKETS) if seconds <= b)] += 1
+
+    def latency_stats(self):
+        """{endpoint: {'count', 'mean', 'p50', 'p95', 'retries', 'buckets'}} (quantiles = borne du bucket)."""
+        with self._lock:
+            snapshot = {e: dict(s, buckets=list(s["buckets"])) for e, s in self._latency.items()}
+
+        result = {}
+        for endpoint, s in snapshot.items():
+            cumulative = [sum(s["buckets"][:k + 1]) for k in range(len(self.BUCKETS))]
+            quantile = lambda q: next(b for b, c in zip(self.BUCKETS, cumulative) if c >= q * s["count"])
+            result[endpoint] = {
+                "count": s["count"],
+                "mean": s["total"] / s["count"],
+                "p50": quantile(0.50),
+                "p95": quantile(0.95),
+                "retries": s["retries"],
+                "buckets": dict(zip(self.BUCKETS, s["buckets"]))
+            }
+        return result
+
+    def report(self):
+        stats = self.latency_stats()
+        if not stats:
+            return
+        print("\n🌐 [HTTP] Latences par endpoint :")
+        for endpoint, s in sorted(stats.items()):
+            print(f"   > {endpoint} : {s['count']} appels | moy {s['mean'] * 1000:.0f} ms | "
+                  f"p50 ≤ {s['p50']:g}s | p95 ≤ {s['p95']:g}s | retries {s['retries']}")
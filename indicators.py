@@ -0,0 +1,241 @@
+# ==============================================================================
+# FICHIER : core/indicators.py
+# ROLE : État incrémental des indicateurs (mise à jour O(1) par nouvelle bougie)
+# ==============================================================================
+import os
+import numpy as np
+import pandas as pd
+from config.settings import Config
+from config.strategies import StrategyConfig
+
+class IndicatorState:
+    """
+    Remplace les recalculs complets (rolling sur 2 ans) par un état persistant :
+    - Buffer circulaire des clôtures [capacité x tickers]
+    - Somme glissante pour la SMA 200
+    - Accumulateurs de Welford glissants pour la volatilité des rendements
+    Chaque update() coûte O(tickers), indépendamment de la longueur d'historique.
+    Les tickers sont traités en colonnes NumPy (aucune boucle Python par ticker).
+    """
+
+    SMA_WINDOW = 200
+    MAX_WINDOW = 20          # Plus haut 20 jours (Breakout)
+    RESYNC_EVERY = 500       # Recalcul exact périodique (anti-dérive flottante)
+
+    def __init__(self, tickers, sma_window=None, return_window=None, vol_window=None):
+        self.tickers = list(tickers)
+        self.columns = {t: j for j, t in enumerate(self.tickers)}
+        self.sma_window = sma_window or self.SMA_WINDOW
+        self.return_window = return_window or Config.SHARPE_WINDOW
+        self.vol_window = vol_window or Config.VOLATILITY_WINDOW
+
+        # Capacité = plus longue fenêtre consultée (13612W : 252 jours) + 1
+        self.capacity = max(
+            self.sma_window,
+            self.return_window + 1,
+            self.vol_window + 1,
+            self.MAX_WINDOW,
+            StrategyConfig.CANARY_PARAMS["MOMENTUM_WINDOW_4"],
+            64
+        ) + 1
+
+        k = len(self.tickers)
+        self.closes = np.full((self.capacity, k), np.nan)
+        self.rets = np.full((self.vol_window, k), np.nan)
+        self.pos = -1            # Index de la dernière bougie dans le buffer
+        self.length = 0          # Nombre total de bougies reçues (= len(series))
+        self.last_date = None
+
+        self.count = np.zeros(k, dtype=np.int64)    # Clôtures valides par ticker
+        self.rcount = np.zeros(k, dtype=np.int64)   # Rendements valides par ticker
+        self.sma_sum = np.zeros(k)
+        self.ret_mean = np.zeros(k)
+        self.ret_m2 = np.zeros(k)
+
+    # --------------------------------------------------------------------------
+    # CONSTRUCTION / SYNCHRONISATION
+    # --------------------------------------------------------------------------
+    @classmethod
+    def from_history(cls, data, **kwargs):
+        """Initialise l'état en rejouant un historique {'close': DataFrame}."""
+        closes = data['close']
+        state = cls(closes.columns, **kwargs)
+        state._replay(closes)
+        return state
+
+    def sync(self, data):
+        """
+        Applique uniquement les bougies postérieures à last_date.
+        Reconstruit l'état si l'univers a changé ou si l'historique ne se raccorde pas.
+        """
+        closes = data['close']
+        stale = list(closes.columns) != self.tickers or self.last_date is None \
+            or self.last_date not in closes.index
+        if not stale:
+            # Dernière bougie révisée (clôture partielle en intraday) -> reconstruction
+            known = closes.loc[self.last_date].to_numpy(dtype=np.float64)
+            stale = not np.allclose(known, self.last(), equal_nan=True)
+
+        if stale:
+            self.__init__(closes.columns, self.sma_window, self.return_window, self.vol_window)
+            self._replay(closes)
+            return self
+
+        self._replay(closes.loc[closes.index > self.last_date])
+        return self
+
+    def _replay(self, closes):
+        values = closes.to_numpy(dtype=np.float64)
+        for date, row in zip(closes.index, values):
+            self.update(date, row)
+
+    def update(self, date, closes):
+        """Intègre une nouvelle bougie. closes : array aligné sur self.tickers, dict ou Series."""
+        if isinstance(closes, (dict, pd.Series)):
+            closes = np.array([closes.get(t, np.nan) for t in self.tickers], dtype=np.float64)
+        x = np.asarray(closes, dtype=np.float64)
+
+        prev = self.closes[self.pos] if self.length else np.full(len(x), np.nan)
+        x = np.where(np.isnan(x), prev, x)  # ffill (comme le DataFeed)
+
+        # 1. SMA : on retire la clôture qui sort de la fenêtre
+        self.pos = (self.pos + 1) % self.capacity
+        old = self.closes[(self.pos - self.sma_window) % self.capacity]
+        old = np.where(self.count >= self.sma_window, old, 0.0)
+        self.sma_sum += np.nan_to_num(x) - np.nan_to_num(old)
+        self.closes[self.pos] = x
+
+        valid = ~np.isnan(x)
+        self.count += valid
+
+        # 2. Rendement journalier + Welford glissant
+        r = x / prev - 1
+        r_ok = ~np.isnan(r)
+        slot = self.length % self.vol_window
+        r_old = self.rets[slot]
+        sliding = r_ok & (self.rcount >= self.vol_window)
+        adding = r_ok & ~sliding
+
+        n = np.minimum(self.rcount + adding, self.vol_window).astype(np.float64)
+        n = np.where(n == 0, 1.0, n)
+        with np.errstate(invalid='ignore'):
+            # Ajout simple (phase de chauffe)
+            delta = r - self.ret_mean
+            mean_add = self.ret_mean + delta / n
+            m2_add = self.ret_m2 + delta * (r - mean_add)
+            # Glissement : entrée de r, sortie de r_old
+            mean_slide = self.ret_mean + (r - r_old) / n
+            m2_slide = self.ret_m2 + (r - r_old) * (r - mean_slide + r_old - self.ret_mean)
+
+        self.ret_mean = np.where(sliding, mean_slide, np.where(adding, mean_add, self.ret_mean))
+        self.ret_m2 = np.where(sliding, m2_slide, np.where(adding, m2_add, self.ret_m2))
+        self.rets[slot] = np.where(r_ok, r, np.nan)
+        self.rcount += r_ok
+
+        self.length += 1
+        self.last_date = pd.Timestamp(date)
+
+        if self.length % self.RESYNC_EVERY == 0:
+            self._resync()
+
+    def _resync(self):
+        """Recalcule exactement les accumulateurs depuis les buffers."""
+        window = self._window(self.sma_window)
+        self.sma_sum = np.where(self.count >= self.sma_window, np.nansum(window, axis=0), self.sma_sum)
+
+        full = self.rcount >= self.vol_window
+        if full.any():
+            self.ret_mean = np.where(full, np.nanmean(np.where(full, self.rets, 0.0), axis=0), self.ret_mean)
+            dev = np.where(full, self.rets, 0.0) - self.ret_mean
+            self.ret_m2 = np.where(full, np.sum(dev * dev, axis=0), self.ret_m2)
+
+    # --------------------------------------------------------------------------
+    # LECTURE (toutes les valeurs sont des arrays alignés sur self.tickers)
+    # --------------------------------------------------------------------------
+    def _window(self, n):
+        rows = (self.pos - np.arange(n)) % self.capacity
+        return self.closes[rows]
+
+    def last(self):
+        return self.closes[self.pos].copy()
+
+    def lag(self, n):
+        """Clôture d'il y a n bougies (équivalent de series.iloc[-1 - n])."""
+        value = self.closes[(self.pos - n) % self.capacity]
+        return np.where(self.count > n, value, np.nan)
+
+    def sma(self):
+        return np.where(self.count >= self.sma_window, self.sma_sum / self.sma_window, np.nan)
+
+    def period_return(self, n=None):
+        """Équivalent de closes.pct_change(n).iloc[-1]."""
+        n = n or self.return_window
+        return self.last() / self.lag(n) - 1
+
+    def volatility(self):
+        """Volatilité annualisée (std des rendements sur vol_window, ddof=1)."""
+        ready = self.rcount >= self.vol_window
+        var = np.maximum(self.ret_m2, 0.0) / (self.vol_window - 1)
+        return np.where(ready, np.sqrt(var) * np.sqrt(252), np.nan)
+
+    def rolling_max(self, n=None):
+        n = n or self.MAX_WINDOW
+        return np.where(self.count >= n, np.max(self._window(n), axis=0), np.nan)
+
+    def momentum_13612W(self):
+        """Score Keller 13612W (voir AlphaEngine.calculate_13612W) pour tous les tickers."""
+        params = StrategyConfig.CANARY_PARAMS
+        weights = params["WEIGHTS"]
+        windows = [params[f"MOMENTUM_WINDOW_{k}"] for k in range(1, 5)]
+
+        p_now = self.last()
+        score = np.zeros(len(self.tickers))
+        for w, window in zip(weights, windows):
+            score += w * ((p_now / self.lag(window - 1)) - 1)
+        return np.where(self.count >= windows[3], np.nan_to_num(score), 0.0)
+
+    def series(self, values):
+        """Habille un array aligné sur les tickers en Series pandas."""
+        return pd.Series(values, index=self.tickers)
+
+    # --------------------------------------------------------------------------
+    # PERSISTANCE
+    # --------------------------------------------------------------------------
+    def save(self, filename="database/indicator_state.npz"):
+        folder = os.path.dirname(filename)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        tmp = filename + ".tmp.npz"
+        np.savez(
+            tmp,
+            tickers=np.array(self.tickers),
+            windows=np.array([self.sma_window, self.return_window, self.vol_window]),
+            scalars=np.array([self.pos, self.length]),
+            last_date=np.array([str(self.last_date.date()) if self.last_date is not None else ""]),
+            closes=self.closes, rets=self.rets, count=self.count, rcount=self.rcount,
+            sma_sum=self.sma_sum, ret_mean=self.ret_mean, ret_m2=self.ret_m2
+        )
+        os.replace(tmp, filename)
+
+    @classmethod
+    def load(cls, filename="database/indicator_state.npz"):
+        """Recharge un état sauvegardé (None si absent ou incompatible)."""
+        if not os.path.exists(filename):
+            return None
+        try:
+            with np.load(filename, allow_pickle=False) as f:
+                sma_w, ret_w, vol_w = (int(v) for v in f["windows"])
+                # Fenêtres modifiées dans la config -> état obsolète
+                if (sma_w, ret_w, vol_w) != (cls.SMA_WINDOW, Config.SHARPE_WINDOW, Config.VOLATILITY_WINDOW):
+                    return None
+                state = cls([str(t) for t in f["tickers"]], sma_w, ret_w, vol_w)
+                if f["closes"].shape != state.closes.shape:
+                    return None
+                state.pos, state.length = (int(v) for v in f["scalars"])
+                last_date = str(f["last_date"][0])
+                state.last_date = pd.Timestamp(last_date) if last_date else None
+                for name in ["closes", "rets", "count", "rcount", "sma_sum", "ret_mean", "ret_m2"]:
+                    setattr(state, name, f[name].copy())
+            return state
+        except (OSError, KeyError, ValueError):
+            return None
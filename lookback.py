@@ -0,0 +1,49 @@
+# ==============================================================================
+# FICHIER : core/lookback.py
+# ROLE : Planificateur d'historique (Profondeur minimale déduite des fenêtres)
+# ==============================================================================
+from datetime import timedelta
+import pandas as pd
+from config.settings import Config
+from config.strategies import StrategyConfig
+from core.regime import RegimeManager
+from core.indicators import IndicatorState
+from utils.market_calendar import MarketCalendar
+
+class LookbackPlanner:
+    """
+    Remplace le period="2y" codé en dur : le nombre de séances nécessaires est
+    déduit des fenêtres réellement utilisées (Régime, Valkyrie, Canary 13612W),
+    plus une marge, puis converti en date de début via le calendrier NYSE.
+    Toute modification d'une fenêtre dans la config est prise en compte d'office.
+    """
+
+    @staticmethod
+    def requirements():
+        """{composant: nombre de séances nécessaires pour la dernière valeur}."""
+        canary = StrategyConfig.CANARY_PARAMS
+        return {
+            "regime_sma": RegimeManager.TREND_WINDOW + 1,            # len(spy) > 200
+            "regime_refuge": RegimeManager.REFUGE_WINDOW + 1,        # len(p) > 63
+            "valkyrie_return": Config.SHARPE_WINDOW + 1,             # pct_change(126)
+            "valkyrie_volatility": Config.VOLATILITY_WINDOW + 1,     # 20 rendements
+            "breakout_max": IndicatorState.MAX_WINDOW,               # Plus haut 20j
+            "canary_13612W": max(canary[f"MOMENTUM_WINDOW_{k}"] for k in range(1, 5)),
+        }
+
+    @classmethod
+    def required_bars(cls, margin=None):
+        margin = Config.LOOKBACK_MARGIN if margin is None else margin
+        return max(cls.requirements().values()) + margin
+
+    @classmethod
+    def start_date(cls, margin=None, today=None):
+        """Date de la séance située required_bars() séances avant aujourd'hui (inclus)."""
+        day = today or MarketCalendar.today()
+        remaining = cls.required_bars(margin)
+        while True:
+            if MarketCalendar.is_trading_day(day):
+                remaining -= 1
+                if remaining == 0:
+                    return pd.Timestamp(day)
+            day -= timedelta(days=1)
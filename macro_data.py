@@ -4,24 +4,34 @@
 # ==============================================================================
 import yfinance as yf
 import pandas as pd
+from utils.cassette import Cassette
 
 class MacroProvider:
     def __init__(self):
         # ^VIX = Volatilité, ^TNX = Taux 10 ans, ^IRX = Taux 13 semaines (Court terme)
         self.tickers = ["^VIX", "^TNX", "^IRX"]
 
-    def fetch_macro_indicators(self):
+    def fetch_macro_indicators(self, market=None):
         """
         Récupère les indicateurs de santé économique.
+        market : MarketDataContext du run (évite de re-télécharger ^VIX & co).
         Retourne un dictionnaire avec l'état macro.
         """
         try:
-            data = yf.download(self.tickers, period="5d", progress=False, group_by='ticker')
+            if market is not None:
+                closes = market.fetch(self.tickers, period="5d")['close']
+            else:
+                data = Cassette.call(
+                    "yfinance.download", "|".join(self.tickers) + "|5d",
+                    lambda: yf.download(self.tickers, period="5d", progress=False, group_by='ticker'),
+                    codec="pickle"
+                )
+                closes = pd.DataFrame({t: data[t]['Close'] for t in self.tickers})
             
             # Extraction des dernières valeurs
-            vix = data['^VIX']['Close'].iloc[-1]
-            yield_10y = data['^TNX']['Close'].iloc[-1]
-            yield_3m = data['^IRX']['Close'].iloc[-1] # Proxy taux court
+            vix = closes['^VIX'].iloc[-1]
+            yield_10y = closes['^TNX'].iloc[-1]
+            yield_3m = closes['^IRX'].iloc[-1] # Proxy taux court
 
             # Calcul de l'inversion de la courbe des taux (Indicateur de récession)
             # Si 10 ans < 3 mois, c'est une inversion.
@@ -1,81 +1,199 @@
 # ==============================================================================
 # FICHIER : main.py (VERSION GOLDEN - PRODUCTION READY)
 # ==============================================================================
-import sys
-from core.brain import AegisBrain
-from core.execution import ExecutionManager
-from interfaces.discord_bot import DiscordBot
-from intelligence.mistral_client import MistralOracle
-from utils.visuals import Visualizer
-from utils.storage import StateManager
-from utils.metrics import PerformanceMetrics
+import argparse
+import importlib
+import json
+import os
+import time
+from datetime import datetime
 from config.settings import Config
+from core.state_manager import StateManager as SessionState
+from utils.market_calendar import MarketCalendar
+from utils.tracing import Tracer
+from utils.cassette import Cassette
 
-def run_sentinel():
+# Modules lourds (pandas, yfinance, alpaca, matplotlib, requests...) :
+# importés seulement si le pré-vol confirme qu'il y a du travail
+HEAVY_IMPORTS = [
+    ("core.brain", "AegisBrain"),
+    ("core.execution", "ExecutionManager"),
+    ("interfaces.discord_bot", "DiscordBot"),
+    ("utils.visuals", "Visualizer"),
+    ("utils.storage", "StateManager"),
+    ("utils.metrics", "PerformanceMetrics"),
+    ("utils.http_client", "HttpClient"),
+]
+IMPORT_LOG = "database/startup_times.jsonl"
+
+def preflight(replay=False):
+    """
+    Vérifications locales (aucun import lourd, aucun réseau) :
+    retourne la raison de ne rien faire, ou None s'il faut trader.
+    replay : le calendrier est ignoré (la séance rejouée a eu lieu).
+    """
+    if SessionState().already_traded_today():
+        return "💤 Le système a déjà travaillé aujourd'hui. Arrêt propre."
+    today = MarketCalendar.today()
+    if not replay and not MarketCalendar.is_trading_day(today):
+        return f"💤 Marché fermé aujourd'hui ({today} : week-end ou jour férié). Arrêt propre."
+    return None
+
+def load_modules():
+    """
+    Imports différés, chronométrés module par module (les dépendances partagées
+    sont comptées dans le premier module qui les charge). Le rapport est ajouté
+    à IMPORT_LOG pour suivre les régressions de démarrage.
+    """
+    loaded, timings = {}, {}
+    for module, name in HEAVY_IMPORTS:
+        start = time.perf_counter()
+        loaded[name] = getattr(importlib.import_module(module), name)
+        timings[module] = round(time.perf_counter() - start, 4)
+
+    total = sum(timings.values())
+    slowest = sorted(timings.items(), key=lambda kv: -kv[1])[:3]
+    print(f"⏱️ [Startup] Imports : {total:.2f}s (" + ", ".join(f"{m} {t:.2f}s" for m, t in slowest) + ")")
+    try:
+        if not os.path.exists("database"):
+            os.makedirs("database")
+        with open(IMPORT_LOG, "a") as f:
+            f.write(json.dumps({"date": datetime.now().isoformat(timespec="seconds"),
+                                "total": round(total, 4), "modules": timings}) + "\n")
+    except OSError as e:
+        print(f"⚠️ [Startup] Rapport d'imports non sauvegardé : {e}")
+    return loaded
+
+def run_sentinel(profile=None, replay=False):
+    start = time.perf_counter()
     print("\n" + "="*60)
     print(f"🚀 DÉMARRAGE DU SYSTÈME : {Config.PROJECT_NAME} v{Config.VERSION}")
     print("="*60 + "\n")
 
-    # 1. INITIALISATION
-    brain = AegisBrain()
-    executor = ExecutionManager()
-    discord = DiscordBot()
-    oracle = MistralOracle()
-    storage = StateManager()
+    # 0. PRÉ-VOL (Anti-Doublon + Calendrier, hors-ligne)
+    reason = preflight(replay)
+    if reason:
+        print(reason)
+        print(f"⏱️ [Startup] Pré-vol terminé en {(time.perf_counter() - start) * 1000:.0f} ms.")
+        return
+
+    # Cycle complet tracé (spans par étape -> database/traces/<run>.jsonl)
+    with Tracer(profile=profile):
+        run_cycle()
+
+def run_cycle(modules=None, services=None):
+    """
+    Un cycle de décision complet. modules / services : déjà chargés et instanciés
+    par un processus résident (daemon) ; sinon créés ici (run cron).
+    services : {'brain', 'executor', 'storage', 'discord', 'market'} (tous optionnels).
+    Retourne (régime, ordres) ou None si rien n'a été exécuté.
+    """
+    services = services or {}
+    # 1. INITIALISATION (constructeurs à effets de bord : seulement maintenant)
+    if modules is None:
+        with Tracer.span("startup.imports"):
+            modules = load_modules()
+    with Tracer.span("startup.init"):
+        brain = services.get("brain") or modules["AegisBrain"]()
 
     # 2. STRATÉGIE
-    regime, orders, macro_data = brain.generate_orders()
+    with Tracer.span("brain.generate_orders"):
+        regime, orders, macro_data = brain.generate_orders(market=services.get("market"))
     
     # Gestion Anti-Doublon / Erreurs
     if regime == "DONE":
         print("💤 Le système a déjà travaillé aujourd'hui. Arrêt propre.")
-        return
+        return None
     if regime == "ERROR" or (not orders and regime == "ATTACK"):
         print("❌ ERREUR CRITIQUE : Problème de données.")
-        return
+        return None
 
     # 3. EXÉCUTION
     print("\n⚔️ EXÉCUTION DES ORDRES (ALPACA)...")
-    executor.execute_orders(orders)
+    with Tracer.span("execution.rebalance", orders=len(orders)):
+        executor = services.get("executor") or modules["ExecutionManager"]()
+        executor.execute_orders(orders)
     brain.state_manager.mark_trading_done()
     
     # 4. DATA & MÉTRIQUES
     real_equity = executor.get_equity()
+    with Tracer.span("execution.fill_journal"):
+        total_trades = executor.get_trade_count()  # Synchronise aussi le journal des fills
+    # Frais estimés du jour (Alpaca sans commission : slippage sur le volume échangé)
+    fees = executor.journal.turnover(since=datetime.now().strftime("%Y-%m-%d")) * Config.SLIPPAGE
     
-    # Fetch SPY pour le benchmark
-    live_data = brain.feed.fetch_market_data(period="5d")
-    current_spy = live_data['close']['SPY'].iloc[-1] if live_data is not None else 0
+    # SPY pour le benchmark (déjà en mémoire : aucun nouveau téléchargement)
+    current_spy = brain.market.latest_close("SPY")
 
     # Sauvegarde
-    storage.save_snapshot(real_equity, current_spy)
-    history_df = storage.get_history()
+    with Tracer.span("storage.snapshot"):
+        storage = services.get("storage") or modules["StateManager"]()
+        weights = {item['ticker']: item['weight'] for item in orders}
+        storage.save_snapshot(real_equity, current_spy, regime=regime, weights=weights, fees=fees)
+        history_df = storage.get_history()
 
     # Calcul des Stats
     print("\n📊 CALCUL DES MÉTRIQUES...")
-    stats = PerformanceMetrics.calculate(history_df)
-    stats["total_trades"] = executor.get_trade_count()
+    with Tracer.span("metrics.calculate"):
+        stats = modules["PerformanceMetrics"].calculate(history_df)
+    stats["total_trades"] = total_trades
     print(f"   > Sharpe: {stats['sharpe']:.2f} | Trades: {stats['total_trades']}")
 
     # 5. INTELLIGENCE & REPORTING
     print("\n🧠 ANALYSE IA (MISTRAL)...")
-    ai_comment = oracle.get_market_commentary(regime, orders, macro_data)
+    with Tracer.span("llm.commentary"):
+        ai_comment = brain.oracle.get_market_commentary(regime, orders, macro_data)
+    discord = services.get("discord") or modules["DiscordBot"]()
     
     print("\n🎨 GÉNÉRATION GRAPHIQUE...")
     if len(history_df) >= 1:
-        chart_buf = Visualizer.generate_performance_chart(
-            history_df['Equity'], 
-            history_df['SPY_Price']
-        )
-        discord.send_chart(chart_buf)
+        with Tracer.span("chart.render", points=len(history_df)):
+            chart_buf = modules["Visualizer"].generate_performance_chart(
+                history_df['Equity'], 
+                history_df['SPY_Price']
+            )
+        with Tracer.span("discord.chart"):
+            discord.send_chart(chart_buf)
 
     print("\n📨 NOTIFICATION DISCORD...")
-    discord.notify_decision(regime, orders, ai_comment, metrics=stats)
+    with Tracer.span("discord.decision"):
+        discord.notify_decision(regime, orders, ai_comment, metrics=stats)
     
+    modules["HttpClient"].shared().report()
     print("\n✅ MISSION ACCOMPLIE.")
+    return regime, orders
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=f"{Config.PROJECT_NAME} : cycle de décision quotidien.")
+    parser.add_argument("--profile", action="store_true", help="Profil cProfile de tout le cycle (en plus des spans)")
+    tape = parser.add_mutually_exclusive_group()
+    tape.add_argument("--record", metavar="CASSETTE", help="Enregistre toutes les réponses externes du run")
+    tape.add_argument("--replay", metavar="CASSETTE", help="Rejoue un run enregistré, sans réseau")
+    parser.add_argument("--latency", default="recorded",
+                        help="Rejeu : 'recorded', facteur 'x0.5' ou secondes fixes ('0' = aucune)")
+    return parser.parse_args()
+
+def run(args):
+    profile = True if args.profile else None
+    if args.record:
+        cassette = Cassette(args.record, "record")
+        cassette.snapshot_state()
+        with cassette:
+            run_sentinel(profile)
+    elif args.replay:
+        cassette = Cassette(args.replay, "replay", latency=args.latency)
+        # Chaque rejeu repart de l'état archivé, sans toucher à la vraie base
+        # (les traces restent écrites dans le projet, pour comparer les versions)
+        Config.TRACE_DIR = os.path.abspath(Config.TRACE_DIR)
+        os.chdir(cassette.restore_state())
+        with cassette:
+            run_sentinel(profile, replay=True)
+    else:
+        run_sentinel(profile)
 
 if __name__ == "__main__":
     try:
-        run_sentinel()
+        run(parse_args())
     except KeyboardInterrupt:
         print("\n🛑 Arrêt manuel.")
     except Exception as e:
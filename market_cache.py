@@ -0,0 +1,162 @@
+# ==============================================================================
+# FICHIER : data/market_cache.py
+# ROLE : Cache local OHLCV (1 fichier .npy par ticker, mémoire-mappable)
+# ==============================================================================
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Format colonnaire d'un fichier ticker (une ligne = une bougie journalière)
+BAR_DTYPE = np.dtype([
+    ("date", "M8[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+FIELDS = ["open", "high", "low", "close", "volume"]
+
+class MarketCache:
+    """
+    Stockage disque des historiques journaliers.
+    - database/market_cache/<TICKER>.npy : tableau structuré trié par date
+    - database/market_cache/_coverage.json : date de début demandée lors du
+      dernier téléchargement complet (évite de re-télécharger un ticker récent
+      comme RDDT dont l'historique commence plus tard que la fenêtre demandée)
+    """
+
+    def __init__(self, folder="database/market_cache"):
+        self.folder = folder
+        self.index_file = os.path.join(folder, "_coverage.json")
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+    def _path(self, ticker):
+        return os.path.join(self.folder, f"{ticker.replace('^', '_')}.npy")
+
+    # --------------------------------------------------------------------------
+    # LECTURE
+    # --------------------------------------------------------------------------
+    def load_array(self, ticker, mmap=True):
+        """Tableau structuré, mémoire-mappé par défaut (None si absent ou corrompu)."""
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path, mmap_mode='r' if mmap else None)
+        except (ValueError, OSError):
+            return None
+
+    def load(self, ticker, start=None):
+        """Historique du ticker en DataFrame (index Date, colonnes OHLCV)."""
+        bars = self.load_array(ticker)
+        if bars is None or len(bars) == 0:
+            return None
+
+        if start is not None:
+            first = np.searchsorted(bars["date"], np.datetime64(pd.Timestamp(start).date(), 'D'))
+            bars = bars[first:]
+
+        index = pd.DatetimeIndex(bars["date"].astype("M8[ns]"), name="Date")
+        return pd.DataFrame({f: np.asarray(bars[f]) for f in FIELDS}, index=index)
+
+    def last_date(self, ticker):
+        bars = self.load_array(ticker)
+        if bars is None or len(bars) == 0:
+            return None
+        return pd.Timestamp(bars["date"][-1])
+
+    def resume_date(self, ticker):
+        """
+        Début d'un téléchargement incrémental : l'avant-dernière bougie, dernière
+        bougie certainement complète (la dernière a pu être enregistrée en séance).
+        """
+        bars = self.load_array(ticker)
+        if bars is None or len(bars) == 0:
+            return None
+        return pd.Timestamp(bars["date"][max(len(bars) - 2, 0)])
+
+    def coverage(self, ticker):
+        """Date de début garantie par le cache pour ce ticker (None = inconnue)."""
+        start = self._load_index().get(ticker)
+        if start == "max":
+            return pd.Timestamp.min
+        return pd.Timestamp(start) if start else None
+
+    # --------------------------------------------------------------------------
+    # ÉCRITURE
+    # --------------------------------------------------------------------------
+    def merge(self, ticker, frame):
+        """
+        Fusionne de nouvelles bougies dans le cache.
+        Retourne False si une bougie commune complète ne correspond plus
+        (dividende / split : l'historique ajusté a changé) -> il faut un
+        rechargement complet. La dernière bougie du cache n'est pas comparée :
+        enregistrée en séance, sa clôture provisoire change forcément.
+        """
+        new = self._bars(frame)
+        if len(new) == 0:
+            return True
+
+        old = self.load_array(ticker, mmap=False)
+        if old is not None and len(old) > 0:
+            overlap = np.isin(new["date"], old["date"][:-1])
+            if overlap.any():
+                common = new["date"][overlap][0]
+                old_close = old["close"][np.searchsorted(old["date"], common)]
+                new_close = new["close"][overlap][0]
+                if not np.isclose(old_close, new_close, rtol=1e-6):
+                    return False
+
+            keep = old[~np.isin(old["date"], new["date"])]
+            new = np.concatenate([keep, new])
+            new = new[np.argsort(new["date"], kind='stable')]
+
+        self._write(ticker, new)
+        return True
+
+    def replace(self, ticker, frame, covered_from):
+        """
+        Écrase l'historique du ticker (téléchargement complet). Le nouveau
+        tableau remplace l'ancien d'un seul rename : un crash laisse l'un ou
+        l'autre, jamais un ticker marqué couvert sans fichier.
+        """
+        self._write(ticker, self._bars(frame))
+
+        index = self._load_index()
+        index[ticker] = "max" if covered_from is None else pd.Timestamp(covered_from).strftime("%Y-%m-%d")
+        self._save_index(index)
+
+    @staticmethod
+    def _bars(frame):
+        """DataFrame OHLCV -> tableau structuré (bougies sans clôture écartées)."""
+        frame = frame.dropna(subset=["close"])
+        bars = np.empty(len(frame), dtype=BAR_DTYPE)
+        bars["date"] = frame.index.values.astype("M8[D]")
+        for f in FIELDS:
+            bars[f] = frame[f].to_numpy(dtype=np.float64) if f in frame else np.nan
+        return bars[np.argsort(bars["date"], kind='stable')]
+
+    def _write(self, ticker, bars):
+        # Écriture atomique : fichier temporaire puis rename
+        path = self._path(ticker)
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            np.save(f, bars)
+        os.replace(tmp, path)
+
+    def _load_index(self):
+        try:
+            with open(self.index_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self, index):
+        tmp = self.index_file + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(index, f, indent=4)
+        os.replace(tmp, self.index_file)
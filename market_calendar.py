@@ -0,0 +1,104 @@
+# ==============================================================================
+# FICHIER : utils/market_calendar.py
+# ROLE : Calendrier NYSE hors-ligne (Jours fériés, Séances courtes, Heures de clôture)
+# ==============================================================================
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+class MarketCalendar:
+    """
+    Règles NYSE calculées localement (aucun appel réseau) :
+    - Jours fériés avec report (samedi -> vendredi, dimanche -> lundi ;
+      pas de report du Nouvel An sur le 31 décembre)
+    - Séances courtes (13h00) : 3 juillet, lendemain de Thanksgiving, 24 décembre
+    Les heures sont exprimées à New York (America/New_York).
+    """
+
+    TIMEZONE = ZoneInfo("America/New_York")
+    OPEN = time(9, 30)
+    CLOSE = time(16, 0)
+    EARLY_CLOSE = time(13, 0)
+
+    @staticmethod
+    def _observed(day):
+        if day.weekday() == 5:
+            return day - timedelta(days=1)
+        if day.weekday() == 6:
+            return day + timedelta(days=1)
+        return day
+
+    @staticmethod
+    def _nth_weekday(year, month, weekday, n):
+        """n-ième jour de semaine du mois (n = -1 : le dernier)."""
+        if n > 0:
+            first = date(year, month, 1)
+            return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+        last = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+        return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+    @staticmethod
+    def _easter(year):
+        """Dimanche de Pâques (algorithme grégorien anonyme)."""
+        a, b, c = year % 19, year // 100, year % 100
+        d, e = b // 4, b % 4
+        f = (b + 8) // 25
+        g = (b - f + 1) // 3
+        h = (19 * a + b - d - g + 15) % 30
+        i, k = c // 4, c % 4
+        l = (32 + 2 * e + 2 * i - h - k) % 7
+        m = (a + 11 * h + 22 * l) // 451
+        month = (h + l - 7 * m + 114) // 31
+        day = (h + l - 7 * m + 114) % 31 + 1
+        return date(year, month, day)
+
+    @classmethod
+    def holidays(cls, year):
+        """{date: nom} des fermetures NYSE de l'année."""
+        days = {
+            cls._nth_weekday(year, 1, 0, 3): "Martin Luther King Jr. Day",
+            cls._nth_weekday(year, 2, 0, 3): "Washington's Birthday",
+            cls._easter(year) - timedelta(days=2): "Good Friday",
+            cls._nth_weekday(year, 5, 0, -1): "Memorial Day",
+            cls._observed(date(year, 7, 4)): "Independence Day",
+            cls._nth_weekday(year, 9, 0, 1): "Labor Day",
+            cls._nth_weekday(year, 11, 3, 4): "Thanksgiving",
+            cls._observed(date(year, 12, 25)): "Christmas",
+        }
+        new_year = date(year, 1, 1)
+        if new_year.weekday() != 5:  # Samedi : pas de report sur le 31/12
+            days[cls._observed(new_year)] = "New Year's Day"
+        if year >= 2022:
+            days[cls._observed(date(year, 6, 19))] = "Juneteenth"
+        return days
+
+    @classmethod
+    def is_trading_day(cls, day):
+        return day.weekday() < 5 and day not in cls.holidays(day.year)
+
+    @classmethod
+    def is_early_close(cls, day):
+        if not cls.is_trading_day(day):
+            return False
+        thanksgiving = cls._nth_weekday(day.year, 11, 3, 4)
+        return day in (date(day.year, 7, 3), thanksgiving + timedelta(days=1), date(day.year, 12, 24))
+
+    @classmethod
+    def session_close(cls, day):
+        """Heure de clôture (datetime NY) de la séance du jour, None si marché fermé."""
+        if not cls.is_trading_day(day):
+            return None
+        close = cls.EARLY_CLOSE if cls.is_early_close(day) else cls.CLOSE
+        return datetime.combine(day, close, tzinfo=cls.TIMEZONE)
+
+    @classmethod
+    def next_trading_day(cls, day):
+        """Prochain jour de bourse strictement après 'day'."""
+        day += timedelta(days=1)
+        while not cls.is_trading_day(day):
+            day += timedelta(days=1)
+        return day
+
+    @classmethod
+    def today(cls):
+        """Date du jour à New York."""
+        return datetime.now(cls.TIMEZONE).date()
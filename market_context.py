@@ -0,0 +1,86 @@
+# ==============================================================================
+# FICHIER : data/market_context.py
+# ROLE : Contexte de données d'un run (chaque ticker n'est téléchargé qu'une fois)
+# ==============================================================================
+import pandas as pd
+from data.price_panel import PricePanel
+
+class MarketDataContext:
+    """
+    Mémoïse, pour la durée d'un run, les séries déjà obtenues du DataFeed.
+    Les demandes suivantes (macro, benchmark SPY, panel de stratégie) sont
+    servies par découpage de ce qui est déjà en mémoire ; seuls les tickers
+    absents (ou une fenêtre plus longue) déclenchent un nouvel appel au feed.
+    downloads compte les passages au fournisseur par ticker (audit : 1 attendu).
+    """
+
+    FIELDS = ["close", "high", "low", "open"]
+
+    def __init__(self, feed):
+        self.feed = feed
+        self.frames = None    # {'close': DataFrame, ...} union de tout ce qui a été obtenu
+        self.start = None     # Début de la fenêtre détenue (None = historique complet)
+        self.downloads = {}   # {ticker: nombre de passages au feed}
+
+    def _covers(self, start):
+        return self.frames is not None and (self.start is None or (start is not None and start >= self.start))
+
+    def prefetch(self, tickers, period="2y", start=None):
+        """Charge en une fois tout ce dont le run aura besoin."""
+        self.fetch(tickers, period=period, start=start)
+
+    def fetch(self, tickers=None, period="2y", start=None, as_panel=False):
+        """
+        Même contrat que DataFeed.fetch_market_data (colonnes triées),
+        restreint aux tickers et à la fenêtre demandés.
+        """
+        tickers = sorted(set(tickers or self.feed.tickers))
+        start = pd.Timestamp(start) if start else self.feed._period_start(period)
+
+        if not self._covers(start):
+            # Fenêtre plus longue que celle détenue : on recharge tout ce qui est connu
+            held = list(self.frames["close"].columns) if self.frames is not None else []
+            self.frames, self.start = None, start
+            self._load(sorted(set(held) | set(tickers)))
+        else:
+            missing = [t for t in tickers if t not in self.frames["close"].columns]
+            if missing:
+                self._load(missing)
+
+        if self.frames is None:
+            return None
+        available = [t for t in tickers if t in self.frames["close"].columns]
+        if not available:
+            return None
+
+        data = {}
+        for field, frame in self.frames.items():
+            window = frame.loc[frame.index >= start] if start is not None else frame
+            data[field] = window[available]
+        return PricePanel.from_frames(data) if as_panel else data
+
+    def _load(self, tickers):
+        data = self.feed.fetch_market_data(start=self.start, tickers=tickers) if self.start is not None \
+            else self.feed.fetch_market_data(period="max", tickers=tickers)
+        for ticker in tickers:
+            self.downloads[ticker] = self.downloads.get(ticker, 0) + 1
+        if data is None:
+            return
+
+        if self.frames is None:
+            self.frames = {f: data[f] for f in self.FIELDS if f in data}
+            return
+        for field in list(self.frames):
+            if field in data:
+                merged = pd.concat([self.frames[field], data[field]], axis=1)
+                self.frames[field] = merged.sort_index().ffill()
+
+    def latest_close(self, ticker):
+        """Dernière clôture connue (0 si le ticker est absent)."""
+        if self.frames is None or ticker not in self.frames["close"].columns:
+            return 0
+        return self.frames["close"][ticker].iloc[-1]
+
+    def duplicates(self):
+        """Tickers demandés plus d'une fois au fournisseur pendant le run."""
+        return {t: n for t, n in self.downloads.items() if n > 1}
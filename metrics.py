@@ -46,4 +46,13 @@ class PerformanceMetrics:
         drawdown = (equity - rolling_max) / rolling_max
         stats["max_drawdown"] = drawdown.min()
 
-        return stats
\ No newline at end of file
+        return stats
+
+    @staticmethod
+    def cagr(equity, periods_per_year=252):
+        """Taux de croissance annuel composé d'une série d'Equity (points journaliers)."""
+        equity = pd.to_numeric(pd.Series(equity), errors='coerce').dropna()
+        if len(equity) < 2 or equity.iloc[0] <= 0:
+            return 0.0
+        years = (len(equity) - 1) / periods_per_year
+        return (equity.iloc[-1] / equity.iloc[0]) ** (1 / years) - 1
\ No newline at end of file
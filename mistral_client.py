@@ -2,15 +2,25 @@
 # FICHIER : intelligence/mistral_client.py
 # ROLE : L'Oracle (Connecteur API Mistral)
 # ==============================================================================
-import requests
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
 from config.settings import Config
 from intelligence.prompts import Prompts  # <-- Import propre des textes
+from intelligence.verdict_cache import VerdictCache
+from utils.http_client import HttpClient
+from utils.tracing import Tracer
 
 class MistralOracle:
     def __init__(self):
         self.api_key = Config.MISTRAL_API_KEY
         self.model = Config.MISTRAL_MODEL
         self.endpoint = "https://api.mistral.ai/v1/chat/completions"
+        self.http = HttpClient.shared()
+        # Cache des verdicts (la version du prompt = hash des templates de risque)
+        self.verdicts = VerdictCache(ttl=Config.RISK_CACHE_TTL, max_entries=Config.RISK_CACHE_MAX_ENTRIES)
+        templates = Prompts.RISK_ANALYSIS + Prompts.RISK_ANALYSIS_BATCH
+        self.risk_prompt_version = hashlib.sha1(templates.encode("utf-8")).hexdigest()[:8]
 
     def analyze_risk(self, ticker, headlines):
         """
@@ -19,6 +29,12 @@ class MistralOracle:
         if not self.api_key or not headlines:
             return "SAFE"
 
+        # Mêmes titres déjà jugés récemment -> aucun appel LLM
+        key = VerdictCache.make_key(ticker, self.model, self.risk_prompt_version, headlines)
+        cached = self.verdicts.get(key)
+        if cached is not None:
+            return cached
+
         # On prépare le texte des news
         news_text = " | ".join(headlines)
         
@@ -30,13 +46,82 @@ class MistralOracle:
             content = self._call_api(prompt, max_tokens=10)
             clean_resp = content.strip().upper()
             
-            if "DANGER" in clean_resp:
-                return "DANGER"
-            return "SAFE"
+            # Réponse d'erreur : verdict par défaut, jamais mis en cache
+            if clean_resp.startswith("ERREUR API"):
+                print(f"⚠️ Erreur IA Risk : {content}")
+                return "SAFE"
+
+            verdict = "DANGER" if "DANGER" in clean_resp else "SAFE"
+            self.verdicts.put(key, verdict)
+            return verdict
         except Exception as e:
             print(f"⚠️ Erreur IA Risk : {e}")
             return "SAFE"
 
+    def analyze_risk_batch(self, headlines_by_ticker):
+        """
+        Version lot du Veto : une seule requête pour tous les candidats.
+        headlines_by_ticker : {ticker: [titres]}. Retourne {ticker: "SAFE"/"DANGER"}.
+        Réponse JSON invalide -> repli sur analyze_risk ticker par ticker.
+        """
+        verdicts = {t: "SAFE" for t, h in headlines_by_ticker.items() if not h}
+        pending = {t: h for t, h in headlines_by_ticker.items() if h}
+        if not self.api_key or not pending:
+            return {**verdicts, **{t: "SAFE" for t in pending}}
+
+        # 1. Cache (mêmes clés que analyze_risk)
+        keys = {t: VerdictCache.make_key(t, self.model, self.risk_prompt_version, h) for t, h in pending.items()}
+        for ticker in list(pending):
+            cached = self.verdicts.get(keys[ticker])
+            if cached is not None:
+                verdicts[ticker] = cached
+                del pending[ticker]
+        if not pending:
+            return verdicts
+
+        # 2. Requête unique
+        news_block = "\n".join(f"- {t}: {' | '.join(h)}" for t, h in pending.items())
+        prompt = Prompts.RISK_ANALYSIS_BATCH.format(news_block=news_block, tickers=list(pending))
+        try:
+            content = self._call_api(prompt, max_tokens=12 * len(pending) + 20, json_mode=True)
+            batch = self._parse_batch(content, pending)
+        except Exception as e:
+            print(f"⚠️ Erreur IA Risk (lot) : {e}")
+            batch = None
+
+        if batch is None:
+            # 3. Repli : appels individuels (en parallèle)
+            print(f"⚠️ [Oracle] Réponse lot invalide, repli sur {len(pending)} appels individuels.")
+            with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+                results = pool.map(lambda t: self.analyze_risk(t, pending[t]), pending)
+                batch = dict(zip(pending, results))
+        else:
+            for ticker, verdict in batch.items():
+                self.verdicts.put(keys[ticker], verdict)
+
+        verdicts.update(batch)
+        return verdicts
+
+    @staticmethod
+    def _parse_batch(content, pending):
+        """Valide le JSON {ticker: SAFE|DANGER} ; None si le schéma n'est pas respecté."""
+        text = content.strip()
+        if text.startswith("```"):
+            text = text.strip("`")
+            text = text[text.find("{"):]
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+
+        if not isinstance(data, dict):
+            return None
+        data = {str(k).strip().upper(): str(v).strip().upper() for k, v in data.items()}
+        expected = {t.upper(): t for t in pending}
+        if set(data) != set(expected) or any(v not in ("SAFE", "DANGER") for v in data.values()):
+            return None
+        return {expected[k]: v for k, v in data.items()}
+
     def get_market_commentary(self, regime, top_picks, macro_data=None):
         """
         Génère le commentaire global de fin de journée.
@@ -54,7 +139,7 @@ class MistralOracle:
         
         return self._call_api(prompt, max_tokens=150)
 
-    def _call_api(self, prompt, max_tokens):
+    def _call_api(self, prompt, max_tokens, json_mode=False):
         """Fonction interne générique pour appeler l'API."""
         payload = {
             "model": self.model,
@@ -62,12 +147,16 @@ class MistralOracle:
             "temperature": 0.3, 
             "max_tokens": max_tokens
         }
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         
-        response = requests.post(self.endpoint, json=payload, headers=headers, timeout=10)
+        # Appel sans effet de bord : rejouable sur 5xx
+        with Tracer.span("llm.call", max_tokens=max_tokens, json_mode=json_mode):
+            response = self.http.post(self.endpoint, json=payload, headers=headers, timeout=10, retry_unsafe=True)
         
         if response.status_code == 200:
             return response.json()['choices'][0]['message']['content'].strip()
@@ -3,7 +3,8 @@
 # ROLE : Récupérateur d'actualités (Headlines) via Yahoo Finance
 # ==============================================================================
 import yfinance as yf
-import time
+from utils.tracing import Tracer
+from utils.cassette import Cassette
 
 class NewsFetcher:
     def get_headlines(self, ticker):
@@ -12,11 +13,10 @@ class NewsFetcher:
         Retourne une liste de strings.
         """
         try:
-            # Petit délai pour éviter le spam si on boucle trop vite
-            time.sleep(0.5)
-            
+            # Pas de délai fixe : la concurrence est bornée par le pool Sentinel (MAX_WORKERS)
             t = yf.Ticker(ticker)
-            news = t.news
+            with Tracer.span("news.fetch", ticker=ticker):
+                news = Cassette.call("yfinance.news", ticker, lambda: t.news)
             
             if not news:
                 return []
@@ -0,0 +1,135 @@
+# ==============================================================================
+# FICHIER : param_sweep.py
+# ROLE : Optimisation parallèle des paramètres Valkyrie (grille x pool de processus)
+# ==============================================================================
+import itertools
+import math
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from backtest_suite import BacktestEngine
+from core.signal_matrix import SignalMatrix
+from utils.metrics import PerformanceMetrics
+
+# --- GRILLE PAR DÉFAUT ---
+DEFAULT_GRID = {
+    "SHARPE_WINDOW": [63, 126, 189],
+    "VOLATILITY_WINDOW": [10, 20, 40],
+    "TARGET_VOL_BULL": [0.20, 0.25, 0.30],
+    "MAX_POSITION_SIZE": [0.33, 0.40],
+    "BREAKOUT_THRESHOLD": [0.95, 0.98],
+    "TOP_N": [2, 3, 5],
+}
+
+RESULTS_FILE = "database/sweep_results.csv"
+
+class SharedPriceMatrix:
+    """
+    Clôtures [dates x tickers] copiées UNE fois en mémoire partagée.
+    Les workers s'y attachent en lecture (aucun re-téléchargement ni copie).
+    """
+
+    def __init__(self, closes):
+        values = closes.to_numpy(dtype=np.float64)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        view = np.ndarray(values.shape, dtype=np.float64, buffer=self.shm.buf)
+        view[:] = values
+        self.shape = values.shape
+        self.dates = closes.index.values.astype("M8[ns]").astype(np.int64)
+        self.tickers = list(closes.columns)
+
+    def spec(self):
+        """Description picklable transmise aux workers."""
+        return self.shm.name, self.shape, self.dates, self.tickers
+
+    @staticmethod
+    def attach(spec):
+        name, shape, dates, tickers = spec
+        shm = shared_memory.SharedMemory(name=name)
+        values = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        closes = pd.DataFrame(values, index=pd.DatetimeIndex(dates.astype("M8[ns]")),
+                              columns=tickers, copy=False)
+        return shm, closes
+
+    def release(self):
+        self.shm.close()
+        self.shm.unlink()
+
+# --- CÔTÉ WORKER ---
+_WORKER = {}
+
+def _init_worker(spec):
+    shm, closes = SharedPriceMatrix.attach(spec)
+    _WORKER["shm"] = shm            # Garde la mémoire partagée ouverte
+    _WORKER["data"] = {"close": closes}
+    _WORKER["memo"] = {}            # Matrices d'indicateurs réutilisées entre combinaisons
+
+def _run_combo(params):
+    engine = BacktestEngine()
+    history = engine.simulate(_WORKER["data"], params=params, memo=_WORKER["memo"], verbose=False)
+    return {**params, **evaluate(history)}
+
+def evaluate(history):
+    """CAGR, Sharpe, Sortino et Max Drawdown d'un historique de backtest."""
+    if history.empty:
+        return {"cagr": 0.0, "sharpe": 0.0, "sortino": 0.0, "max_drawdown": 0.0}
+    stats = PerformanceMetrics.calculate(history.set_index('Date'))
+    return {
+        "cagr": PerformanceMetrics.cagr(history['Equity']),
+        "sharpe": stats["sharpe"],
+        "sortino": stats["sortino"],
+        "max_drawdown": stats["max_drawdown"],
+        "final_equity": history['Equity'].iloc[-1]
+    }
+
+class ParameterSweep:
+    def __init__(self, grid=None, workers=None):
+        self.grid = grid or DEFAULT_GRID
+        unknown = set(self.grid) - set(SignalMatrix.PARAMS)
+        if unknown:
+            raise ValueError(f"Paramètres non optimisables : {sorted(unknown)}")
+        self.workers = workers or os.cpu_count() or 1
+
+    def combinations(self):
+        """Produit cartésien de la grille, fenêtres en tête (maximise la réutilisation du cache)."""
+        names = sorted(self.grid, key=lambda n: n not in ("SHARPE_WINDOW", "VOLATILITY_WINDOW"))
+        return [dict(zip(names, values)) for values in itertools.product(*(self.grid[n] for n in names))]
+
+    def run(self, full_data=None):
+        if full_data is None:
+            full_data = BacktestEngine().fetch_history()
+
+        combos = self.combinations()
+        print(f"🧪 [Sweep] {len(combos)} combinaisons sur {self.workers} processus...")
+
+        shared = SharedPriceMatrix(full_data['close'])
+        try:
+            # Gros paquets contigus : chaque worker garde les mêmes fenêtres -> cache chaud
+            chunksize = max(1, math.ceil(len(combos) / (self.workers * 4)))
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(shared.spec(),)) as pool:
+                results = list(pool.map(_run_combo, combos, chunksize=chunksize))
+        finally:
+            shared.release()
+
+        table = pd.DataFrame(results).sort_values("sharpe", ascending=False).reset_index(drop=True)
+        return table
+
+if __name__ == "__main__":
+    try:
+        sweep = ParameterSweep()
+        table = sweep.run()
+
+        if not os.path.exists("database"):
+            os.makedirs("database")
+        table.to_csv(RESULTS_FILE, index=False)
+
+        print("\n" + "="*50)
+        print("🏆 TOP 10 DES COMBINAISONS (Sharpe)")
+        print("="*50)
+        print(table.head(10).to_string(index=False))
+        print(f"\n💾 Résultats complets : {RESULTS_FILE}")
+    except Exception as e:
+        print(f"❌ Erreur Sweep : {e}")
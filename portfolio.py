@@ -6,6 +6,8 @@ import pandas as pd
 import numpy as np
 from config.settings import Config
 from core.alpha import AlphaEngine
+from core.indicators import IndicatorState
+from data.price_panel import PricePanel
 
 class PortfolioManager:
     def __init__(self):
@@ -16,54 +18,47 @@ class PortfolioManager:
         Logique VALKYRIE (V25) :
         1. Filtre l'univers d'attaque.
         2. Calcule le Score Valkyrie (Sharpe Rolling).
-        3. Sélectionne le TOP 3.
+        3. Sélectionne le TOP N (Config.TOP_N, 3 par défaut).
         4. Calcule la taille de position (Volatilité Cible).
         
+        data : dict {'close': DataFrame, ...}, PricePanel ou IndicatorState.
         Retourne : Liste de dictionnaires [{'ticker': 'NVDA', 'weight': 0.35, ...}]
         """
-        closes = data['close']
-        candidates = []
-        
         # 1. SCAN DE L'ARMÉE (Tech + Sectors)
         # On fusionne les listes pour que le bot puisse choisir Tech OU Secteurs
-        scan_list = list(set(Config.ASSETS["ATTACK"] + Config.ASSETS["DEFENSE"]))
-        
-        # Pré-calculs vectorisés pour la vitesse
-        # Rendement sur 6 mois (Sharpe Window)
-        returns = closes.pct_change(Config.SHARPE_WINDOW).iloc[-1]
+        # (triées : départage des égalités identique d'un processus à l'autre)
+        scan_list = sorted(set(Config.ASSETS["ATTACK"] + Config.ASSETS["DEFENSE"]))
         
-        # Volatilité court terme (20 jours) pour le Sizing
-        short_vol = closes.pct_change().rolling(Config.VOLATILITY_WINDOW).std().iloc[-1] * np.sqrt(252)
-        
-        # Prix actuel et Max 20 jours (pour Breakout)
-        current_price = closes.iloc[-1]
-        rolling_max = closes.rolling(20).max().iloc[-1]
+        # Entrées du jour, alignées sur la liste des tickers (arrays NumPy)
+        tickers, returns, short_vol, current_price, rolling_max = self._valkyrie_inputs(data)
+        columns = {t: j for j, t in enumerate(tickers)}
 
-        for ticker in scan_list:
-            if ticker not in closes.columns: continue
-            if ticker in ["BIL", "IEF", "AGG", "EEM"]: continue # On exclut les outils de régime
-            
-            # --- SCORING VALKYRIE ---
-            ret = returns.get(ticker, 0)
-            vol = short_vol.get(ticker, 0)
-            
-            if pd.isna(ret) or pd.isna(vol) or vol == 0: continue
-            
+        # On exclut les outils de régime
+        scan = [t for t in scan_list if t in columns and t not in ["BIL", "IEF", "AGG", "EEM"]]
+        idx = np.array([columns[t] for t in scan], dtype=np.intp)
+        
+        # --- SCORING VALKYRIE (vectorisé) ---
+        ret = returns[idx]
+        vol = short_vol[idx]
+        with np.errstate(divide='ignore', invalid='ignore'):
             # Score = Rendement / Volatilité (Sharpe simplifié)
             score = ret / vol
-            
-            if score > 0: # On ne veut que du positif
-                candidates.append({
-                    'ticker': ticker,
-                    'score': score,
-                    'volatility': vol,
-                    'price': current_price[ticker],
-                    'max_20d': rolling_max[ticker]
-                })
+            # On ne veut que du positif
+            valid = ~np.isnan(ret) & ~np.isnan(vol) & (vol != 0) & (score > 0)
         
-        # 2. SÉLECTION (TOP 3)
-        candidates.sort(key=lambda x: x['score'], reverse=True)
-        top_picks = candidates[:3] # On garde les 3 meilleurs
+        # 2. SÉLECTION (TOP N)
+        # Tri décroissant stable : égalités départagées dans l'ordre du scan
+        ranking = np.argsort(-np.where(valid, score, -np.inf), kind='stable')
+        top_picks = []
+        for k in ranking[:min(int(valid.sum()), Config.TOP_N)]: # On garde les N meilleurs
+            j = idx[k]
+            top_picks.append({
+                'ticker': scan[k],
+                'score': score[k],
+                'volatility': vol[k],
+                'price': current_price[j],
+                'max_20d': rolling_max[j]
+            })
         
         # 3. SIZING (Dimensionnement)
         final_portfolio = []
@@ -71,14 +66,14 @@ class PortfolioManager:
         
         for asset in top_picks:
             # Formule Volatilité Cible : (Cible / Vol_Actuelle) * Capital_Slot
-            # Slot = 1/3 du capital (car Top 3)
-            base_slot_weight = 1.0 / 3.0
+            # Slot = 1/N du capital (1/3 pour un Top 3)
+            base_slot_weight = 1.0 / Config.TOP_N
             
             vol_ratio = target_vol / asset['volatility']
             weight = base_slot_weight * vol_ratio
             
             # Boost Breakout : Si prix > 98% du plus haut 20j -> +20% taille
-            is_breakout = asset['price'] >= (asset['max_20d'] * 0.98)
+            is_breakout = asset['price'] >= (asset['max_20d'] * Config.BREAKOUT_THRESHOLD)
             if is_breakout:
                 weight *= 1.2
                 asset['note'] = "🔥 BREAKOUT"
@@ -93,6 +88,48 @@ class PortfolioManager:
             
         return final_portfolio
 
+    def _valkyrie_inputs(self, data):
+        """
+        Rendement 6 mois, volatilité 20j, prix actuel et plus haut 20j du dernier jour.
+        Accepte le dict de DataFrames, un PricePanel ou un IndicatorState.
+        """
+        if isinstance(data, IndicatorState):
+            # Lecture directe de l'état incrémental (aucune fenêtre recalculée)
+            return (data.tickers, data.period_return(Config.SHARPE_WINDOW), data.volatility(),
+                    data.last(), data.rolling_max(20))
+
+        if isinstance(data, PricePanel):
+            # Seules les dernières lignes utiles sont lues (vues NumPy)
+            closes = data.field('close')
+            n = len(closes)
+            nan = np.full(closes.shape[1], np.nan)
+            w, v = Config.SHARPE_WINDOW, Config.VOLATILITY_WINDOW
+
+            returns = closes[-1] / closes[-1 - w] - 1 if n > w else nan
+            if n > v:
+                recent = closes[-(v + 1):]
+                short_vol = np.std(recent[1:] / recent[:-1] - 1, axis=0, ddof=1) * np.sqrt(252)
+            else:
+                short_vol = nan
+            rolling_max = closes[-20:].max(axis=0) if n >= 20 else nan
+            return data.tickers, returns, short_vol, closes[-1], rolling_max
+
+        closes = data['close']
+
+        # Pré-calculs vectorisés pour la vitesse
+        # Rendement sur 6 mois (Sharpe Window)
+        returns = closes.pct_change(Config.SHARPE_WINDOW).iloc[-1]
+        
+        # Volatilité court terme (20 jours) pour le Sizing
+        short_vol = closes.pct_change().rolling(Config.VOLATILITY_WINDOW).std().iloc[-1] * np.sqrt(252)
+        
+        # Prix actuel et Max 20 jours (pour Breakout)
+        current_price = closes.iloc[-1]
+        rolling_max = closes.rolling(20).max().iloc[-1]
+
+        return (list(closes.columns), returns.to_numpy(), short_vol.to_numpy(),
+                current_price.to_numpy(), rolling_max.to_numpy())
+
     def select_defense_portfolio(self, safe_asset):
         """
         En mode défense, c'est simple : 100% sur l'actif refuge choisi.
@@ -0,0 +1,85 @@
+# ==============================================================================
+# FICHIER : data/price_panel.py
+# ROLE : Panel de prix NumPy contigu [temps x ticker x champ] partagé par tous les modules
+# ==============================================================================
+import numpy as np
+import pandas as pd
+
+class PricePanel:
+    """
+    Remplace le dict {'close': df, 'high': df, 'low': df} par un seul bloc mémoire :
+    - values : ndarray [dates x tickers x champs] (float64, ou float32 sur demande)
+    - columns : index ticker -> colonne, fields : index champ -> plan
+    Les tranches temporelles (slice) et les sous-ensembles contigus de tickers sont
+    des vues NumPy (zéro copie). panel['close'] reste disponible sous forme de
+    DataFrame (vue) pour le code qui attend encore l'ancien format.
+    """
+
+    FIELDS = ("close", "high", "low", "open")
+
+    def __init__(self, values, dates, tickers, fields=FIELDS):
+        self.values = values
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = list(tickers)
+        self.fields = tuple(fields)
+        self.columns = {t: j for j, t in enumerate(self.tickers)}
+        self._planes = {f: k for k, f in enumerate(self.fields)}
+
+    @classmethod
+    def from_frames(cls, data, dtype=np.float64):
+        """Construit le panel depuis le format DataFeed {'close': df, ...}."""
+        closes = data['close']
+        fields = [f for f in cls.FIELDS if f in data]
+        values = np.empty((len(closes.index), len(closes.columns), len(fields)), dtype=dtype)
+        for k, field in enumerate(fields):
+            frame = data[field].reindex(index=closes.index, columns=closes.columns)
+            values[:, :, k] = frame.to_numpy(dtype=dtype)
+        return cls(values, closes.index, closes.columns, fields)
+
+    # --------------------------------------------------------------------------
+    # ACCÈS
+    # --------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.dates)
+
+    def __contains__(self, field):
+        return field in self._planes
+
+    def __getitem__(self, field):
+        """Compatibilité : panel['close'] -> DataFrame Date x Ticker (vue, sans copie)."""
+        return pd.DataFrame(self.field(field), index=self.dates, columns=self.tickers, copy=False)
+
+    def field(self, name):
+        """Matrice [dates x tickers] d'un champ (vue)."""
+        return self.values[:, :, self._planes[name]]
+
+    def column(self, ticker, field="close"):
+        """Série temporelle d'un ticker (vue 1D)."""
+        return self.values[:, self.columns[ticker], self._planes[field]]
+
+    def row(self, i, field="close"):
+        """Prix d'une date sous forme de dict {ticker: prix} (exécution des ordres)."""
+        return dict(zip(self.tickers, self.values[i, :, self._planes[field]]))
+
+    # --------------------------------------------------------------------------
+    # VUES
+    # --------------------------------------------------------------------------
+    def slice(self, start=None, stop=None):
+        """Tranche temporelle [start:stop] (vue, zéro copie)."""
+        window = slice(start, stop)
+        return PricePanel(self.values[window], self.dates[window], self.tickers, self.fields)
+
+    def select(self, tickers):
+        """
+        Sous-ensemble de tickers. Vue si les colonnes sont contiguës et dans
+        l'ordre du panel, copie sinon (contrainte NumPy du fancy indexing).
+        """
+        cols = [self.columns[t] for t in tickers if t in self.columns]
+        if cols and cols == list(range(cols[0], cols[0] + len(cols))):
+            values = self.values[:, cols[0]:cols[0] + len(cols)]
+        else:
+            values = self.values[:, cols]
+        return PricePanel(values, self.dates, [self.tickers[j] for j in cols], self.fields)
+
+    def astype(self, dtype):
+        return PricePanel(self.values.astype(dtype), self.dates, self.tickers, self.fields)
\ No newline at end of file
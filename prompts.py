@@ -22,6 +22,23 @@ class Prompts:
     TA RÉPONSE DOIT ÊTRE UN SEUL MOT : "SAFE" ou "DANGER".
     """
 
+    # Prompt pour le Risk Manager en lot (tous les candidats en une seule requête)
+    RISK_ANALYSIS_BATCH = """
+    Tu es le Chief Risk Officer d'un Hedge Fund algorithmique.
+    Ta mission : Détecter les risques existentiels immédiats.
+    
+    NEWS PAR TICKER:
+    {news_block}
+    
+    INSTRUCTIONS:
+    Analyse les titres de CHAQUE ticker. Cherche UNIQUEMENT : Faillite, Enquête Fédérale, Fraude Comptable, Rappel Produit Massif.
+    Si c'est juste des résultats financiers (bons ou mauvais) ou des mouvements de marché : "SAFE".
+    Si c'est un risque existentiel critique : "DANGER".
+    
+    TA RÉPONSE DOIT ÊTRE UN OBJET JSON, SANS AUTRE TEXTE, avec exactement ces clés : {tickers}
+    Exemple : {{"AAPL": "SAFE", "TSLA": "DANGER"}}
+    """
+
     # Prompt pour le Stratège (Commentaire Discord)
     # Note : On prévoit des champs optionnels pour la Macro (VIX, Taux)
     STRATEGY_BRIEF = """
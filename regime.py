@@ -2,9 +2,14 @@
 # FICHIER : core/regime.py (VERSION FINALE - TREND KING)
 # ==============================================================================
 from config.settings import Config
+from core.indicators import IndicatorState
+from data.price_panel import PricePanel
 import pandas as pd
 
 class RegimeManager:
+    TREND_WINDOW = 200    # SMA du SPY (Trend King)
+    REFUGE_WINDOW = 63    # Momentum 3 mois des actifs refuge
+
     def __init__(self):
         pass
 
@@ -14,48 +19,96 @@ class RegimeManager:
         - Si SPY > SMA 200 jours : ATTACK (On suit la hausse)
         - Si SPY < SMA 200 jours : DEFENSE (On se protège)
         Simple, robuste, efficace.
+        data : dict {'close': DataFrame, ...}, PricePanel ou IndicatorState (lecture directe, O(1)).
         """
-        closes = data['close']
-        
+        if isinstance(data, IndicatorState):
+            spy_inputs, defense_scores = self._inputs_from_state(data)
+        elif isinstance(data, PricePanel):
+            spy_inputs, defense_scores = self._inputs_from_panel(data)
+        else:
+            spy_inputs, defense_scores = self._inputs_from_frame(data['close'])
+
         # Par défaut
         regime = "ATTACK"
         details = {"SPY_TREND": "UNKNOWN", "DISTANCE": 0.0}
         
         # Juge de Paix : Le SPY
-        if "SPY" in closes.columns:
-            spy = closes["SPY"]
+        if spy_inputs is not None:
+            current_price, sma_200 = spy_inputs
+            distance = (current_price / sma_200) - 1
             
-            # Il faut assez d'historique pour la moyenne mobile 200
-            if len(spy) > 200:
-                current_price = spy.iloc[-1]
-                sma_200 = spy.rolling(200).mean().iloc[-1]
-                distance = (current_price / sma_200) - 1
-                
-                details["DISTANCE"] = distance
-                
-                if current_price > sma_200:
-                    regime = "ATTACK"
-                    details["SPY_TREND"] = "BULLISH"
-                else:
-                    regime = "DEFENSE"
-                    details["SPY_TREND"] = "BEARISH"
+            details["DISTANCE"] = distance
+            
+            if current_price > sma_200:
+                regime = "ATTACK"
+                details["SPY_TREND"] = "BULLISH"
+            else:
+                regime = "DEFENSE"
+                details["SPY_TREND"] = "BEARISH"
         
         # --- GESTION DE LA DÉFENSE ---
         if regime == "DEFENSE":
-            defense_universe = Config.ASSETS["DEFENSE"]
             best_score = -9999
             best_asset = Config.CASH_SYMBOL
             
-            for asset in defense_universe:
-                if asset in closes.columns:
-                    p = closes[asset]
-                    # Momentum court (3 mois / 63 jours) pour être réactif sur le refuge
-                    if len(p) > 63:
-                        score = (p.iloc[-1] / p.iloc[-63]) - 1 
-                        if score > best_score:
-                            best_score = score
-                            best_asset = asset
+            for asset, score in defense_scores:
+                if score > best_score:
+                    best_score = score
+                    best_asset = asset
             
             return "DEFENSE", best_asset, details
 
-        return "ATTACK", None, details
\ No newline at end of file
+        return "ATTACK", None, details
+
+    def _inputs_from_frame(self, closes):
+        """(Prix SPY, SMA200) et scores refuge depuis les DataFrames de prix."""
+        spy_inputs = None
+        if "SPY" in closes.columns:
+            spy = closes["SPY"]
+            
+            # Il faut assez d'historique pour la moyenne mobile 200
+            if len(spy) > self.TREND_WINDOW:
+                spy_inputs = (spy.iloc[-1], spy.rolling(self.TREND_WINDOW).mean().iloc[-1])
+
+        defense_scores = []
+        for asset in Config.ASSETS["DEFENSE"]:
+            if asset in closes.columns:
+                p = closes[asset]
+                # Momentum court (3 mois / 63 jours) pour être réactif sur le refuge
+                if len(p) > self.REFUGE_WINDOW:
+                    defense_scores.append((asset, (p.iloc[-1] / p.iloc[-self.REFUGE_WINDOW]) - 1))
+
+        return spy_inputs, defense_scores
+
+    def _inputs_from_panel(self, panel):
+        """Mêmes entrées depuis le PricePanel (seules les 200 dernières lignes sont lues)."""
+        spy_inputs = None
+        if "SPY" in panel.columns and len(panel) > self.TREND_WINDOW:
+            spy = panel.column("SPY")
+            spy_inputs = (spy[-1], spy[-self.TREND_WINDOW:].mean())
+
+        defense_scores = []
+        if len(panel) > self.REFUGE_WINDOW:
+            closes = panel.field("close")
+            momentum = closes[-1] / closes[-self.REFUGE_WINDOW] - 1
+            for asset in Config.ASSETS["DEFENSE"]:
+                if asset in panel.columns:
+                    defense_scores.append((asset, momentum[panel.columns[asset]]))
+
+        return spy_inputs, defense_scores
+
+    def _inputs_from_state(self, state):
+        """Mêmes entrées, lues dans l'état incrémental (aucun recalcul de fenêtre)."""
+        spy_inputs = None
+        if "SPY" in state.columns and state.length > self.TREND_WINDOW:
+            j = state.columns["SPY"]
+            spy_inputs = (state.last()[j], state.sma()[j])
+
+        defense_scores = []
+        if state.length > self.REFUGE_WINDOW:
+            momentum = state.last() / state.lag(self.REFUGE_WINDOW - 1) - 1
+            for asset in Config.ASSETS["DEFENSE"]:
+                if asset in state.columns:
+                    defense_scores.append((asset, momentum[state.columns[asset]]))
+
+        return spy_inputs, defense_scores
\ No newline at end of file
@@ -18,6 +18,37 @@ class Config:
     
     MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY", "YOUR_MISTRAL_KEY_HERE")
     MISTRAL_MODEL = "mistral-tiny"
+    RISK_CACHE_TTL = 72 * 3600       # Durée de vie d'un verdict IA en cache (secondes)
+    RISK_CACHE_MAX_ENTRIES = 2000    # Taille max du cache (éviction LRU)
+
+    # Client HTTP partagé (Mistral, Discord, Alpaca)
+    HTTP_TIMEOUT = (5, 15)           # (connexion, lecture) en secondes
+    HTTP_RETRIES = 3                 # Tentatives supplémentaires sur 429/5xx
+    HTTP_BACKOFF = 0.5               # Base du backoff exponentiel (secondes)
+    HTTP_BACKOFF_MAX = 8.0           # Plafond d'attente entre deux tentatives
+    HTTP_MAX_PER_HOST = 4            # Appels simultanés max par hôte
+
+    # Exécution des ordres (suivi des statuts réels, pas de pause fixe)
+    EXECUTION_WORKERS = 8            # Envois / suivis d'ordres simultanés
+    ORDER_POLL_INTERVAL = 0.25       # Intervalle de polling des statuts (secondes)
+    ORDER_FILL_TIMEOUT = 30          # Attente max des fills par étape (secondes)
+
+    # Téléchargement des données (yfinance)
+    DATA_WORKERS = 32                # Shards téléchargés en parallèle
+    DATA_SHARD_SIZE = 8              # Tickers par shard (requêtes simultanées du shard)
+    DATA_RETRY_BACKOFF = 1.0         # Base du backoff des tickers en échec (secondes)
+
+    # Traçage des runs (spans JSON lines + tableau de synthèse)
+    TRACE_DIR = "database/traces"
+    TRACE_MEMORY = True              # Pic mémoire par étape (tracemalloc, léger surcoût)
+    TRACE_PROFILE = os.getenv("AEGIS_PROFILE", "0") == "1"  # cProfile du cycle (ou --profile)
+
+    # Processus résident (daemon.py)
+    DAEMON_TRIGGER_LEAD = 15         # Décision N minutes avant la clôture NYSE
+    DAEMON_REFRESH_MINUTES = 30      # Rafraîchissement des données pendant la séance
+    DAEMON_FINAL_REFRESH = 120       # Dernier rafraîchissement N secondes avant la décision
+    DAEMON_HOST = "127.0.0.1"        # Endpoint de santé local uniquement
+    DAEMON_PORT = 8787
 
     # --- 2. GESTION CAPITAL & RISQUE ---
     INITIAL_CAPITAL = 1000.0
@@ -37,6 +68,9 @@ class Config:
     SHARPE_WINDOW = 126      # 6 Mois pour le classement (Stabilité)
     VOLATILITY_WINDOW = 20   # 1 Mois pour le calibrage de la taille
     MOMENTUM_WINDOW = 126    # Base pour les fenêtres multiples
+    LOOKBACK_MARGIN = 20     # Séances d'historique en plus de la plus longue fenêtre
+    TOP_N = 3                # Nombre de lignes en régime ATTACK
+    BREAKOUT_THRESHOLD = 0.98 # Prix >= 98% du plus haut 20j -> Boost Breakout
 
     # Seuils
     VIX_FEAR_THRESHOLD = 20  # Au-dessus de 20, on passe en mode défensif
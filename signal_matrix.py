@@ -0,0 +1,176 @@
+# ==============================================================================
+# FICHIER : core/signal_matrix.py
+# ROLE : Pré-calcul vectorisé des signaux (Régime + Valkyrie) sur tout l'historique
+# ==============================================================================
+import pandas as pd
+import numpy as np
+from config.settings import Config
+
+class SignalMatrix:
+    """
+    Calcule UNE SEULE FOIS, sur le panel complet, ce que RegimeManager et
+    PortfolioManager recalculent chaque jour sur un préfixe de l'historique :
+    - Série SMA200 du SPY (Régime Trend King) + refuge de défense (Momentum 63j)
+    - Matrice des scores Valkyrie (Rendement 6 mois / Volatilité 20j)
+    - Matrice des volatilités et des flags de Breakout
+
+    Les fenêtres glissantes pandas sont causales : la ligne i du calcul complet
+    est identique (bit à bit) au dernier point du calcul sur iloc[:i+1].
+
+    params : surcharge des paramètres Config (voir PARAMS) pour les optimisations.
+    memo : dict partagé entre plusieurs SignalMatrix du même panel ; les matrices
+    d'indicateurs (qui ne dépendent que des fenêtres) n'y sont calculées qu'une fois.
+    """
+
+    # Outils de régime exclus du classement (identique à PortfolioManager)
+    EXCLUDED = ["BIL", "IEF", "AGG", "EEM"]
+
+    # Paramètres optimisables (noms des attributs de Config)
+    PARAMS = [
+        "SHARPE_WINDOW", "VOLATILITY_WINDOW", "TARGET_VOL_BULL",
+        "MAX_POSITION_SIZE", "BREAKOUT_THRESHOLD", "TOP_N"
+    ]
+
+    def __init__(self, data, params=None, memo=None):
+        # data : dict {'close': DataFrame, ...} ou PricePanel (panel['close'] = vue DataFrame)
+        closes = data['close']
+        self.dates = closes.index
+        self.tickers = list(closes.columns)
+        self.closes = closes.to_numpy(dtype=np.float64)
+
+        self.params = {name: getattr(Config, name) for name in self.PARAMS}
+        self.params.update(params or {})
+        self.memo = memo if memo is not None else {}
+
+        self._compute_regime(closes)
+        self._compute_attack(closes)
+
+    def _cached(self, key, compute):
+        """Matrice d'indicateur mémorisée (partagée via self.memo)."""
+        if key not in self.memo:
+            self.memo[key] = compute()
+        return self.memo[key]
+
+    # --------------------------------------------------------------------------
+    # 1. RÉGIME (TREND KING)
+    # --------------------------------------------------------------------------
+    def _compute_regime(self, closes):
+        self.is_attack, self.spy_distance, self.defense_asset = \
+            self._cached("regime", lambda: self._regime_series(closes))
+
+    def _regime_series(self, closes):
+        n = len(closes)
+        rows = np.arange(n)
+
+        # ATTACK par défaut (pas de SPY ou pas assez d'historique)
+        is_attack = np.ones(n, dtype=bool)
+        spy_distance = np.zeros(n)
+
+        if "SPY" in closes.columns:
+            spy = closes["SPY"]
+            sma_200 = spy.rolling(200).mean()
+            enough = rows > 199  # len(spy) > 200 sur le préfixe iloc[:i+1]
+
+            above = (spy > sma_200).to_numpy()
+            is_attack = np.where(enough, above, True)
+            distance = ((spy / sma_200) - 1).to_numpy()
+            spy_distance = np.where(enough, distance, 0.0)
+
+        # Refuge : meilleur Momentum 63j (premier rencontré en cas d'égalité)
+        defense_asset = np.full(n, Config.CASH_SYMBOL, dtype=object)
+        defense = [a for a in Config.ASSETS["DEFENSE"] if a in closes.columns]
+        if defense:
+            p = closes[defense]
+            # p.iloc[-1] / p.iloc[-63] sur le préfixe = décalage de 62 lignes
+            mom = ((p / p.shift(62)) - 1).to_numpy()
+            mom = np.where(mom > -9999, mom, -np.inf)  # NaN / scores absurdes ignorés
+            best = np.argmax(mom, axis=1)
+            valid = (mom[rows, best] > -np.inf) & (rows > 62)  # len(p) > 63
+            names = np.array(defense, dtype=object)
+            defense_asset = np.where(valid, names[best], Config.CASH_SYMBOL)
+
+        return is_attack, spy_distance, defense_asset
+
+    # --------------------------------------------------------------------------
+    # 2. VALKYRIE (SCORES, VOLATILITÉ, BREAKOUT)
+    # --------------------------------------------------------------------------
+    def _compute_attack(self, closes):
+        # Même ordre de scan que PortfolioManager (départage des égalités) ; trié :
+        # l'ordre d'un set dépend de la graine de hachage de chaque processus
+        scan_list = sorted(set(Config.ASSETS["ATTACK"] + Config.ASSETS["DEFENSE"]))
+        self.scan = [t for t in scan_list if t in closes.columns and t not in self.EXCLUDED]
+        top_n = self.params["TOP_N"]
+
+        if not self.scan:
+            n = len(closes)
+            self.scores = np.empty((n, 0))
+            self.volatility = np.empty((n, 0))
+            self.breakout = np.empty((n, 0), dtype=bool)
+            self.weights = np.empty((n, 0))
+            self.ranking = np.empty((n, 0), dtype=np.intp)
+            self.n_valid = np.zeros(n, dtype=np.intp)
+            return
+
+        sub = self._cached("scan_prices", lambda: closes[self.scan])
+        sharpe_window = self.params["SHARPE_WINDOW"]
+        vol_window = self.params["VOLATILITY_WINDOW"]
+        returns = self._cached(("returns", sharpe_window),
+                               lambda: sub.pct_change(sharpe_window).to_numpy())
+        vol = self._cached(("volatility", vol_window),
+                           lambda: (sub.pct_change().rolling(vol_window).std() * np.sqrt(252)).to_numpy())
+        rolling_max = self._cached(("max", 20), lambda: sub.rolling(20).max().to_numpy())
+        price = self._cached("price", lambda: sub.to_numpy())
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = returns / vol
+            valid = ~np.isnan(returns) & ~np.isnan(vol) & (vol != 0) & (score > 0)
+            self.scores = np.where(valid, score, -np.inf)
+            self.volatility = vol
+
+            # Sizing Volatilité Cible : Slot 1/N * (Cible / Vol) * Boost Breakout
+            self.breakout = price >= (rolling_max * self.params["BREAKOUT_THRESHOLD"])
+            weight = (1.0 / top_n) * (self.params["TARGET_VOL_BULL"] / vol)
+            weight = np.where(self.breakout, weight * 1.2, weight)
+            self.weights = np.minimum(weight, self.params["MAX_POSITION_SIZE"])
+
+        # Classement décroissant stable (= list.sort(reverse=True) de Python)
+        self.ranking = np.argsort(-self.scores, axis=1, kind='stable')[:, :top_n]
+        self.n_valid = np.minimum(valid.sum(axis=1), top_n)
+
+    # --------------------------------------------------------------------------
+    # 3. ORDRES CIBLES
+    # --------------------------------------------------------------------------
+    def orders_at(self, i):
+        """
+        Équivalent de analyze_market_health + select_*_portfolio au jour i.
+        Retourne (regime, orders) au format attendu par le rebalancing.
+        """
+        if not self.is_attack[i]:
+            return "DEFENSE", [{
+                'ticker': self.defense_asset[i],
+                'weight': 1.0,
+                'score': 0,
+                'note': "🛡️ BUNKER MODE"
+            }]
+
+        orders = []
+        for col in self.ranking[i, :self.n_valid[i]]:
+            orders.append({
+                'ticker': self.scan[col],
+                'score': self.scores[i, col],
+                'volatility': self.volatility[i, col],
+                'weight': round(self.weights[i, col], 3),
+                'note': "🔥 BREAKOUT" if self.breakout[i, col] else "✅ STRONG TREND"
+            })
+        return "ATTACK", orders
+
+    def target_weights(self, start_index=0):
+        """Matrice quotidienne des poids cibles [dates x tickers]."""
+        columns = {t: j for j, t in enumerate(self.tickers)}
+        matrix = np.zeros((len(self.dates) - start_index, len(self.tickers)))
+        for i in range(start_index, len(self.dates)):
+            _, orders = self.orders_at(i)
+            for order in orders:
+                if order['ticker'] in columns:
+                    matrix[i - start_index, columns[order['ticker']]] = order['weight']
+        return pd.DataFrame(matrix, index=self.dates[start_index:], columns=self.tickers)
@@ -3,59 +3,153 @@
 # ROLE : Gestionnaire d'État (Black Box Recorder)
 # ==============================================================================
 import pandas as pd
+import json
 import os
+import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from config.settings import Config
 
 class StateManager:
-    def __init__(self, filename="database/history.csv"):
+    """
+    Historique quotidien du portefeuille dans SQLite (Date = clé primaire) :
+    - Upsert O(log n) sur l'index, sans relire ni réécrire le fichier
+    - Écritures atomiques (transaction + journal WAL : lecture du dashboard
+      possible pendant l'écriture du bot, aucun état partiel après un crash)
+    - Colonnes par jour : Equity, SPY_Price, Regime, Weights (JSON), Fees
+    - Revision : compteur croissant à chaque écriture (lectures incrémentales)
+    L'ancien database/history.csv est importé automatiquement au premier lancement.
+    """
+
+    COLUMNS = ["Equity", "SPY_Price", "Regime", "Weights", "Fees"]
+
+    def __init__(self, filename="database/history.db", legacy_csv="database/history.csv"):
         self.filename = filename
+        self.legacy_csv = legacy_csv
+        self._lock = threading.Lock()
         self.ensure_db_exists()
 
+    @contextmanager
+    def _connect(self):
+        """Connexion courte : commit en sortie (rollback si exception), puis fermeture."""
+        conn = sqlite3.connect(self.filename, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
     def ensure_db_exists(self):
-        """Crée le fichier CSV s'il n'existe pas encore."""
-        if not os.path.exists("database"):
-            os.makedirs("database")
-            
-        if not os.path.exists(self.filename):
-            # Création de l'en-tête initial
-            df = pd.DataFrame(columns=["Date", "Equity", "SPY_Price"])
-            # On ajoute une ligne de départ (J-1) pour que le graph ne soit pas vide
-            # start_date = (datetime.now() - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
-            # df.loc[0] = [start_date, Config.INITIAL_CAPITAL, 0]
-            df.to_csv(self.filename, index=False)
-            print(f"💾 [Storage] Nouvelle base de données créée : {self.filename}")
-
-    def save_snapshot(self, equity, spy_price):
-        """Enregistre l'état du portefeuille à l'instant T."""
-        today = datetime.now().strftime("%Y-%m-%d")
-        
+        """Crée la base (et importe l'ancien CSV) si elle n'existe pas encore."""
+        folder = os.path.dirname(self.filename)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        with self._lock, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS history (
+                    Date TEXT PRIMARY KEY,
+                    Equity REAL NOT NULL,
+                    SPY_Price REAL,
+                    Regime TEXT,
+                    Weights TEXT,
+                    Fees REAL,
+                    Revision INTEGER NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_history_revision ON history (Revision)")
+            empty = conn.execute("SELECT 1 FROM history LIMIT 1").fetchone() is None
+
+        if empty and self.legacy_csv and os.path.exists(self.legacy_csv):
+            self.migrate_csv(self.legacy_csv)
+
+    def migrate_csv(self, path):
+        """Importe un historique CSV (Date, Equity, SPY_Price, ...) en une transaction."""
+        df = pd.read_csv(path)
+        if df.empty:
+            return 0
+        df['Date'] = pd.to_datetime(df['Date']).dt.strftime("%Y-%m-%d")
+
+        with self._lock, self._connect() as conn:
+            revision = self._next_revision(conn)
+            rows = [
+                (row.Date, float(row.Equity), self._value(row, "SPY_Price"), self._value(row, "Regime"),
+                 self._value(row, "Weights"), self._value(row, "Fees"), revision + k)
+                for k, row in enumerate(df.itertuples(index=False))
+            ]
+            conn.executemany("""
+                INSERT INTO history (Date, Equity, SPY_Price, Regime, Weights, Fees, Revision)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(Date) DO NOTHING""", rows)
+        print(f"💾 [Storage] Migration de {path} : {len(rows)} jours importés dans {self.filename}")
+        return len(rows)
+
+    @staticmethod
+    def _value(row, column):
+        value = getattr(row, column, None)
+        return None if value is None or pd.isna(value) else value
+
+    @staticmethod
+    def _next_revision(conn):
+        # MAX sur colonne indexée : O(log n)
+        return conn.execute("SELECT COALESCE(MAX(Revision), 0) + 1 FROM history").fetchone()[0]
+
+    def save_snapshot(self, equity, spy_price, regime=None, weights=None, fees=None, date=None):
+        """
+        Enregistre l'état du portefeuille à l'instant T (upsert sur la date).
+        regime / weights ({ticker: poids}) / fees : colonnes optionnelles,
+        conservées si non fournies lors d'une mise à jour du même jour.
+        """
+        today = date or datetime.now().strftime("%Y-%m-%d")
+        weights = json.dumps(weights, sort_keys=True) if weights is not None else None
+
         try:
-            df = pd.read_csv(self.filename)
-            
-            # Évite les doublons si on lance le script 2 fois le même jour
-            if today in df['Date'].values:
-                # Mise à jour de la ligne existante
-                df.loc[df['Date'] == today, ['Equity', 'SPY_Price']] = [equity, spy_price]
-                action = "Mise à jour"
-            else:
-                # Ajout nouvelle ligne
-                new_row = pd.DataFrame({"Date": [today], "Equity": [equity], "SPY_Price": [spy_price]})
-                df = pd.concat([df, new_row], ignore_index=True)
-                action = "Ajout"
-            
-            df.to_csv(self.filename, index=False)
+            with self._lock, self._connect() as conn:
+                # Évite les doublons si on lance le script 2 fois le même jour
+                exists = conn.execute("SELECT 1 FROM history WHERE Date = ?", (today,)).fetchone()
+                conn.execute("""
+                    INSERT INTO history (Date, Equity, SPY_Price, Regime, Weights, Fees, Revision)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(Date) DO UPDATE SET
+                        Equity = excluded.Equity,
+                        SPY_Price = excluded.SPY_Price,
+                        Regime = COALESCE(excluded.Regime, Regime),
+                        Weights = COALESCE(excluded.Weights, Weights),
+                        Fees = COALESCE(excluded.Fees, Fees),
+                        Revision = excluded.Revision""",
+                    (today, equity, spy_price, regime, weights, fees, self._next_revision(conn)))
+            action = "Mise à jour" if exists else "Ajout"
             print(f"💾 [Storage] Snapshot sauvegardé ({action}) : ${equity:.2f} | SPY ${spy_price:.2f}")
-            
+
         except Exception as e:
             print(f"❌ [Storage] Erreur de sauvegarde : {e}")
 
-    def get_history(self):
-        """Charge l'historique pour le graphique."""
+    def get_history(self, start=None, end=None):
+        """Charge l'historique (plage [start, end] optionnelle, via l'index de la clé)."""
+        query, params = "SELECT Date, " + ", ".join(self.COLUMNS) + " FROM history", []
+        if start is not None or end is not None:
+            query += " WHERE Date BETWEEN ? AND ?"
+            params = [str(pd.Timestamp(start or "1900-01-01").date()), str(pd.Timestamp(end or "2999-12-31").date())]
         try:
-            df = pd.read_csv(self.filename)
+            with self._connect() as conn:
+                df = pd.read_sql_query(query + " ORDER BY Date", conn, params=params)
             df['Date'] = pd.to_datetime(df['Date'])
             df = df.set_index('Date')
             return df
         except Exception:
-            return pd.DataFrame() # Retourne vide en cas d'erreur
\ No newline at end of file
+            return pd.DataFrame() # Retourne vide en cas d'erreur
+
+    def read_since(self, revision):
+        """Lignes écrites ou modifiées après 'revision' (lecture incrémentale)."""
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                "SELECT Date, " + ", ".join(self.COLUMNS) + ", Revision FROM history "
+                "WHERE Revision > ? ORDER BY Date", conn, params=[int(revision)])
+        df['Date'] = pd.to_datetime(df['Date'])
+        return df
+
+    def stamp(self):
+        """Tampon de modification : dernière révision écrite (0 si vide)."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COALESCE(MAX(Revision), 0) FROM history").fetchone()[0]
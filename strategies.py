@@ -30,5 +30,10 @@ class StrategyConfig:
     # --- SENTINEL (L'IA) ---
     SENTINEL_PARAMS = {
         "VETO_ENABLED": True,        # Activer le blocage par news ?
-        "MAX_RISK_KEYWORDS": ["FRAUD", "SEC INVESTIGATION", "BANKRUPTCY"]
+        "MAX_RISK_KEYWORDS": ["FRAUD", "SEC INVESTIGATION", "BANKRUPTCY"],
+
+        # Exécution concurrente du veto (News + IA)
+        "MAX_WORKERS": 4,            # Tickers analysés en parallèle
+        "STAGE_DEADLINE": 20,        # Secondes max pour toute l'étape Sentinel
+        "TIMEOUT_VERDICT": "SAFE"    # Verdict si un ticker dépasse la deadline
     }
\ No newline at end of file
@@ -0,0 +1,322 @@
+# ==============================================================================
+# FICHIER : streaming.py
+# ROLE : Mode intraday (Barres en flux -> Régime / Valkyrie / Breakout incrémentaux)
+# ==============================================================================
+import argparse
+import json
+import socket
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+import numpy as np
+import pandas as pd
+from config.settings import Config
+from core.indicators import IndicatorState
+from utils.market_calendar import MarketCalendar
+
+Bar = namedtuple("Bar", "symbol time close")
+
+# ------------------------------------------------------------------------------
+# SOURCES DE BARRES (tout itérable de Bar convient : flux broker, fichier, socket)
+# ------------------------------------------------------------------------------
+def parse_bar(line):
+    """Ligne JSON {"symbol"|"S", "t", "c"|"close"} (format des barres Alpaca) -> Bar."""
+    raw = json.loads(line)
+    return Bar(raw.get("symbol") or raw["S"], pd.Timestamp(raw["t"]), float(raw.get("close", raw.get("c"))))
+
+class FileBarSource:
+    """
+    Rejoue un fichier JSON lines de barres, dans l'ordre du fichier.
+    speed : 0 = aussi vite que possible, 1 = temps réel, 60 = une heure par minute.
+    """
+
+    def __init__(self, path, speed=0):
+        self.path = path
+        self.speed = speed
+
+    def __iter__(self):
+        first, started = None, time.monotonic()
+        with open(self.path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                bar = parse_bar(line)
+                if self.speed:
+                    first = first or bar.time
+                    wait = (bar.time - first).total_seconds() / self.speed - (time.monotonic() - started)
+                    if wait > 0:
+                        time.sleep(wait)
+                yield bar
+
+class SocketBarSource:
+    """Client TCP : une barre JSON par ligne (voir serve_file pour la doublure de test)."""
+
+    def __init__(self, host="127.0.0.1", port=9009):
+        self.host = host
+        self.port = port
+
+    def __iter__(self):
+        with socket.create_connection((self.host, self.port)) as conn, conn.makefile("r") as stream:
+            for line in stream:
+                if line.strip():
+                    yield parse_bar(line)
+
+def serve_file(path, host="127.0.0.1", port=9009, speed=0):
+    """Doublure de flux : diffuse un fichier de barres à chaque client TCP. Retourne le serveur."""
+    class Handler(StreamRequestHandler):
+        def handle(self):
+            for bar in FileBarSource(path, speed):
+                line = json.dumps({"symbol": bar.symbol, "t": bar.time.isoformat(), "c": bar.close})
+                self.wfile.write((line + "\n").encode())
+
+    ThreadingTCPServer.allow_reuse_address = True
+    server = ThreadingTCPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# ------------------------------------------------------------------------------
+# MOTEUR INCRÉMENTAL
+# ------------------------------------------------------------------------------
+class StreamingEngine:
+    """
+    Évaluation intraday de la stratégie, barre par barre. Le dernier prix de
+    chaque ticker tient lieu de clôture (provisoire) de la séance en cours.
+    Au début de chaque séance, les parts « passées » des fenêtres sont figées
+    à partir de l'IndicatorState (somme des 199 dernières clôtures, sommes des
+    19 derniers rendements, plus haut 19 jours, clôture d'il y a 125 jours) ;
+    une barre ne coûte ensuite que O(1) pour son ticker :
+    - distance SMA200 = prix / ((base + prix) / 200) - 1
+    - score Valkyrie = rendement 6 mois / volatilité 20j (rendement du jour inclus)
+    - breakout = prix >= plus haut 20j x Config.BREAKOUT_THRESHOLD
+    Le Top N n'est reclassé que si le ticker touché peut entrer ou sortir.
+    Événements émis : 'regime' (bascule du SPY autour de sa SMA200) et
+    'top' (changement de l'ensemble du Top N) ; la première barre émet l'état
+    initial. Au changement de date, la séance est close dans l'IndicatorState
+    (update) et les bases sont recalculées.
+    """
+
+    EXCLUDED = ["BIL", "IEF", "AGG", "EEM"]   # Outils de régime (comme PortfolioManager)
+
+    def __init__(self, state, top_n=None):
+        self.state = state
+        self.top_n = top_n or Config.TOP_N
+        self.columns = state.columns
+        scan = sorted(set(Config.ASSETS["ATTACK"] + Config.ASSETS["DEFENSE"]) - set(self.EXCLUDED))
+        self.scan = np.array([self.columns[t] for t in scan if t in self.columns], dtype=np.intp)
+        self.in_scan = np.zeros(len(state.tickers), dtype=bool)
+        self.in_scan[self.scan] = True
+        self.spy = self.columns.get("SPY")
+
+        self.session = None
+        self.regime = None
+        self.top = frozenset()
+        self.bars = 0
+        self.ignored = 0
+
+    @classmethod
+    def from_history(cls, data, session=None, **kwargs):
+        """Moteur amorcé sur l'historique journalier antérieur à la séance 'session'."""
+        closes = data['close']
+        if session is not None:
+            closes = closes.loc[closes.index < pd.Timestamp(session)]
+        return cls(IndicatorState.from_history({'close': closes}), **kwargs)
+
+    # --------------------------------------------------------------------------
+    # SÉANCE
+    # --------------------------------------------------------------------------
+    def _open_session(self, day):
+        """Fige les parts passées des fenêtres (une fois par séance, O(tickers x fenêtre))."""
+        s = self.state
+        sma_n, vol_n, max_n = s.sma_window, s.vol_window, s.MAX_WINDOW
+        window = s._window(max(sma_n, vol_n + 1))  # Lignes les plus récentes d'abord
+
+        self.session = day
+        self.last_close = s.last()
+        self.sma_base = np.where(s.count >= sma_n - 1, np.nansum(window[:sma_n - 1], axis=0), np.nan)
+        self.ret_base = s.lag(s.return_window - 1)
+        past = window[:vol_n]
+        rets = past[:-1] / past[1:] - 1                      # 19 derniers rendements
+        self.ret_sum = np.nansum(rets, axis=0)
+        self.ret_sq = np.nansum(rets * rets, axis=0)
+        self.vol_ready = s.rcount >= vol_n - 1
+        self.max_base = np.where(s.count >= max_n - 1, np.nanmax(window[:max_n - 1], axis=0), np.nan)
+
+        self.price = self.last_close.copy()
+        k = len(s.tickers)
+        self.distance = np.full(k, np.nan)
+        self.score = np.full(k, np.nan)
+        self.volatility = np.full(k, np.nan)
+        self.breakout = np.zeros(k, dtype=bool)
+        for j in range(k):
+            self._evaluate(j, self.price[j])
+
+    def _close_session(self):
+        """Clôture provisoire -> bougie journalière définitive dans l'IndicatorState."""
+        self.state.update(pd.Timestamp(self.session), self.price)
+
+    # --------------------------------------------------------------------------
+    # BARRE
+    # --------------------------------------------------------------------------
+    def _evaluate(self, j, price):
+        s = self.state
+        if not np.isnan(self.sma_base[j]):
+            self.distance[j] = price / ((self.sma_base[j] + price) / s.sma_window) - 1
+
+        r = price / self.last_close[j] - 1
+        if self.vol_ready[j] and not np.isnan(r):
+            n = s.vol_window
+            total, squares = self.ret_sum[j] + r, self.ret_sq[j] + r * r
+            var = max(squares - total * total / n, 0.0) / (n - 1)
+            self.volatility[j] = np.sqrt(var) * np.sqrt(252)
+        ret = price / self.ret_base[j] - 1
+        vol = self.volatility[j]
+        self.score[j] = ret / vol if vol > 0 and not np.isnan(ret) else np.nan
+
+        high = self.max_base[j]
+        self.breakout[j] = not np.isnan(high) and price >= max(high, price) * Config.BREAKOUT_THRESHOLD
+
+    def _rank(self):
+        scores = self.score[self.scan]
+        valid = np.where(scores > 0, scores, -np.inf)   # NaN -> exclu (comme Valkyrie)
+        order = np.argsort(-valid, kind='stable')[:self.top_n]
+        return frozenset(int(self.scan[k]) for k in order if np.isfinite(valid[k]))
+
+    def _regime(self):
+        if self.spy is None or np.isnan(self.distance[self.spy]):
+            return None
+        return "ATTACK" if self.distance[self.spy] > 0 else "DEFENSE"
+
+    def on_bar(self, bar):
+        """Intègre une barre ; retourne la liste des événements (souvent vide)."""
+        j = self.columns.get(bar.symbol)
+        if j is None:
+            self.ignored += 1
+            return []
+        day = bar.time.date()
+        opened = self.session != day
+        if opened:
+            if self.session is not None:
+                self._close_session()
+            self._open_session(day)
+
+        self.bars += 1
+        self.price[j] = bar.close
+        self._evaluate(j, bar.close)
+        events = []
+
+        # Ouverture de séance : état complet comparé à celui de la veille (bascules de nuit)
+        if j == self.spy or opened:
+            regime = self._regime()
+            if regime != self.regime and regime is not None:
+                events.append(self._event("regime", bar, previous=self.regime, regime=regime,
+                                           distance=round(float(self.distance[self.spy]), 6)))
+                self.regime = regime
+
+        if self.in_scan[j] or opened:
+            # Reclassement seulement si j peut modifier l'ensemble du Top N
+            floor = min((self.score[k] for k in self.top), default=-np.inf)
+            if opened or j in self.top or len(self.top) < self.top_n or self.score[j] > floor:
+                top = self._rank()
+                if top != self.top:
+                    events.append(self._event("top", bar, top=self._names(top),
+                                              added=self._names(top - self.top), removed=self._names(self.top - top)))
+                    self.top = top
+        return events
+
+    def _names(self, columns):
+        tickers = self.state.tickers
+        return sorted(tickers[k] for k in columns)
+
+    def _event(self, kind, bar, **fields):
+        return {"type": kind, "time": bar.time.isoformat(), "trigger": bar.symbol, **fields}
+
+    def run(self, source, on_event=None):
+        """Consomme la source ; on_event(événement) à chaque bascule. Retourne le nombre d'événements."""
+        emitted = 0
+        for bar in source:
+            for event in self.on_bar(bar):
+                emitted += 1
+                if on_event is not None:
+                    on_event(event)
+        return emitted
+
+    def snapshot(self):
+        """État courant par ticker : prix, distance SMA200, score, volatilité, breakout."""
+        return pd.DataFrame({
+            "price": self.price, "sma200_distance": self.distance, "score": self.score,
+            "volatility": self.volatility, "breakout": self.breakout,
+        }, index=self.state.tickers)
+
+# ------------------------------------------------------------------------------
+# OUTILS
+# ------------------------------------------------------------------------------
+def synthetic_bars(path, closes, session, minutes=390, seed=7):
+    """Barres minute synthétiques (marche aléatoire depuis la dernière clôture) pour tester."""
+    rng = np.random.default_rng(seed)
+    tickers = list(closes.index)
+    start = datetime.combine(pd.Timestamp(session).date(), MarketCalendar.OPEN, tzinfo=MarketCalendar.TIMEZONE)
+    prices = closes.to_numpy(dtype=np.float64)
+    with open(path, "w") as f:
+        for m in range(minutes):
+            prices = prices * np.exp(rng.normal(0, 0.0015, len(prices)))
+            stamp = (pd.Timestamp(start) + pd.Timedelta(minutes=m)).isoformat()
+            for ticker, price in zip(tickers, prices):
+                if np.isfinite(price):
+                    f.write(json.dumps({"symbol": ticker, "t": stamp, "c": round(float(price), 4)}) + "\n")
+    return path
+
+def _history():
+    """Historique journalier du cache local (aucun téléchargement), antérieur à la séance."""
+    from data.feed import DataFeed
+    from core.lookback import LookbackPlanner
+    data = DataFeed().fetch_market_data(start=LookbackPlanner.start_date(), refresh=False)
+    if data is None:
+        raise ValueError("Historique indisponible (lancer main.py une première fois).")
+    return data
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mode streaming intraday (barres minute).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("replay", "listen", "synth", "serve"):
+        cmd = commands.add_parser(name)
+        cmd.add_argument("--session", default=str(MarketCalendar.today()), help="Date de la séance (AAAA-MM-JJ)")
+        if name in ("replay", "synth", "serve"):
+            cmd.add_argument("path", help="Fichier JSON lines de barres")
+        if name in ("replay", "serve"):
+            cmd.add_argument("--speed", type=float, default=0, help="0 = max, 1 = temps réel, 60 = x60")
+        if name in ("listen", "serve"):
+            cmd.add_argument("--host", default="127.0.0.1")
+            cmd.add_argument("--port", type=int, default=9009)
+        if name == "synth":
+            cmd.add_argument("--minutes", type=int, default=390)
+    args = parser.parse_args()
+
+    try:
+        if args.command == "serve":
+            server = serve_file(args.path, args.host, args.port, args.speed)
+            print(f"📡 [Stream] Diffusion de {args.path} sur {args.host}:{args.port} (Ctrl+C pour arrêter)")
+            threading.Event().wait()
+
+        data = _history()
+        if args.command == "synth":
+            closes = data['close'].loc[data['close'].index < pd.Timestamp(args.session)].iloc[-1]
+            synthetic_bars(args.path, closes, args.session, args.minutes)
+            print(f"🧪 [Stream] Barres synthétiques écrites : {args.path}")
+        else:
+            engine = StreamingEngine.from_history(data, session=args.session)
+            source = FileBarSource(args.path, args.speed) if args.command == "replay" \
+                else SocketBarSource(args.host, args.port)
+            show = lambda e: print(f"⚡ [Stream] {e['time']} {e['type'].upper()} : " + (
+                f"{e['previous']} -> {e['regime']} (SPY {e['distance']:+.2%})" if e['type'] == "regime"
+                else f"Top {', '.join(e['top'])} (+{e['added']} -{e['removed']})"))
+            start = time.perf_counter()
+            emitted = engine.run(source, show)
+            elapsed = time.perf_counter() - start
+            print(f"\n✅ [Stream] {engine.bars} barres, {emitted} événements en {elapsed:.2f}s "
+                  f"({engine.bars / max(elapsed, 1e-9):,.0f} barres/s, {engine.ignored} ignorées)")
+    except KeyboardInterrupt:
+        print("\n🛑 Arrêt manuel.")
+    except Exception as e:
+        print(f"❌ Erreur Stream : {e}")
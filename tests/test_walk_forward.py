@@ -0,0 +1,21 @@
+# ==============================================================================
+# FICHIER : tests/test_walk_forward.py
+# ROLE : Walk-Forward à une seule combinaison == simulation continue
+# ==============================================================================
+import numpy as np
+from backtest_suite import BacktestEngine
+from benchmarks import SyntheticMarket
+from walk_forward import WalkForward
+
+def test_single_combination_matches_continuous_simulation():
+    data = SyntheticMarket(n_tickers=20, years=4, seed=11).generate()
+    wf = WalkForward(grid={"TOP_N": [3]}, train_days=252, test_days=21, workers=2)
+    folds_table, equity = wf.run(data)
+
+    folds = wf.folds(len(data['close']))
+    continuous = BacktestEngine().simulate(data, params={"TOP_N": 3}, verbose=False,
+                                           start_index=folds[0][1], end_index=folds[-1][2])
+
+    assert len(folds_table) == len(folds) > 1
+    assert list(equity.index) == list(continuous['Date'])
+    np.testing.assert_allclose(equity['Equity'].to_numpy(), continuous['Equity'].to_numpy(), rtol=1e-12)
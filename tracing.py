@@ -0,0 +1,192 @@
+# ==============================================================================
+# FICHIER : utils/tracing.py
+# ROLE : Traçage par étape (Temps mur, CPU, Pic mémoire) + cProfile optionnel
+# ==============================================================================
+import cProfile
+import io
+import itertools
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from config.settings import Config
+
+class Tracer:
+    """
+    Traceur d'un run : chaque span (étape nommée) enregistre
+    - wall : temps écoulé (perf_counter)
+    - cpu : temps CPU du thread qui exécute la span (thread_time)
+    - peak_kb : pic d'allocation Python/numpy pendant la span, au-dessus du
+      niveau d'entrée (tracemalloc ; pic du processus entier : les spans
+      exécutées en parallèle se voient mutuellement)
+    Une ligne JSON par span est écrite dès sa fermeture dans
+    Config.TRACE_DIR/<run_id>.jsonl (rien n'est perdu si le run plante).
+    Hors d'un run tracé, Tracer.span() ne coûte qu'un test.
+    """
+
+    _active = None
+
+    def __init__(self, run_id=None, folder=None, memory=None, profile=None):
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.folder = folder or Config.TRACE_DIR
+        self.memory = Config.TRACE_MEMORY if memory is None else memory
+        self.profile = Config.TRACE_PROFILE if profile is None else profile
+        self.path = os.path.join(self.folder, f"{self.run_id}.jsonl")
+        self.spans = []
+        self._open = {}                 # {id: span en cours} (mise à jour des pics)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local() # Pile des spans par thread (parenté)
+        self._file = None
+        self._profiler = None
+        self._started_memory = False
+
+    # --------------------------------------------------------------------------
+    # CYCLE DE VIE
+    # --------------------------------------------------------------------------
+    def __enter__(self):
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+        self._file = open(self.path, "a")
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_memory = True
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        Tracer._active = self
+        self._root = self.span("cycle")
+        self._root.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self._root.__exit__(*exc)
+        Tracer._active = None
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._dump_profile()
+        if self._started_memory:
+            tracemalloc.stop()
+        self._file.close()
+        self.summary()
+        return False
+
+    # --------------------------------------------------------------------------
+    # SPANS
+    # --------------------------------------------------------------------------
+    @classmethod
+    @contextmanager
+    def span(cls, name, **attrs):
+        """with Tracer.span("regime"): ...  (sans effet si aucun run n'est tracé)"""
+        tracer = cls._active
+        if tracer is None:
+            yield None
+            return
+        record = tracer._start(name, attrs)
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            tracer._finish(record)
+
+    @classmethod
+    def instrument(cls, target, prefix):
+        """Proxy dont chaque appel de méthode est une span '<prefix>.<méthode>'."""
+        return _TracedProxy(target, prefix)
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _start(self, name, attrs):
+        stack = self._stack()
+        record = {
+            "run": self.run_id, "id": next(self._ids), "name": name,
+            "parent": stack[-1]["id"] if stack else None,
+            "thread": threading.current_thread().name, **attrs,
+        }
+        if self.memory:
+            with self._lock:
+                current, peak = tracemalloc.get_traced_memory()
+                # Le pic global va être remis à zéro : chaque span ouverte garde le sien
+                for other in self._open.values():
+                    other["_peak"] = max(other["_peak"], peak)
+                tracemalloc.reset_peak()
+                record["_base"], record["_peak"] = current, current
+                self._open[record["id"]] = record
+        stack.append(record)
+        record["_wall"], record["_cpu"] = time.perf_counter(), time.thread_time()
+        return record
+
+    def _finish(self, record):
+        record["wall"] = round(time.perf_counter() - record.pop("_wall"), 6)
+        record["cpu"] = round(time.thread_time() - record.pop("_cpu"), 6)
+        stack = self._stack()
+        if stack and stack[-1] is record:
+            stack.pop()
+        with self._lock:
+            if self.memory:
+                peak = max(record.pop("_peak"), tracemalloc.get_traced_memory()[1])
+                record["peak_kb"] = round((peak - record.pop("_base")) / 1024, 1)
+                self._open.pop(record["id"], None)
+            self.spans.append(record)
+            self._file.write(json.dumps(record, default=str) + "\n")
+            self._file.flush()
+
+    # --------------------------------------------------------------------------
+    # RAPPORTS
+    # --------------------------------------------------------------------------
+    def summary(self):
+        """Tableau de fin de run : spans agrégées par nom, triées par temps mur."""
+        rows = {}
+        for s in self.spans:
+            row = rows.setdefault(s["name"], {"n": 0, "wall": 0.0, "cpu": 0.0, "peak_kb": 0.0})
+            row["n"] += 1
+            row["wall"] += s["wall"]
+            row["cpu"] += s["cpu"]
+            row["peak_kb"] = max(row["peak_kb"], s.get("peak_kb", 0.0))
+
+        print(f"\n⏱️ [Trace] Run {self.run_id} ({self.path})")
+        print(f"   {'Étape':<28}{'N':>5}{'Mur (s)':>10}{'CPU (s)':>10}{'Pic (Mo)':>10}")
+        for name, row in sorted(rows.items(), key=lambda kv: -kv[1]["wall"]):
+            print(f"   {name[:27]:<28}{row['n']:>5}{row['wall']:>10.3f}{row['cpu']:>10.3f}"
+                  f"{row['peak_kb'] / 1024:>10.1f}")
+        return rows
+
+    def _dump_profile(self, top=25):
+        path = os.path.join(self.folder, f"{self.run_id}.prof")
+        self._profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        print(f"\n🔬 [Trace] Profil cProfile : {path} (snakeviz / pstats)")
+        print(out.getvalue())
+
+class _TracedProxy:
+    """Enveloppe un client (ex : REST Alpaca) : une span par appel de méthode."""
+
+    def __init__(self, target, prefix):
+        self._target = target
+        self._prefix = prefix
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        def traced(*args, **kwargs):
+            with Tracer.span(f"{self._prefix}.{name}"):
+                return attr(*args, **kwargs)
+        return traced
+
+    def __setattr__(self, name, value):
+        if name in ("_target", "_prefix"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._target, name, value)
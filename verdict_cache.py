@@ -0,0 +1,101 @@
+# ==============================================================================
+# FICHIER : intelligence/verdict_cache.py
+# ROLE : Cache persistant des verdicts IA (TTL + éviction LRU + compteurs)
+# ==============================================================================
+import hashlib
+import json
+import os
+import threading
+import time
+
+class VerdictCache:
+    """
+    Mémorise les verdicts SAFE/DANGER par (ticker, modèle, version du prompt,
+    hash des titres normalisés). Mêmes news = zéro appel LLM tant que le TTL court.
+    Le fichier JSON est réécrit atomiquement à chaque put() ; les lectures ne
+    touchent que la mémoire (compteurs et LRU écrits par flush() en fin de veto).
+    L'accès est protégé par un verrou (le veto Sentinel interroge l'oracle
+    depuis plusieurs threads).
+    """
+
+    def __init__(self, filename="database/risk_cache.json", ttl=72 * 3600, max_entries=2000):
+        self.filename = filename
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data = self._load()
+        self._dirty = False  # Compteurs / last_used modifiés depuis la dernière écriture
+
+    @staticmethod
+    def make_key(ticker, model, prompt_version, headlines):
+        """Clé stable : titres normalisés (casse, espaces) et triés avant hachage."""
+        normalized = sorted(" ".join(h.lower().split()) for h in headlines if h)
+        digest = hashlib.sha256("\n".join(normalized).encode("utf-8")).hexdigest()[:16]
+        return f"{ticker}|{model}|{prompt_version}|{digest}"
+
+    def get(self, key):
+        """Verdict en cache (None si absent ou expiré). Met à jour les compteurs (en mémoire)."""
+        with self._lock:
+            entry = self._data["entries"].get(key)
+            now = time.time()
+            if entry is None or now - entry["created"] > self.ttl:
+                if entry is not None:
+                    del self._data["entries"][key]
+                self._data["stats"]["misses"] += 1
+                self._dirty = True
+                return None
+
+            entry["last_used"] = now
+            self._data["stats"]["hits"] += 1
+            self._dirty = True
+            return entry["verdict"]
+
+    def put(self, key, verdict):
+        with self._lock:
+            now = time.time()
+            self._data["entries"][key] = {"verdict": verdict, "created": now, "last_used": now}
+            self._evict()
+            self._save()
+
+    def flush(self):
+        """Écrit les compteurs et dates d'utilisation accumulés par get()."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._data["stats"], size=len(self._data["entries"]))
+
+    def _evict(self):
+        """Supprime les entrées expirées puis les moins récemment utilisées."""
+        entries = self._data["entries"]
+        now = time.time()
+        for key in [k for k, e in entries.items() if now - e["created"] > self.ttl]:
+            del entries[key]
+
+        overflow = len(entries) - self.max_entries
+        if overflow > 0:
+            oldest = sorted(entries, key=lambda k: entries[k]["last_used"])[:overflow]
+            for key in oldest:
+                del entries[key]
+
+    def _load(self):
+        try:
+            with open(self.filename, 'r') as f:
+                data = json.load(f)
+            data.setdefault("entries", {})
+            data.setdefault("stats", {"hits": 0, "misses": 0})
+            return data
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"entries": {}, "stats": {"hits": 0, "misses": 0}}
+
+    def _save(self):
+        folder = os.path.dirname(self.filename)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        tmp = self.filename + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self._data, f)
+        os.replace(tmp, self.filename)
+        self._dirty = False
@@ -4,6 +4,7 @@
 # ==============================================================================
 import matplotlib.pyplot as plt
 import io
+import numpy as np
 import pandas as pd
 
 class Visualizer:
@@ -41,4 +42,38 @@ class Visualizer:
         buf.seek(0)
         plt.close(fig)
         
-        return buf
\ No newline at end of file
+        return buf
+
+    @staticmethod
+    def lttb(x, y, n_out):
+        """
+        Sous-échantillonnage Largest-Triangle-Three-Buckets : garde n_out points
+        qui préservent la forme de la courbe (pics, creux, drawdowns).
+        x : dates ou nombres croissants, y : valeurs (sans NaN).
+        Retourne les indices des points retenus (premier et dernier inclus).
+        """
+        n = len(y)
+        if n_out >= n or n_out < 3:
+            return np.arange(n)
+
+        x = pd.Index(x)
+        x = (x.asi8 if isinstance(x, pd.DatetimeIndex) else x.to_numpy()).astype(np.float64)
+        y = np.asarray(y, dtype=np.float64)
+
+        # n_out - 2 seaux entre le premier et le dernier point
+        edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+        edges = np.append(edges, n)
+        selected = np.empty(n_out, dtype=np.intp)
+        selected[0], selected[-1] = 0, n - 1
+
+        a = 0
+        for k in range(n_out - 2):
+            start, end = edges[k], edges[k + 1]
+            # Sommet C : moyenne du seau suivant
+            cx = x[edges[k + 1]:edges[k + 2]].mean()
+            cy = y[edges[k + 1]:edges[k + 2]].mean()
+            # Aire du triangle (A, B, C) pour chaque candidat B du seau courant
+            area = np.abs((x[a] - cx) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (cy - y[a]))
+            a = start + int(np.argmax(area))
+            selected[k + 1] = a
+        return selected
\ No newline at end of file
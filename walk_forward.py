@@ -0,0 +1,141 @@
+# ==============================================================================
+# FICHIER : walk_forward.py
+# ROLE : Optimisation Walk-Forward (In-Sample -> Out-of-Sample glissant)
+# ==============================================================================
+import os
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from backtest_suite import BacktestEngine, INITIAL_CAPITAL, WARMUP_DAYS
+from core.signal_matrix import SignalMatrix
+from param_sweep import ParameterSweep, SharedPriceMatrix, DEFAULT_GRID, evaluate, _init_worker, _WORKER
+
+# --- PARAMÈTRES PAR DÉFAUT ---
+TRAIN_DAYS = 756     # 3 ans d'In-Sample
+TEST_DAYS = 21       # Re-calibrage mensuel (1 mois d'Out-of-Sample)
+RESULTS_FILE = "database/walk_forward.csv"
+
+def _run_fold(task):
+    """Optimise sur l'In-Sample du fold ; retourne le meilleur jeu pour son Out-of-Sample."""
+    fold, (train_start, test_start, test_end), combos, metric = task
+    engine = BacktestEngine()
+
+    best_params, best_score = None, None
+    for params in combos:
+        # Signaux reconstruits à la demande depuis les matrices d'indicateurs du
+        # worker : garder une SignalMatrix par combinaison coûterait jours x tickers x grille
+        history = engine.simulate(_WORKER["data"], params=params, memo=_WORKER["memo"], verbose=False,
+                                  start_index=train_start, end_index=test_start)
+        score = evaluate(history)[metric]
+        if best_score is None or score > best_score:
+            best_params, best_score = params, score
+
+    return {
+        "fold": fold,
+        "params": best_params,
+        "in_sample": best_score,
+        "test": (test_start, test_end)
+    }
+
+class WalkForward:
+    """
+    Découpe l'historique en folds [In-Sample | Out-of-Sample] qui glissent de
+    test_days. Chaque fold est optimisé en parallèle ; les matrices d'indicateurs
+    du panel complet sont calculées une fois par worker et réutilisées par tous
+    les folds (fenêtres causales : la ligne i ne dépend que du passé).
+    Les segments Out-of-Sample sont ensuite rejoués à la suite sur un seul
+    portefeuille (cash et positions conservés d'un fold à l'autre) : avec un
+    seul jeu de paramètres, la courbe est celle d'une simulation continue.
+    """
+
+    def __init__(self, grid=None, train_days=TRAIN_DAYS, test_days=TEST_DAYS,
+                 metric="sharpe", workers=None):
+        self.sweep = ParameterSweep(grid or DEFAULT_GRID, workers)
+        self.train_days = train_days
+        self.test_days = test_days
+        self.metric = metric
+
+    def folds(self, n_rows):
+        """Liste des (début In-Sample, début Out-of-Sample, fin Out-of-Sample)."""
+        folds = []
+        start = WARMUP_DAYS
+        while start + self.train_days < n_rows:
+            test_start = start + self.train_days
+            folds.append((start, test_start, min(test_start + self.test_days, n_rows)))
+            start += self.test_days
+        return folds
+
+    def run(self, full_data=None):
+        if full_data is None:
+            full_data = BacktestEngine().fetch_history()
+
+        folds = self.folds(len(full_data['close']))
+        if not folds:
+            raise ValueError("Historique trop court pour un seul fold.")
+        combos = self.sweep.combinations()
+        print(f"🔁 [WalkForward] {len(folds)} folds x {len(combos)} combinaisons "
+              f"sur {self.sweep.workers} processus...")
+
+        tasks = [(k, fold, combos, self.metric) for k, fold in enumerate(folds)]
+        shared = SharedPriceMatrix(full_data['close'])
+        try:
+            with ProcessPoolExecutor(max_workers=self.sweep.workers, initializer=_init_worker,
+                                     initargs=(shared.spec(),)) as pool:
+                results = sorted(pool.map(_run_fold, tasks), key=lambda r: r["fold"])
+        finally:
+            shared.release()
+
+        return self._stitch(full_data, results)
+
+    def _stitch(self, full_data, results):
+        """
+        Enchaîne les segments Out-of-Sample sur un même portefeuille : pas de
+        rachat complet (ni de frais d'entrée) ni de jour perdu aux frontières.
+        """
+        engine = BacktestEngine()
+        rows, equity_rows = [], []
+        memo, signals, current = {}, None, None
+        level = INITIAL_CAPITAL
+        for k, r in enumerate(results):
+            if r["params"] != current:
+                current = r["params"]
+                signals = SignalMatrix(full_data, params=current, memo=memo)
+            start, end = r["test"]
+            oos = engine.simulate(full_data, signals=signals, verbose=False,
+                                  start_index=start, end_index=end, keep_state=k > 0)
+            if oos.empty:
+                continue
+            segment = oos.set_index('Date')['Equity']
+            equity_rows.append(segment)
+            rows.append({
+                "fold": r["fold"],
+                "oos_start": segment.index[0],
+                "oos_end": segment.index[-1],
+                f"in_sample_{self.metric}": r["in_sample"],
+                "oos_return": segment.iloc[-1] / level - 1,  # Depuis la fin du fold précédent
+                **r["params"]
+            })
+            level = segment.iloc[-1]
+
+        equity = pd.concat(equity_rows).to_frame("Equity")
+        equity.index.name = "Date"
+        return pd.DataFrame(rows), equity
+
+if __name__ == "__main__":
+    try:
+        folds_table, equity = WalkForward().run()
+        stats = evaluate(equity.reset_index())
+
+        if not os.path.exists("database"):
+            os.makedirs("database")
+        folds_table.to_csv(RESULTS_FILE, index=False)
+
+        print("\n" + "="*50)
+        print("📊 RÉSULTATS WALK-FORWARD (Out-of-Sample recollé)")
+        print("="*50)
+        print(f"Capital Final   : ${equity['Equity'].iloc[-1]:,.0f}")
+        print(f"CAGR            : {stats['cagr']:+.2%}")
+        print(f"Sharpe          : {stats['sharpe']:.2f}")
+        print(f"Max Drawdown    : {stats['max_drawdown']:.1%}")
+        print(f"💾 Détail des folds : {RESULTS_FILE}")
+    except Exception as e:
+        print(f"❌ Erreur Walk-Forward : {e}")